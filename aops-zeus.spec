@@ -11,7 +11,9 @@ BuildRequires:  python3-setuptools
 Requires:   aops-vulcanus >= v1.2.0
 Requires:   python3-marshmallow >= 3.13.0 python3-flask python3-flask-restful python3-gevent
 Requires:   python3-requests python3-uWSGI python3-sqlalchemy python3-werkzeug python3-PyMySQL
-Requires:   python3-paramiko >= 2.11.0 python3-redis python3-prometheus-api-client
+Requires:   python3-paramiko >= 2.11.0 python3-cryptography python3-redis python3-prometheus-api-client >= 0.7.0
+Requires:   python3-numpy
+Recommends: python3-msgpack
 Provides:   aops-zeus
 Conflicts:  aops-manager
 
@@ -18,10 +18,14 @@ setup(
         'SQLAlchemy',
         'Werkzeug',
         'paramiko>=2.11.0',
+        'cryptography',
         "redis",
-        'prometheus_api_client',
+        'prometheus_api_client>=0.7.0',
         'gevent',
+        'numpy',
     ],
+    # the msgpack response format of metric data is offered only when msgpack is installed
+    extras_require={'msgpack': ['msgpack']},
     author='cmd-lsw-yyy-zyc',
     data_files=[('/etc/aops', ['conf/zeus.ini']), ('/usr/lib/systemd/system', ['aops-zeus.service'])],
     scripts=['aops-zeus'],
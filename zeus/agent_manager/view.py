@@ -51,7 +51,9 @@ class AgentPluginInfo(BaseResponse):
         Returns:
             Response: response body
         """
-        status, host = callback.get_host_info({"username": params["username"], "host_list": [params["host_id"]]})
+        status, host = callback.get_host_info(
+            {"username": params["username"], "host_list": [params["host_id"]]}, with_pkey=True
+        )
         if status != state.SUCCEED:
             LOGGER.error(f"query host {params['host_id']} info failed.")
             return self.response(code=status)
@@ -128,7 +130,9 @@ class GetHostScene(BaseResponse):
         Returns:
             dict: response body
         """
-        status, host_list = callback.get_host_info({"username": params["username"], "host_list": [params["host_id"]]})
+        status, host_list = callback.get_host_info(
+            {"username": params["username"], "host_list": [params["host_id"]]}, with_pkey=True
+        )
         if status != state.SUCCEED:
             LOGGER.error(f"query host {params['host_id']} info failed.")
             return self.response(code=status)
@@ -173,7 +177,9 @@ class SetAgentPluginStatus(BaseResponse):
             dict: response body
         """
         ret = {"failed_list": [], "succeed_list": []}
-        status, host = callback.get_host_info({"username": params["username"], "host_list": [params["host_id"]]})
+        status, host = callback.get_host_info(
+            {"username": params["username"], "host_list": [params["host_id"]]}, with_pkey=True
+        )
         if status != state.SUCCEED:
             LOGGER.error(f"query host {params['host_id']} info failed.")
             return self.response(code=status)
@@ -217,7 +223,9 @@ class SetAgentMetricStatus(BaseResponse):
         Returns:
             dict: response body
         """
-        status, host = callback.get_host_info({"username": params["username"], "host_list": [params["host_id"]]})
+        status, host = callback.get_host_info(
+            {"username": params["username"], "host_list": [params["host_id"]]}, with_pkey=True
+        )
         if status != state.SUCCEED:
             LOGGER.error(f"query host {params['host_id']} info failed.")
             return self.response(code=status)
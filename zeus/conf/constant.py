@@ -33,6 +33,20 @@ CERES_CVE_REPO_SET = "aops-ceres apollo --set-repo '%s'"
 CERES_CVE_SCAN = "aops-ceres apollo --scan '%s'"
 CERES_CVE_FIX = "aops-ceres apollo --fix '%s'"
 CERES_CVE_ROLLBACK = "aops-ceres apollo --rollback '%s'"
+# digest of installed packages, repo files and downloaded repo metadata, it's changed when a scan may find other cves
+HOST_PACKAGE_FINGERPRINT = (
+    "(rpm -qa | sort; cat /etc/yum.repos.d/*.repo /var/cache/dnf/*/repodata/repomd.xml) 2>/dev/null | sha256sum"
+)
+
+# host
+ADD_HOST_STREAM = "/manage/host/add/stream"
+
+# vulnerability
+QUERY_CVE_TASK_RESULT = "/manage/vulnerability/task/result"
+
+# metric
+QUERY_FLEET_METRIC_DATA = "/manage/host/metric/fleet/data"
+QUERY_METRIC_DATA_STREAM = "/manage/host/metric/data/stream"
 
 # check
 CHECK_IDENTIFY_SCENE = "/check/scene/identify"
@@ -50,6 +64,9 @@ class CveTaskStatus:
     SUCCEED = 'succeed'
     FAIL = 'fail'
     UNKNOWN = 'unknown'
+    # states of a host in the cve task journal before its result is known
+    PENDING = 'pending'
+    RUNNING = 'running'
 
 
 class HostStatus:
@@ -28,11 +28,64 @@ mysql = {
 
 diana = {"IP": "127.0.0.1", "PORT": 11112}
 
-apollo = {"IP": "127.0.0.1", "PORT": 11116}
+apollo = {
+    "IP": "127.0.0.1",
+    "PORT": 11116,
+    "CALLBACK_CONCURRENCY": 20,
+    "CALLBACK_RETRIES": 3,
+    "CALLBACK_BACKOFF": 0.5,
+    "CALLBACK_TIMEOUT": 10,
+    "CALLBACK_QUEUE_SIZE": 10000,
+}
 
 redis = {"IP": "127.0.0.1", "PORT": 6379}
 
+cache = {
+    "HOST_SUMMARY_EXPIRE": 3600,
+    "HOST_SUMMARY_RECONCILE_INTERVAL": 600,
+    "HOST_INFO_EXPIRE": 300,
+    "HOST_PKEY_CACHE_SIZE": 10000,
+    "SCAN_RESULT_EXPIRE": 86400,
+}
+
+cve_task = {
+    "ASYNC_CONCURRENCY": 4,
+    "RESULT_EXPIRE": 86400,
+    "JOURNAL_EXPIRE": 604800,
+    "RESUME_IDLE": 900,
+    "RESUME_INTERVAL": 60,
+}
+
 
-prometheus = {"IP": "127.0.0.1", "PORT": 9090, "QUERY_RANGE_STEP": "15s"}
+prometheus = {
+    "IP": "127.0.0.1",
+    "PORT": 9090,
+    "QUERY_RANGE_STEP": "15s",
+    "QUERY_CONCURRENCY": 10,
+    "QUERY_DEADLINE": 30,
+    "SERIES_CATALOG_TTL": 60,
+    "SERIES_CATALOG_LOOKBACK": 300,
+    "SERIES_CATALOG_MAX_INSTANCES": 5000,
+    "FLEET_QUERY_CHUNK_SIZE": 200,
+    "RANGE_CACHE_MAX_POINTS": 200000,
+    "RANGE_CACHE_BUCKET_POINTS": 240,
+    "RANGE_CACHE_SETTLE": 60,
+    "POOL_SIZE": 20,
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 30,
+}
 
 agent = {"DEFAULT_INSTANCE_PORT": 8888}
+
+ssh = {
+    "CONNECTION_POOL_MAX_PER_HOST": 4,
+    "CONNECTION_IDLE_TIMEOUT": 300,
+    "PKEY_CACHE_SIZE": 10000,
+    "KEY_TYPE": "rsa",
+    "KEY_PAIR_POOL_SIZE": 20,
+    "FAN_OUT_CONCURRENCY": 100,
+    "FAN_OUT_PER_HOST_LIMIT": 4,
+    "FAN_OUT_TIMEOUT": 600,
+    "ADD_HOST_CONCURRENCY": 30,
+    "ADD_HOST_CHUNK_SIZE": 200,
+}
@@ -18,7 +18,6 @@ Description: Restful APIs for host
 import json
 from typing import List, Dict
 
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp import state
 from vulcanus.restful.response import BaseResponse
 from zeus.conf import configuration
@@ -26,6 +25,7 @@ from zeus.conf.constant import CERES_COLLECT_FILE
 from zeus.database.proxy.host import HostProxy
 from zeus.function.model import ClientConnectArgs
 from zeus.function.verify.config import CollectConfigSchema
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.host_manager.ssh import execute_command_and_parse_its_result
 
 
@@ -204,7 +204,7 @@ class CollectConfig(BaseResponse):
             return self.response(code=state.DATABASE_CONNECT_ERROR, data={"resp": file_content})
 
         status, host_list = proxy.get_host_info(
-            {"username": "admin", "host_list": list(host_id_with_config_file.keys())}, True
+            {"username": "admin", "host_list": list(host_id_with_config_file.keys())}, True, with_pkey=True
         )
         if status != state.SUCCEED:
             file_content = self.convert_host_id_to_failed_data_format(
@@ -213,9 +213,8 @@ class CollectConfig(BaseResponse):
             return self.response(code=status, data={"resp": file_content})
         # Get file content
         tasks = [(host, host_id_with_config_file[host["host_id"]]) for host in host_list]
-        multi_thread = MultiThreadHandler(lambda data: self.get_file_content(*data), tasks, None)
-        multi_thread.create_thread()
+        fan_out_handler = FanOutHandler(self.get_file_content, tasks, target=lambda host, _: host["host_ip"])
+        fan_out_handler.execute()
 
-        return self.response(
-            state.SUCCEED, None, self.generate_target_data_format(multi_thread.get_result(), host_id_with_config_file)
-        )
+        file_content = self.generate_target_data_format(fan_out_handler.get_result(), host_id_with_config_file)
+        return self.response(state.SUCCEED, None, file_content)
@@ -15,11 +15,13 @@ Time:
 Author:
 Description: Host table operation
 """
+import base64
+import json
 import math
 from typing import Dict, List, Tuple
 
 import sqlalchemy
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_, tuple_
 from sqlalchemy.sql.expression import asc, desc
 from sqlalchemy.orm.collections import InstrumentedList
 
@@ -35,8 +37,65 @@ from vulcanus.restful.resp.state import (
     DATA_DEPENDENCY_ERROR,
     DATA_EXIST,
     NO_DATA,
+    PARAM_ERROR,
     SUCCEED,
 )
+from zeus.database.cache import HOST_INFO, HOST_PKEY, HOST_SUMMARY
+from zeus.host_manager.ssh import forget_private_key
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def encode_cursor(values: list) -> str:
+    """
+    encode values of the last row of a page to an opaque cursor
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """
+    decode cursor to values of the last row of previous page, an empty cursor means the first page
+
+    Args:
+        cursor(str): cursor given by the previous page
+        length(int): number of sort columns, a cursor has one value of every column
+
+    Raises:
+        ValueError: cursor is invalid
+    """
+    if not cursor:
+        return []
+    if not isinstance(cursor, str):
+        raise ValueError("invalid cursor")
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+    except (ValueError, TypeError) as error:
+        raise ValueError("invalid cursor") from error
+    if (
+        not isinstance(values, list)
+        or len(values) != length
+        or not all(value is None or isinstance(value, (str, int, float)) for value in values)
+    ):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def after_cursor(columns: list, values: list, direction: str):
+    """
+    generate condition of rows which are after the cursor in the order of columns, e.g
+    (a > 1) or (a == 1 and id > 5)
+    """
+    if len(values) != len(columns):
+        raise ValueError("invalid cursor")
+    conditions = []
+    for index, column in enumerate(columns):
+        previous_equal = [columns[i] == values[i] for i in range(index)]
+        if direction == "desc":
+            conditions.append(and_(*previous_equal, column < values[index]))
+        else:
+            conditions.append(and_(*previous_equal, column > values[index]))
+    return or_(*conditions)
 
 
 class HostProxy(MysqlProxy):
@@ -84,7 +143,9 @@ class HostProxy(MysqlProxy):
             host.host_group = host_group
             host.owner = user
             self.session.add(host)
+            changes = HOST_SUMMARY.host_changes([host])
             self.session.commit()
+            HOST_SUMMARY.apply(changes)
             return SUCCEED
 
         except sqlalchemy.exc.SQLAlchemyError as error:
@@ -117,7 +178,11 @@ class HostProxy(MysqlProxy):
                 self.session.delete(host)
                 result['succeed_list'].append(host.host_id)
                 host_info[host.host_id] = host.host_name
+            changes = HOST_SUMMARY.host_changes(hosts, sign=-1)
             self.session.commit()
+            HOST_SUMMARY.apply(changes)
+            HOST_INFO.invalidate(result['succeed_list'])
+            HOST_PKEY.invalidate(result['succeed_list'])
             fail_list = list(set(host_list) - set(result['succeed_list']))
             result['fail_list'].update(zip(fail_list, len(fail_list) * ("Can't find the data in database",)))
             status_code = judge_return_code(result, DATABASE_DELETE_ERROR)
@@ -146,8 +211,18 @@ class HostProxy(MysqlProxy):
             dict: query result
         """
         result = {}
+        if "cursor" in data:
+            try:
+                # hosts are ordered by the sort column and host id
+                values = decode_cursor(data.get('cursor'), 2 if data.get('sort') else 1)
+            except ValueError:
+                LOGGER.error(f"invalid cursor {data.get('cursor')}")
+                return PARAM_ERROR, result
         try:
-            result = self._sort_host_by_column(data)
+            if "cursor" in data:
+                result = self._query_host_by_cursor(data, values)
+            else:
+                result = self._sort_host_by_column(data)
             self.session.commit()
             LOGGER.debug("query host succeed")
             return SUCCEED, result
@@ -174,7 +249,7 @@ class HostProxy(MysqlProxy):
         result['host_count'] = 0
         try:
             filters = self._get_host_filters(data)
-            total_count = self._get_host_count(filters)
+            total_count = self._count_host(data, filters)
             result['host_count'] = total_count
             self.session.commit()
             return SUCCEED, result
@@ -196,6 +271,26 @@ class HostProxy(MysqlProxy):
         total_count = self.session.query(func.count(Host.host_id)).filter(*filters).scalar()
         return total_count
 
+    def _count_host(self, data, filters):
+        """
+        Count hosts with the cached host summary when hosts are only filtered by user and status,
+        otherwise count them in database
+
+        Args:
+            data(dict): query condition
+            filters(set): query filters
+
+        Returns:
+            int
+        """
+        if not data.get('host_group_list') and data.get('management') is None:
+            summary = HOST_SUMMARY.get(self.session, data['username'])
+            if summary is not None:
+                if data.get('status'):
+                    return sum(summary.get(f"status:{status}", 0) for status in data['status'])
+                return summary.get("total", 0)
+        return self._get_host_count(filters)
+
     @staticmethod
     def _get_host_filters(data):
         """
@@ -237,7 +332,7 @@ class HostProxy(MysqlProxy):
         per_page = data.get('per_page')
         total_page = 1
         filters = self._get_host_filters(data)
-        total_count = self._get_host_count(filters)
+        total_count = self._count_host(data, filters)
         if total_count == 0:
             return result
 
@@ -261,28 +356,72 @@ class HostProxy(MysqlProxy):
             else:
                 hosts = self.session.query(Host).filter(*filters).all()
 
-        for host in hosts:
-            host_info = {
-                "host_id": host.host_id,
-                "host_name": host.host_name,
-                "host_group_name": host.host_group_name,
-                "host_ip": host.host_ip,
-                "management": host.management,
-                "status": host.status,
-                "scene": host.scene,
-                "os_version": host.os_version,
-                "ssh_port": host.ssh_port,
-            }
-            result['host_infos'].append(host_info)
-
+        result['host_infos'] = [self._host_row2dict(host) for host in hosts]
         result['total_page'] = total_page
         result['total_count'] = total_count
 
         return result
 
-    def get_host_info(self, data, is_collect_file: bool = False):
+    def _query_host_by_cursor(self, data, values: list):
         """
-        Get host basic info according to host id from table
+        Query a page of hosts after the cursor. Hosts are ordered by the sort column and host id,
+        so the page is located by index instead of skipping the rows of previous pages.
+
+        Args:
+            data(dict): sorted condition info, e.g
+                {
+                    "sort": "host_name",
+                    "direction": "asc",
+                    "cursor": "next_cursor of previous page, empty for the first page",
+                    "per_page": 20,
+                    "with_total": False
+                }
+            values(list): decoded cursor, values of the sort column and host id of the last row of previous page
+
+        Returns:
+            dict: e.g
+                {
+                    "host_infos": [],
+                    "next_cursor": "cursor of next page, None when it's the last page",
+                    "total_count": 1  // only when with_total is True
+                }
+        """
+        per_page = data.get('per_page') or DEFAULT_PAGE_SIZE
+        direction = desc if data.get('direction') == 'desc' else asc
+        columns = [getattr(Host, data['sort']), Host.host_id] if data.get('sort') else [Host.host_id]
+        filters = self._get_host_filters(data)
+
+        query = self.session.query(Host).filter(*filters)
+        if values:
+            query = query.filter(after_cursor(columns, values, data.get('direction')))
+        hosts = query.order_by(*[direction(column) for column in columns]).limit(per_page + 1).all()
+
+        result = {"host_infos": [self._host_row2dict(host) for host in hosts[:per_page]], "next_cursor": None}
+        if len(hosts) > per_page:
+            result['next_cursor'] = encode_cursor([getattr(hosts[per_page - 1], column.key) for column in columns])
+        if data.get('with_total'):
+            result['total_count'] = self._get_host_count(filters)
+        return result
+
+    @staticmethod
+    def _host_row2dict(host: Host) -> dict:
+        return {
+            "host_id": host.host_id,
+            "host_name": host.host_name,
+            "host_group_name": host.host_group_name,
+            "host_ip": host.host_ip,
+            "management": host.management,
+            "status": host.status,
+            "scene": host.scene,
+            "os_version": host.os_version,
+            "ssh_port": host.ssh_port,
+        }
+
+    def get_host_info(self, data, is_collect_file: bool = False, with_pkey: bool = False):
+        """
+        Get host basic info according to host id, hosts are read from cache before table. Private keys
+        are kept in memory of the process instead of redis, they're read from table only when they're
+        needed to connect to hosts and the cached key is missing or changed.
 
         Args:
             data(dict): parameter, e.g.
@@ -291,6 +430,7 @@ class HostProxy(MysqlProxy):
                     "host_list": ["id1", "id2"]
                 }
             is_collect_file (bool)
+            with_pkey (bool): whether private keys of hosts are returned
 
         Returns:
             int: status code
@@ -298,9 +438,11 @@ class HostProxy(MysqlProxy):
         """
         username = data.get('username')
         host_list = data.get('host_list')
-        result = []
+        # hosts in host_list are read from cache first, all hosts of the user are always read from database
+        cached, missed = HOST_INFO.get_many(host_list) if host_list else ({}, None)
         query_fields = [
             Host.host_id,
+            Host.user,
             Host.host_name,
             Host.host_ip,
             Host.os_version,
@@ -309,36 +451,64 @@ class HostProxy(MysqlProxy):
             Host.management,
             Host.status,
             Host.scene,
-            Host.pkey,
             Host.ssh_user,
+            # the key is kept in memory of the process, only its digest is cached in redis
+            Host.pkey,
         ]
-        filters = {Host.user == username} if not is_collect_file else set()
-        if host_list:
-            filters.add(Host.host_id.in_(host_list))
+        if missed is None:
+            filters = {Host.user == username} if not is_collect_file else set()
+        else:
+            filters = {Host.host_id.in_(missed)}
         try:
-            hosts = self.session.query(*query_fields).filter(*filters).all()
-            for host in hosts:
-                host_info = {
-                    "host_id": host.host_id,
-                    "host_group_name": host.host_group_name,
-                    "host_name": host.host_name,
-                    "host_ip": host.host_ip,
-                    "management": host.management,
-                    "status": host.status,
-                    "scene": host.scene,
-                    "os_version": host.os_version,
-                    "ssh_port": host.ssh_port,
-                    "pkey": host.pkey,
-                    "ssh_user": host.ssh_user,
-                }
-                result.append(host_info)
+            hosts = self.session.query(*query_fields).filter(*filters).all() if missed is None or missed else []
+            pkeys, pkey_missed = (
+                HOST_PKEY.get_many({host_id: host_info.get("pkey_digest") for host_id, host_info in cached.items()})
+                if with_pkey
+                else ({}, [])
+            )
+            if pkey_missed:
+                queried_pkeys = dict(
+                    self.session.query(Host.host_id, Host.pkey).filter(Host.host_id.in_(pkey_missed)).all()
+                )
+                HOST_PKEY.set_many(queried_pkeys)
+                pkeys.update(queried_pkeys)
             self.session.commit()
             LOGGER.debug("query host %s basic info succeed", host_list)
-            return SUCCEED, result
         except sqlalchemy.exc.SQLAlchemyError as error:
             LOGGER.error(error)
             LOGGER.error("query host %s basic info fail", host_list)
-            return DATABASE_QUERY_ERROR, result
+            return DATABASE_QUERY_ERROR, []
+
+        queried = [self._host_basic_info_row2dict(host) for host in hosts]
+        HOST_INFO.set_many(queried)
+        if with_pkey:
+            HOST_PKEY.set_many({host.host_id: host.pkey for host in hosts})
+            pkeys.update((host.host_id, host.pkey) for host in hosts)
+            for host_info in [*cached.values(), *queried]:
+                host_info["pkey"] = pkeys.get(host_info["host_id"])
+        host_infos = [*cached.values(), *queried]
+        return SUCCEED, [
+            {key: value for key, value in host_info.items() if key not in ("user", "pkey_digest")}
+            for host_info in host_infos
+            if is_collect_file or host_info["user"] == username
+        ]
+
+    @staticmethod
+    def _host_basic_info_row2dict(host) -> dict:
+        return {
+            "host_id": host.host_id,
+            "user": host.user,
+            "host_group_name": host.host_group_name,
+            "host_name": host.host_name,
+            "host_ip": host.host_ip,
+            "management": host.management,
+            "status": host.status,
+            "scene": host.scene,
+            "os_version": host.os_version,
+            "ssh_port": host.ssh_port,
+            "ssh_user": host.ssh_user,
+            "pkey_digest": HOST_PKEY.digest(host.pkey),
+        }
 
     def get_total_host_info_by_user(self, data):
         """
@@ -408,6 +578,7 @@ class HostProxy(MysqlProxy):
             host_group.user = user
             self.session.add(host_group)
             self.session.commit()
+            HOST_SUMMARY.set_group(username, host_group.host_group_id)
             LOGGER.info("add host group [%s] succeed", host_group_name)
             return SUCCEED
         except sqlalchemy.exc.SQLAlchemyError as error:
@@ -436,6 +607,7 @@ class HostProxy(MysqlProxy):
         username = data['username']
         result = {"deleted": []}
         deleted = []
+        deleted_ids = []
         not_deleted = []
         try:
             # Filter the group if there are hosts in the group
@@ -452,8 +624,11 @@ class HostProxy(MysqlProxy):
                     not_deleted.append(host_group.host_group_name)
                     continue
                 deleted.append(host_group.host_group_name)
+                deleted_ids.append(host_group.host_group_id)
                 self.session.delete(host_group)
             self.session.commit()
+            for host_group_id in deleted_ids:
+                HOST_SUMMARY.set_group(username, host_group_id, exists=False)
             result["deleted"] = deleted
             if not_deleted:
                 LOGGER.error("host group %s deleted, groups %s delete fail", deleted, not_deleted)
@@ -485,8 +660,18 @@ class HostProxy(MysqlProxy):
             dict: group infos
         """
         result = {}
+        if "cursor" in data:
+            try:
+                # groups are ordered by the sort column and group id
+                values = decode_cursor(data.get('cursor'), 2 if data.get('sort') else 1)
+            except ValueError:
+                LOGGER.error(f"invalid cursor {data.get('cursor')}")
+                return PARAM_ERROR, result
         try:
-            result = self._sort_group_by_column(data)
+            if "cursor" in data:
+                result = self._query_group_by_cursor(data, values)
+            else:
+                result = self._sort_group_by_column(data)
             self.session.commit()
             LOGGER.debug("query host group succeed")
             return SUCCEED, result
@@ -497,28 +682,103 @@ class HostProxy(MysqlProxy):
 
     def _sort_group_by_column(self, data):
         result = {"total_count": 0, "total_page": 1, "host_group_infos": []}
-        host_group_infos = (
-            self.session.query(
-                HostGroup.host_group_name, HostGroup.description, func.count(Host.host_id).label("host_count")
-            )
-            .outerjoin(Host, HostGroup.host_group_id == Host.host_group_id)
-            .filter(HostGroup.username == data['username'])
-            .group_by(HostGroup.host_group_id)
-        )
-        total_count = len(host_group_infos.all())
+        total_count = self._get_group_count(data['username'])
         if not total_count:
             return result
 
+        # host count of groups is read from the cached host summary unless groups are sorted by it
+        summary = None if data.get('sort') == 'host_count' else HOST_SUMMARY.get(self.session, data['username'])
+        if summary is not None:
+            host_group_infos = self.session.query(
+                HostGroup.host_group_id, HostGroup.host_group_name, HostGroup.description
+            ).filter(HostGroup.username == data['username'])
+        else:
+            host_group_infos = (
+                self.session.query(
+                    HostGroup.host_group_name, HostGroup.description, func.count(Host.host_id).label("host_count")
+                )
+                .outerjoin(Host, HostGroup.host_group_id == Host.host_group_id)
+                .filter(HostGroup.username == data['username'])
+                .group_by(HostGroup.host_group_id)
+            )
+
         sort_column = self._get_group_column(data.get('sort'))
         direction, page, per_page = data.get('direction'), data.get('page'), data.get('per_page')
         processed_query, total_page = sort_and_page(host_group_infos, sort_column, direction, per_page, page)
         infos = processed_query.all()
-        host_group_infos = self._group_info_row2dict(infos)
+        if summary is not None:
+            host_group_infos = [
+                {
+                    "host_group_name": host_group.host_group_name,
+                    "description": host_group.description,
+                    "host_count": summary.get(f"group:{host_group.host_group_id}", 0),
+                }
+                for host_group in infos
+            ]
+        else:
+            host_group_infos = self._group_info_row2dict(infos)
         result['total_count'] = total_count
         result['total_page'] = total_page
         result['host_group_infos'] = host_group_infos
         return result
 
+    def _query_group_by_cursor(self, data, values: list):
+        """
+        Query a page of host groups after the cursor, groups are ordered by the sort column and group id
+
+        Args:
+            data(dict): sorted condition info, e.g
+                {
+                    "sort": "host_count",
+                    "direction": "asc",
+                    "cursor": "next_cursor of previous page, empty for the first page",
+                    "per_page": 20,
+                    "with_total": False
+                }
+            values(list): decoded cursor, values of the sort column and group id of the last row of previous page
+
+        Returns:
+            dict: e.g
+                {
+                    "host_group_infos": [],
+                    "next_cursor": "cursor of next page, None when it's the last page",
+                    "total_count": 1  // only when with_total is True
+                }
+        """
+        per_page = data.get('per_page') or DEFAULT_PAGE_SIZE
+        direction = desc if data.get('direction') == 'desc' else asc
+        sort_column = self._get_group_column(data.get('sort'))
+        columns = [sort_column, HostGroup.host_group_id] if sort_column is not None else [HostGroup.host_group_id]
+
+        query = (
+            self.session.query(
+                HostGroup.host_group_id,
+                HostGroup.host_group_name,
+                HostGroup.description,
+                func.count(Host.host_id).label("host_count"),
+            )
+            .outerjoin(Host, HostGroup.host_group_id == Host.host_group_id)
+            .filter(HostGroup.username == data['username'])
+            .group_by(HostGroup.host_group_id)
+        )
+        if values:
+            condition = after_cursor(columns, values, data.get('direction'))
+            # host count is an aggregate, it can only be compared after grouping
+            query = query.having(condition) if data.get('sort') == "host_count" else query.filter(condition)
+        rows = query.order_by(*[direction(column) for column in columns]).limit(per_page + 1).all()
+
+        result = {"host_group_infos": self._group_info_row2dict(rows[:per_page]), "next_cursor": None}
+        if len(rows) > per_page:
+            last_row = rows[per_page - 1]
+            values = [getattr(last_row, data['sort'])] if data.get('sort') else []
+            result['next_cursor'] = encode_cursor(values + [last_row.host_group_id])
+        if data.get('with_total'):
+            result['total_count'] = self._get_group_count(data['username'])
+        return result
+
+    def _get_group_count(self, username: str) -> int:
+        return self.session.query(func.count(HostGroup.host_group_id)).filter(HostGroup.username == username).scalar()
+
     @staticmethod
     def _get_group_column(column_name):
         if not column_name:
@@ -628,6 +888,7 @@ class HostProxy(MysqlProxy):
             host = self.session.query(Host).filter(Host.host_id == host_id).one()
             host.scene = scene
             self.session.commit()
+            HOST_INFO.invalidate([host_id])
             return SUCCEED
 
         except sqlalchemy.exc.SQLAlchemyError as error:
@@ -703,7 +964,9 @@ class HostProxy(MysqlProxy):
         """
         try:
             self.session.add(host)
+            changes = HOST_SUMMARY.host_changes([host])
             self.session.commit()
+            HOST_SUMMARY.apply(changes)
             LOGGER.info(f"add host {host.host_ip} succeed")
             return SUCCEED
 
@@ -713,6 +976,57 @@ class HostProxy(MysqlProxy):
             self.session.rollback()
             return DATABASE_INSERT_ERROR
 
+    def query_conflict_hosts(self, username: str, hosts: List[Host]) -> Tuple[str, List[Host]]:
+        """
+        query hosts whose host name or ssh address is the same as one of the given hosts,
+        it's a single query on the unique indexes of host table
+
+        Args:
+            username(str): admin
+            hosts(list): list of host object which will be added or updated
+
+        Returns:
+            tuple:
+                status_code, list of conflicting host object
+        """
+        host_names = {host.host_name for host in hosts if host.host_name}
+        host_addresses = {(host.host_ip, int(host.ssh_port)) for host in hosts if host.host_ip and host.ssh_port}
+        conditions = []
+        if host_names:
+            conditions.append(Host.host_name.in_(host_names))
+        if host_addresses:
+            conditions.append(tuple_(Host.host_ip, Host.ssh_port).in_(host_addresses))
+        if not conditions:
+            return SUCCEED, []
+
+        try:
+            conflict_hosts = self.session.query(Host).filter(Host.user == username, or_(*conditions)).all()
+            return SUCCEED, conflict_hosts
+        except sqlalchemy.exc.SQLAlchemyError as error:
+            LOGGER.error(error)
+            return DATABASE_QUERY_ERROR, []
+
+    def query_host(self, username: str, host_id: int) -> Tuple[str, Host]:
+        """
+        query host by host id
+
+        Args:
+            username(str): admin
+            host_id(int): host id
+
+        Returns:
+            tuple:
+                status_code, host object
+        """
+        try:
+            host = self.session.query(Host).filter(Host.user == username, Host.host_id == host_id).one_or_none()
+            if host is None:
+                return NO_DATA, Host()
+            return SUCCEED, host
+        except sqlalchemy.exc.SQLAlchemyError as error:
+            LOGGER.error(error)
+            return DATABASE_QUERY_ERROR, Host()
+
     def get_hosts_and_groups(self, username: str) -> Tuple[int, InstrumentedList, InstrumentedList]:
         """
         get all hosts by username
@@ -743,7 +1057,9 @@ class HostProxy(MysqlProxy):
         """
         try:
             self.session.bulk_save_objects(host_list)
+            changes = HOST_SUMMARY.host_changes(host_list)
             self.session.commit()
+            HOST_SUMMARY.apply(changes)
             LOGGER.info(f"add host {[host.host_ip for host in host_list]}succeed")
             return SUCCEED
         except sqlalchemy.exc.SQLAlchemyError as error:
@@ -768,8 +1084,31 @@ class HostProxy(MysqlProxy):
             str: SUCCEED or DATABASE_UPDATE_ERROR
         """
         try:
+            old_pkey = None
+            if "pkey" in update_info:
+                old_pkey = self.session.query(Host.pkey).filter(Host.host_id == host_id).scalar()
+            changes = {}
+            if "status" in update_info or "host_group_id" in update_info:
+                old_host = (
+                    self.session.query(Host.user, Host.status, Host.host_group_id)
+                    .filter(Host.host_id == host_id)
+                    .first()
+                )
+                if old_host:
+                    new_host = Host(
+                        user=old_host.user,
+                        status=update_info.get("status", old_host.status),
+                        host_group_id=update_info.get("host_group_id", old_host.host_group_id),
+                    )
+                    changes = HOST_SUMMARY.host_changes([old_host], sign=-1)
+                    changes[old_host.user].update(HOST_SUMMARY.host_changes([new_host])[old_host.user])
             self.session.query(Host).filter(Host.host_id == host_id).update(update_info)
             self.session.commit()
+            HOST_SUMMARY.apply(changes)
+            HOST_INFO.invalidate([host_id])
+            HOST_PKEY.invalidate([host_id])
+            if old_pkey and old_pkey != update_info["pkey"]:
+                forget_private_key(old_pkey)
             return SUCCEED
         except sqlalchemy.exc.SQLAlchemyError as error:
             LOGGER.error(error)
@@ -15,12 +15,106 @@ Time: 2022-07-27
 Author: YangYunYi
 Description: Query raw data from Prometheus
 """
-from typing import Dict, Tuple, List, Optional
+from typing import Any, Callable, Dict, Iterator, Tuple, List, Optional
 import datetime
-from prometheus_api_client import PrometheusApiClientException
+import re
+import time
+import gevent
+from gevent.pool import Pool
+from gevent.queue import Empty, Queue
+import requests
+from prometheus_api_client import PrometheusApiClientException, PrometheusConnect
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
 from vulcanus.database.proxy import PromDbProxy
 from vulcanus.log.log import LOGGER
 from vulcanus.restful.resp.state import SUCCEED, DATABASE_QUERY_ERROR, NO_DATA, PARAM_ERROR, PARTIAL_SUCCEED
+from zeus.metric_manager.catalog import SERIES_CATALOG
+from zeus.metric_manager.range_cache import RANGE_QUERY_CACHE
+from zeus.metric_manager.series import LTTB, PAIRS, downsample, encode_series
+
+
+def _run_concurrently(func: Callable, tasks: List[tuple], concurrency: int, deadline: Optional[float]) -> list:
+    """
+    Call func(*task) for every task in a bounded pool of greenlets
+
+    Args:
+        func(Callable): function to call
+        tasks(list): list of argument tuples
+        concurrency(int): maximum number of running calls
+        deadline(float): seconds to wait for all calls, unfinished calls are killed after it
+
+    Returns:
+        list: result of every task in order of tasks, None for a task which is not finished or failed
+    """
+    results = [None] * len(tasks)
+    for index, result in _iter_concurrently(func, tasks, concurrency, deadline):
+        results[index] = result
+    return results
+
+
+def _iter_concurrently(
+    func: Callable, tasks: List[tuple], concurrency: int, deadline: Optional[float]
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Same as _run_concurrently, but (index, result) of every task is yielded as soon as the task is finished.
+    Unfinished calls are killed when the deadline passed or the iterator is closed.
+    """
+    finished = Queue()
+    pool = Pool(concurrency)
+
+    def run(index: int, task: tuple) -> None:
+        result = None
+        try:
+            result = func(*task)
+        finally:
+            finished.put((index, result))
+
+    def spawn_all() -> None:
+        for index, task in enumerate(tasks):
+            pool.spawn(run, index, task)
+
+    # tasks are spawned in another greenlet, so finished results are yielded while the pool is full
+    spawner = gevent.spawn(spawn_all)
+    end_time = time.monotonic() + deadline if deadline else None
+    try:
+        for done in range(len(tasks)):
+            timeout = None if end_time is None else max(end_time - time.monotonic(), 0)
+            try:
+                yield finished.get(timeout=timeout)
+            except Empty:
+                LOGGER.error(f"{len(tasks) - done} prometheus queries are not finished in {deadline} seconds")
+                return
+    finally:
+        spawner.kill()
+        pool.kill()
+
+
+# url: client, clients and their http connection pools are shared by all MetricProxy of the process
+_PROMETHEUS_CLIENTS: Dict[str, PrometheusConnect] = {}
+
+
+def _get_prometheus_client(url: str, pool_size: int, timeout: tuple) -> PrometheusConnect:
+    """
+    Get the shared prometheus client of url, connections of its session are kept alive and reused
+
+    Args:
+        url(str): e.g http://127.0.0.1:9090
+        pool_size(int): maximum number of idle connections kept to prometheus
+        timeout(tuple): connect timeout and read timeout in seconds
+
+    Returns:
+        PrometheusConnect
+    """
+    client = _PROMETHEUS_CLIENTS.get(url)
+    if client is None:
+        session = requests.Session()
+        client = PrometheusConnect(url=url, disable_ssl=True, session=session, timeout=timeout)
+        # keep the retry policy mounted by the client, only the pool size is changed
+        retry = session.get_adapter(url).max_retries
+        session.mount(url, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+        _PROMETHEUS_CLIENTS[url] = client
+    return client
 
 
 class MetricProxy(PromDbProxy):
@@ -40,6 +134,30 @@ class MetricProxy(PromDbProxy):
         PromDbProxy.__init__(self, configuration, host, port)
         self.default_instance_port = configuration.agent.get('DEFAULT_INSTANCE_PORT') or 9100
         self.query_range_step = configuration.prometheus.get('QUERY_RANGE_STEP') or "15s"
+        self.query_concurrency = int(configuration.prometheus.get('QUERY_CONCURRENCY') or 10)
+        self.query_deadline = configuration.prometheus.get('QUERY_DEADLINE') or None
+        self.series_lookback = int(configuration.prometheus.get('SERIES_CATALOG_LOOKBACK') or 300)
+        self.fleet_chunk_size = int(configuration.prometheus.get('FLEET_QUERY_CHUNK_SIZE') or 200)
+        self.pool_size = int(configuration.prometheus.get('POOL_SIZE') or 20)
+        self.timeout = (
+            float(configuration.prometheus.get('CONNECT_TIMEOUT') or 3),
+            float(configuration.prometheus.get('READ_TIMEOUT') or 30),
+        )
+
+    def connect(self) -> bool:
+        """
+        Use the shared prometheus client instead of creating a new one and new connections for every request
+
+        Returns:
+            bool
+        """
+        try:
+            self._prom = _get_prometheus_client("http://%s:%s" % (self._host, self._port), self.pool_size, self.timeout)
+        except (ValueError, TypeError, PrometheusApiClientException) as error:
+            LOGGER.error(error)
+            LOGGER.error("Prometheus connect failed")
+            return False
+        return True
 
     @staticmethod
     def __metric_dict2str(metric: Dict) -> str:
@@ -104,16 +222,12 @@ class MetricProxy(PromDbProxy):
         host_ip = query_host["host_ip"]
         host_port = query_host.get("instance_port", self.default_instance_port)
 
-        ret, metric_list = self.query_metric_list_of_host(host_ip, host_port)
+        ret, catalog = self.query_series_catalog(host_ip, host_port)
 
         if ret != SUCCEED:
             return ret, res
 
-        for metric in metric_list:
-            metric = metric.split('{')[0]
-            if metric not in query_metric_names:
-                query_metric_names.append(metric)
-
+        query_metric_names.extend(catalog)
         return ret, res
 
     def query_metric_list(self, data: Dict[str, str]) -> Tuple[int, dict]:
@@ -154,23 +268,13 @@ class MetricProxy(PromDbProxy):
         host_ip = query_host["host_ip"]
         host_port = query_host.get("instance_port", self.default_instance_port)
 
-        ret, metric_list = self.query_metric_list_of_host(
-            host_ip,
-            host_port,
-        )
+        ret, metric_lists = self.query_metric_lists_of_host(host_ip, host_port, query_metric)
 
         if ret != SUCCEED:
             LOGGER.warning("Host metric list query error")
             return ret, res
 
-        for query_metric_name in query_metric:
-            query_metric_list[query_metric_name] = []
-            for metric in metric_list:
-                metric_name = metric.split('{')[0]
-                if metric_name != query_metric_name:
-                    continue
-                query_metric_list[query_metric_name].append(metric)
-
+        query_metric_list.update(metric_lists)
         return ret, res
 
     def query_metric_data(self, data: Dict[str, str]) -> Tuple[int, dict]:
@@ -190,7 +294,11 @@ class MetricProxy(PromDbProxy):
                             "metric2{label1="label1_value", label2="label2_value", ..., }",
                             "metric2{label1="label1_value", label2="label2_value", ..., }",
                         ]
-                    }
+                    },
+                    "merge_series": False,  // optional, query all series of a metric with one query
+                    "max_points": 1000,     // optional, maximum number of points of a series
+                    "downsample": "lttb",   // optional, lttb or minmax, used when max_points is set
+                    "format": "pairs"       // optional, pairs, columnar, base64 or msgpack, see encode_series
                 }
 
         Returns:
@@ -224,26 +332,18 @@ class MetricProxy(PromDbProxy):
         time_range = data.get('time_range')
         query_ip = data.get('query_ip')
         query_info = data.get('query_info')
+        merge_series = data.get('merge_series', False)
+        max_points = data.get('max_points')
 
         query_host = {"host_id": "query_host_id", "host_ip": query_ip}
 
         host_ip = query_host["host_ip"]
         host_port = query_host.get("instance_port", self.default_instance_port)
 
-        query_host_list = [query_host]
         query_data = {}
         res = {'results': query_data}
 
-        # adjust query range step based on query time range
-        # the default query range step is 15 seconds
-        QUERY_RANGE_STEP = 15
-        query_range_step = QUERY_RANGE_STEP
-        query_range_seconds = time_range[1] - time_range[0]
-        total_query_times = query_range_seconds / query_range_step
-
-        while total_query_times > 11000:
-            query_range_step += 15
-            total_query_times = query_range_seconds / query_range_step
+        query_range_step = self.__get_range_step(time_range)
 
         def add_two_dim_dict(thedict, key_a, key_b, val):
             if key_a in thedict:
@@ -254,24 +354,320 @@ class MetricProxy(PromDbProxy):
         if not query_info:
             return SUCCEED, res
 
+        if merge_series:
+            status, results = self.__query_data_by_metric(query_info, host_ip, host_port, time_range, query_range_step)
+            query_data.update(results)
+            self.__downsample_data(query_data, max_points, data.get('downsample', LTTB))
+            self.__encode_data(query_data, query_range_step, data.get('format', PAIRS))
+            return status, res
+
+        empty_metrics, tasks = self.__get_series_tasks(query_info, host_ip, host_port)
+        query_data.update((metric_name, []) for metric_name in empty_metrics)
+
+        # series are queried concurrently, so the response time is set by the slowest query
+        query_results = _run_concurrently(
+            lambda metric_name, metric_info: self.__query_series(host_ip, metric_info, time_range, query_range_step),
+            tasks,
+            self.query_concurrency,
+            float(self.query_deadline) if self.query_deadline else None,
+        )
+        status = SUCCEED
+        for (metric_name, metric_info), values in zip(tasks, query_results):
+            # a failed query returns an empty list, None is a query killed at the deadline or raised an error
+            if values is None:
+                status = PARTIAL_SUCCEED
+            add_two_dim_dict(query_data, metric_name, metric_info, values or [])
+
+        self.__downsample_data(query_data, max_points, data.get('downsample', LTTB))
+        self.__encode_data(query_data, query_range_step, data.get('format', PAIRS))
+        return status, res
+
+    def query_metric_data_stream(self, data: Dict[str, str]) -> Iterator[dict]:
+        """
+        Query metric data like query_metric_data, but every series is yielded as soon as its query is finished,
+        so the result of all series is never kept in memory
+        Args:
+            data(dict): same as query_metric_data, except that format can't be msgpack
+
+        Yields:
+            dict: data of a series, e.g
+                {
+                    "metric": "metric1",
+                    "series": "metric1{label1="label1_value", label2="label2_value", ..., }",
+                    "values": [[1658926441, '0'], [1658926456, '0']]
+                }
+                series is None and values is empty for a metric without any series. The last one is
+                {"label": status code}, status code is PARTIAL_SUCCEED when some series are not finished
+                before the query deadline.
+        """
+        time_range = data.get('time_range')
+        host_ip = data.get('query_ip')
+        host_port = self.default_instance_port
+        query_info = data.get('query_info') or {}
+        query_range_step = self.__get_range_step(time_range)
+        deadline = float(self.query_deadline) if self.query_deadline else None
+        if data.get('merge_series', False):
+            tasks = [(metric_name, host_ip, host_port, time_range, query_range_step) for metric_name in query_info]
+            query_results = _iter_concurrently(self.__query_range_of_metric, tasks, self.query_concurrency, deadline)
+            empty_metrics = []
+        else:
+            empty_metrics, tasks = self.__get_series_tasks(query_info, host_ip, host_port)
+            query_results = _iter_concurrently(
+                lambda metric_name, metric_info: {
+                    metric_info: self.__query_series(host_ip, metric_info, time_range, query_range_step) or []
+                },
+                tasks,
+                self.query_concurrency,
+                deadline,
+            )
+
+        for metric_name in empty_metrics:
+            yield {"metric": metric_name, "series": None, "values": []}
+        done = 0
+        for index, series_data in query_results:
+            done += 1
+            metric_name = tasks[index][0]
+            metric_list = query_info.get(metric_name)
+            series_data = series_data or {}
+            if data.get('merge_series', False) and metric_list:
+                series_data = {metric_info: series_data.get(metric_info) or [] for metric_info in metric_list}
+            if not series_data:
+                yield {"metric": metric_name, "series": None, "values": []}
+            self.__downsample_data({metric_name: series_data}, data.get('max_points'), data.get('downsample', LTTB))
+            self.__encode_data({metric_name: series_data}, query_range_step, data.get('format', PAIRS))
+            for metric_info, values in series_data.items():
+                yield {"metric": metric_name, "series": metric_info, "values": values}
+        yield {"label": SUCCEED if done == len(tasks) else PARTIAL_SUCCEED}
+
+    def __get_series_tasks(
+        self, query_info: Dict[str, List[str]], host_ip: str, host_port: int
+    ) -> Tuple[List[str], List[tuple]]:
+        """
+        Get series to query, series of metrics given by name only are discovered with one query
+
+        Returns:
+            list: metrics without any series
+            list: (metric name, series) of every series
+        """
+        unresolved_metrics = [metric_name for metric_name, metric_list in query_info.items() if not metric_list]
+        _, discovered_metric_lists = self.query_metric_lists_of_host(host_ip, host_port, unresolved_metrics)
+
+        empty_metrics, tasks = [], []
         for metric_name, metric_list in query_info.items():
             if not metric_list:
-                _, metric_list = self.query_metric_list_of_host(host_ip, host_port, metric_name)
+                metric_list = discovered_metric_lists.get(metric_name, [])
             if not metric_list:
-                query_data[metric_name] = []
-            for metric_info in metric_list:
-                data_status, monitor_data = self.query_data(
-                    time_range=time_range,
-                    host_list=query_host_list,
-                    metric=metric_info,
-                    adjusted_range_step=query_range_step,
-                )
-                values = []
-                if data_status == SUCCEED:
-                    values = monitor_data[query_host["host_id"]][metric_info]
-                add_two_dim_dict(query_data, metric_name, metric_info, values)
+                empty_metrics.append(metric_name)
+            tasks.extend((metric_name, metric_info) for metric_info in metric_list)
+        return empty_metrics, tasks
 
-        return SUCCEED, res
+    def __query_series(self, host_ip: str, metric_info: str, time_range: List[int], range_step: int) -> list:
+        """
+        Query data of a series, or of a metric given by name only
+        """
+        if metric_info.find('{') == -1:
+            query_host = {"host_id": "query_host_id", "host_ip": host_ip}
+            data_status, monitor_data = self.query_data(
+                time_range=time_range,
+                host_list=[query_host],
+                metric=metric_info,
+                adjusted_range_step=range_step,
+            )
+            if data_status != SUCCEED:
+                return []
+            return monitor_data[query_host["host_id"]].get(metric_info) or []
+        # a series with labels is already resolved, so it's queried without discovering it again
+        _, data_list = self.__query_data_by_host([metric_info], time_range, range_step)
+        return data_list[metric_info] or []
+
+    @staticmethod
+    def __get_range_step(time_range: List[int]) -> int:
+        """
+        adjust query range step based on query time range, the default query range step is 15 seconds
+        """
+        QUERY_RANGE_STEP = 15
+        query_range_step = QUERY_RANGE_STEP
+        query_range_seconds = time_range[1] - time_range[0]
+        total_query_times = query_range_seconds / query_range_step
+
+        while total_query_times > 11000:
+            query_range_step += 15
+            total_query_times = query_range_seconds / query_range_step
+        return query_range_step
+
+    def query_fleet_data(
+        self, host_list: List[dict], metric_names: List[str], time_range: List[int], **kwargs
+    ) -> Tuple[int, dict]:
+        """
+        Query data of metrics on many hosts, every metric is queried with one query for a chunk of hosts
+        Args:
+            host_list(list): e.g [{"host_id": 1, "host_ip": "172.168.128.164"}]
+            metric_names(list): e.g ["metric1", "metric2"]
+            time_range(list): time range to query
+            kwargs: max_points and downsample, same as query_metric_data
+
+        Returns:
+            int: status code
+            dict: e.g
+            {
+                'results': {
+                    1: {
+                        "metric1": {
+                            'metric1{instance="172.168.128.164:9100",label1="value1"}': [[1658926441, '0']]
+                        },
+                        "metric2": {}
+                    }
+                }
+            }
+        """
+        query_data = {host["host_id"]: {metric_name: {} for metric_name in metric_names} for host in host_list}
+        res = {'results': query_data}
+        if not host_list or not metric_names:
+            return SUCCEED, res
+
+        instance_hosts = {}
+        for host in host_list:
+            instance = "%s:%s" % (host["host_ip"], host.get("instance_port") or self.default_instance_port)
+            instance_hosts.setdefault(instance, []).append(host["host_id"])
+        instances = list(instance_hosts)
+        chunk_size = self.fleet_chunk_size
+        chunks = [instances[index : index + chunk_size] for index in range(0, len(instances), chunk_size)]
+        query_range_step = self.__get_range_step(time_range)
+        # dots of ip are escaped in the regex, and the backslash is escaped again in the promql string
+        instance_regexes = [
+            "|".join(re.escape(instance) for instance in chunk).replace("\\", "\\\\") for chunk in chunks
+        ]
+        tasks = [
+            ('%s{instance=~"%s"}' % (metric_name, instance_regex),)
+            for metric_name in metric_names
+            for instance_regex in instance_regexes
+        ]
+        query_results = _run_concurrently(
+            lambda query_str: self.__query_range(query_str, time_range, query_range_step),
+            tasks,
+            self.query_concurrency,
+            float(self.query_deadline) if self.query_deadline else None,
+        )
+
+        status = SUCCEED
+        for query_result in query_results:
+            if query_result is None:
+                status = PARTIAL_SUCCEED
+                continue
+            for series in query_result:
+                metric_dict = series.get("metric", {})
+                metric_str = self.__metric_dict2str(metric_dict)
+                for host_id in instance_hosts.get(metric_dict.get("instance"), []):
+                    query_data[host_id].setdefault(metric_dict["__name__"], {})[metric_str] = series.get("values", [])
+        for host_data in query_data.values():
+            self.__downsample_data(host_data, kwargs.get("max_points"), kwargs.get("downsample") or LTTB)
+        return status, res
+
+    def __query_range(self, query_str: str, time_range: List[int], range_step: int) -> Optional[list]:
+        """
+        Run a range query, finished time buckets of the result are read from the range query cache
+
+        Returns:
+            list: matrix of the result, None when the query failed
+        """
+        return RANGE_QUERY_CACHE.query(query_str, time_range[0], time_range[1], range_step, self.__fetch_range)
+
+    def __fetch_range(self, query_str: str, start: int, end: int, range_step: int) -> Optional[list]:
+        try:
+            return self._prom.custom_query_range(
+                query=query_str,
+                start_time=datetime.datetime.fromtimestamp(start),
+                end_time=datetime.datetime.fromtimestamp(end),
+                step=range_step,
+            )
+        except (ValueError, TypeError, RequestException, PrometheusApiClientException) as error:
+            LOGGER.error("Prometheus query %s in %d-%d failed. %s" % (query_str, start, end, error))
+            return None
+
+    @staticmethod
+    def __downsample_data(query_data: Dict[str, Dict[str, list]], max_points: Optional[int], method: str) -> None:
+        """
+        Downsample every series of query result in place when max_points is set
+        """
+        if not max_points:
+            return
+        for series_data in query_data.values():
+            if not series_data:
+                continue
+            for metric_info, values in series_data.items():
+                series_data[metric_info] = downsample(values, max_points, method)
+
+    @staticmethod
+    def __encode_data(query_data: Dict[str, Dict[str, list]], range_step: int, response_format: str) -> None:
+        """
+        Encode every series of query result in place, see encode_series
+        """
+        if response_format == PAIRS:
+            return
+        for series_data in query_data.values():
+            if not series_data:
+                continue
+            for metric_info, values in series_data.items():
+                series_data[metric_info] = encode_series(values, range_step, response_format)
+
+    def __query_data_by_metric(
+        self, query_info: Dict[str, List[str]], host_ip: str, host_port: int, time_range: List[int], range_step: int
+    ) -> Tuple[int, Dict[str, Dict[str, list]]]:
+        """
+        Query all series of every metric with one range query, and split the result into series
+
+        Args:
+            query_info(dict): series of every metric, all series of a metric are returned when it's empty
+            host_ip(str): host ip
+            host_port(int): host port
+            time_range(list): time range to query
+            range_step(int): query range step
+
+        Returns:
+            int: status code, PARTIAL_SUCCEED when some metrics are not finished before the query deadline
+            dict: same as results of query_metric_data
+        """
+        status = SUCCEED
+        results = {}
+        tasks = [(metric_name, host_ip, host_port, time_range, range_step) for metric_name in query_info]
+        query_results = _run_concurrently(
+            self.__query_range_of_metric,
+            tasks,
+            self.query_concurrency,
+            float(self.query_deadline) if self.query_deadline else None,
+        )
+        for (metric_name, metric_list), data_list in zip(query_info.items(), query_results):
+            if data_list is None:
+                status = PARTIAL_SUCCEED
+            data_list = data_list or {}
+            if metric_list:
+                data_list = {metric_info: data_list.get(metric_info) or [] for metric_info in metric_list}
+            results[metric_name] = data_list or []
+        return status, results
+
+    def __query_range_of_metric(
+        self, metric_name: str, host_ip: str, host_port: int, time_range: List[int], range_step: int
+    ) -> Dict[str, list]:
+        """
+        Query data of all series of a metric on a host with one range query
+
+        Returns:
+            dict: data of every series, e.g
+                {
+                    'metric1{instance="172.168.128.164:9100",label1="value1"}': [[time1, 'value1'], [time2, 'value2']]
+                }
+        """
+        query_str = "%s{instance=\"%s:%s\"}" % (metric_name, host_ip, host_port)
+        data = self.__query_range(query_str, time_range, range_step)
+        if data is None:
+            return {}
+
+        data_list = {}
+        for series in data or []:
+            metric_str = self.__metric_dict2str(series.get("metric", {}))
+            if metric_str and "values" in series:
+                data_list[metric_str] = series["values"]
+        return data_list
 
     def query_data(
         self,
@@ -403,6 +799,78 @@ class MetricProxy(PromDbProxy):
             LOGGER.error("host %s:%d Prometheus query metric list failed. %s" % (host_ip, host_port, error))
             return DATABASE_QUERY_ERROR, []
 
+    def query_metric_lists_of_host(
+        self, host_ip: str, host_port: Optional[int] = None, metric_names: Optional[List[str]] = None
+    ) -> Tuple[int, Dict[str, List[str]]]:
+        """
+        Query series of several metrics of a host from the series catalog cache
+        Args:
+            host_ip(str): host ip
+            host_port(int): host port
+            metric_names(list): metric names, e.g ["metric1", "metric2"]
+
+        Returns:
+            ret(int): query ret
+            metric_lists(dict): series of every metric name, e.g
+                {
+                    "metric1": ['metric1{label1="value1", label2="value2"}'],
+                    "metric2": []
+                }
+        """
+        metric_lists = {metric_name: [] for metric_name in metric_names or []}
+        if not metric_lists:
+            return SUCCEED, metric_lists
+        ret, catalog = self.query_series_catalog(host_ip, host_port)
+        for metric_name in metric_lists:
+            metric_lists[metric_name] = list(catalog.get(metric_name, []))
+        return ret, metric_lists
+
+    def query_series_catalog(self, host_ip: str, host_port: Optional[int] = None) -> Tuple[int, Dict[str, List[str]]]:
+        """
+        Get series of every metric of a host from the series catalog cache
+        Args:
+            host_ip(str): host ip
+            host_port(int): host port
+
+        Returns:
+            ret(int): query ret
+            catalog(dict): e.g
+                {
+                    "metric1": ['metric1{label1="value1", label2="value2"}']
+                }
+        """
+        host_port = host_port or self.default_instance_port
+        instance = "%s:%s" % (host_ip, host_port)
+        try:
+            catalog = SERIES_CATALOG.get(instance, lambda: self.__load_series_catalog(instance))
+        except (ValueError, TypeError, RequestException, PrometheusApiClientException) as error:
+            LOGGER.error("host %s Prometheus query metric series failed. %s" % (instance, error))
+            return DATABASE_QUERY_ERROR, {}
+        if not catalog:
+            LOGGER.error("Query metric list result is empty. Can not get metric list of host %s" % instance)
+            return NO_DATA, {}
+        return SUCCEED, catalog
+
+    def __load_series_catalog(self, instance: str) -> Dict[str, List[str]]:
+        """
+        Load series of an instance with the series metadata api, which returns labels without values
+
+        Returns:
+            dict: series of every metric
+        """
+        end_time = datetime.datetime.now()
+        start_time = end_time - datetime.timedelta(seconds=self.series_lookback)
+        label_sets = self._prom.get_series(
+            start=start_time, end=end_time, params={"match[]": "{instance=\"%s\"}" % instance}
+        )
+        catalog = {}
+        for metric_dict in label_sets or []:
+            metric_str = self.__metric_dict2str(metric_dict)
+            if metric_str:
+                # series are kept in insertion order, the inner dict works as an ordered set
+                catalog.setdefault(metric_dict["__name__"], {})[metric_str] = None
+        return {metric_name: list(series) for metric_name, series in catalog.items()}
+
     def __query_data_by_host(
         self, metrics_list: List[str], time_range: List[int], adjusted_range_step: Optional[int] = None
     ) -> Tuple[int, Dict]:
@@ -424,9 +892,6 @@ class MetricProxy(PromDbProxy):
                 }
 
         """
-        start_time = datetime.datetime.fromtimestamp(time_range[0])
-        end_time = datetime.datetime.fromtimestamp(time_range[1])
-
         query_range_step = self.query_range_step
         if adjusted_range_step is not None:
             query_range_step = adjusted_range_step
@@ -434,25 +899,18 @@ class MetricProxy(PromDbProxy):
         data_list = {}
         ret = SUCCEED
         for metric in metrics_list:
-            try:
-                data = self._prom.custom_query_range(
-                    query=metric, start_time=start_time, end_time=end_time, step=query_range_step
-                )
-                if not data or "values" not in data[0]:
-                    LOGGER.debug(
-                        "Query data result is empty. "
-                        "metric %s in %d-%d doesn't record in the prometheus " % (metric, time_range[0], time_range[1])
-                    )
-                    data_list[metric] = None
-                    ret = PARTIAL_SUCCEED
-                    continue
-                data_list[metric] = data[0]["values"]
-
-            except (ValueError, TypeError, PrometheusApiClientException) as error:
-                LOGGER.error(
-                    "Prometheus metric %s in %d-%d query data failed. %s"
-                    % (metric, time_range[0], time_range[1], error)
+            data = self.__query_range(metric, time_range, query_range_step)
+            if data is None:
+                data_list[metric] = None
+                ret = PARTIAL_SUCCEED
+                continue
+            if not data or "values" not in data[0]:
+                LOGGER.debug(
+                    "Query data result is empty. "
+                    "metric %s in %d-%d doesn't record in the prometheus " % (metric, time_range[0], time_range[1])
                 )
                 data_list[metric] = None
                 ret = PARTIAL_SUCCEED
+                continue
+            data_list[metric] = data[0]["values"]
         return ret, data_list
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: tables and indexes of zeus
+"""
+import sqlalchemy
+from sqlalchemy import Boolean, Column, Index, Integer, String, Text
+from sqlalchemy.engine import Engine
+
+from vulcanus.database.table import Base, Host
+from vulcanus.log.log import LOGGER
+
+# host name and ssh address are unique for one user, duplicate checks of host add and update use them
+HOST_INDEXES = [
+    Index("host_user_name_unique", Host.user, Host.host_name, unique=True),
+    Index("host_user_address_unique", Host.user, Host.host_ip, Host.ssh_port, unique=True),
+]
+
+
+class CveTaskHost(Base):
+    """
+    journal of cve fix tasks, one record for a task on a host. It's created by create_utils_tables with
+    the other tables of Base.
+    """
+
+    __tablename__ = "cve_task_host"
+
+    id = Column(Integer, autoincrement=True, primary_key=True)
+    task_id = Column(String(64), nullable=False, index=True)
+    host_id = Column(Integer, nullable=False)
+    # pending, running, succeed or fail
+    status = Column(String(20), nullable=False, index=True)
+    # zeus process executing the task on the host, it's interrupted when the process is not alive
+    owner = Column(String(64))
+    # json of the task of the host
+    task_info = Column(Text)
+    # json of the execute result on the host
+    result = Column(Text)
+    # whether the result is delivered to apollo, a finished host which is not delivered is posted again
+    callback_delivered = Column(Boolean, nullable=False, default=False)
+    update_time = Column(Integer)
+
+
+class CveTaskContext(Base):
+    """
+    journal of cve fix tasks, info shared by all hosts of a task which is needed to resume it
+    """
+
+    __tablename__ = "cve_task_context"
+
+    task_id = Column(String(64), primary_key=True)
+    username = Column(String(40), nullable=False)
+    # json of callback url and check items of the task
+    context = Column(Text)
+    update_time = Column(Integer)
+
+
+def create_indexes(engine: Engine) -> None:
+    """
+    Create indexes on existing tables, an index is skipped when existing data violates it
+    """
+    for index in HOST_INDEXES:
+        try:
+            index.create(bind=engine, checkfirst=True)
+        except sqlalchemy.exc.SQLAlchemyError as error:
+            LOGGER.warning(f"create index {index.name} failed, duplicate hosts may exist: {error}")
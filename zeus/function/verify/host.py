@@ -58,6 +58,8 @@ class GetHostSchema(Schema):
     direction = fields.String(required=False, validate=validate.OneOf(["desc", "asc"]))
     page = fields.Integer(required=False, validate=lambda s: s > 0)
     per_page = fields.Integer(required=False, validate=lambda s: 50 > s > 0)
+    cursor = fields.String(required=False)
+    with_total = fields.Boolean(required=False)
 
 
 class AddHostGroupSchema(Schema):
@@ -86,6 +88,8 @@ class GetHostGroupSchema(Schema):
     direction = fields.String(required=False, validate=validate.OneOf(["desc", "asc"]))
     page = fields.Integer(required=False, validate=lambda s: s > 0)
     per_page = fields.Integer(required=False, validate=lambda s: 50 > s > 0)
+    cursor = fields.String(required=False)
+    with_total = fields.Boolean(required=False)
 
 
 class GetHostInfoSchema(Schema):
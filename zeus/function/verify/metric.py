@@ -10,7 +10,9 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
+
+from zeus.metric_manager.series import DOWNSAMPLE_METHODS, MSGPACK, RESPONSE_FORMATS
 
 
 class QueryHostMetricNamesSchema(Schema):
@@ -21,6 +23,26 @@ class QueryHostMetricDataSchema(Schema):
     time_range = fields.List(fields.Integer, required=True)
     query_ip = fields.String(required=True)
     query_info = fields.Dict()
+    merge_series = fields.Boolean(required=False)
+    max_points = fields.Integer(required=False, validate=lambda s: s >= 3)
+    downsample = fields.String(required=False, validate=validate.OneOf(DOWNSAMPLE_METHODS))
+    format = fields.String(required=False, validate=validate.OneOf(RESPONSE_FORMATS))
+
+
+class QueryHostMetricDataStreamSchema(QueryHostMetricDataSchema):
+    # every line of the stream is json
+    format = fields.String(
+        required=False, validate=validate.OneOf([item for item in RESPONSE_FORMATS if item != MSGPACK])
+    )
+
+
+class QueryFleetMetricDataSchema(Schema):
+    time_range = fields.List(fields.Integer, required=True)
+    host_list = fields.List(fields.Integer, required=False)
+    host_group_list = fields.List(fields.String, required=False)
+    metric_names = fields.List(fields.String, required=True, validate=lambda s: len(s) > 0)
+    max_points = fields.Integer(required=False, validate=lambda s: s >= 3)
+    downsample = fields.String(required=False, validate=validate.OneOf(DOWNSAMPLE_METHODS))
 
 
 class QueryHostMetricListSchema(Schema):
@@ -32,6 +32,8 @@ class TaskGeneralSchema(Schema):
     check_items = fields.List(fields.String(validate=lambda s: len(s) > 0), required=True)
     tasks = fields.List(fields.Nested(Task()), required=True, validate=lambda s: len(s) > 0)
     callback = fields.String(required=True)
+    # run the task in background and respond with a task handle at once
+    asynchronous = fields.Boolean(required=False)
 
 
 class RepoInfo(Schema):
@@ -58,6 +60,8 @@ class CveScanSchema(TaskGeneralSchema):
     """
 
     task_name = fields.String(required=False, validate=lambda s: len(s) > 0)
+    # reuse the last result of hosts whose packages and repos are not changed
+    incremental = fields.Boolean(required=False)
 
 
 class CveFixInfoSchema(Schema):
@@ -92,3 +96,11 @@ class CveRollbackSchema(TaskGeneralSchema):
 
     class Meta:
         fields = ("tasks", "task_id", "task_name", "total_hosts", "task_type", "callback")
+
+
+class CveTaskResultSchema(Schema):
+    """
+    validator for querying the result of an asynchronous task
+    """
+
+    handle = fields.String(required=True, validate=lambda s: len(s) > 0)
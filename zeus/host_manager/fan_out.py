@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: run a function over many hosts with shared concurrency limits
+"""
+import time
+import weakref
+from typing import Any, Callable, Iterator, List, Optional
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from gevent.pool import Pool
+from gevent.queue import Empty, Queue
+
+from vulcanus.log.log import LOGGER
+from zeus.conf import configuration
+
+__all__ = ["FanOutHandler"]
+
+# process-wide limits shared by every fan-out, so the load on managed hosts can be tuned in one place
+FAN_OUT_CONCURRENCY = int(configuration.ssh.get("FAN_OUT_CONCURRENCY") or 100)
+FAN_OUT_PER_HOST_LIMIT = int(configuration.ssh.get("FAN_OUT_PER_HOST_LIMIT") or 4)
+FAN_OUT_TIMEOUT = configuration.ssh.get("FAN_OUT_TIMEOUT")
+
+_GLOBAL_SEMAPHORE = BoundedSemaphore(FAN_OUT_CONCURRENCY)
+# a semaphore is kept only while tasks of its target hold a reference to it, so idle targets are dropped
+_TARGET_SEMAPHORES: "weakref.WeakValueDictionary[Any, BoundedSemaphore]" = weakref.WeakValueDictionary()
+
+
+def _get_target_semaphore(target) -> BoundedSemaphore:
+    semaphore = _TARGET_SEMAPHORES.get(target)
+    if semaphore is None:
+        semaphore = _TARGET_SEMAPHORES[target] = BoundedSemaphore(FAN_OUT_PER_HOST_LIMIT)
+    return semaphore
+
+
+class FanOutHandler:
+    """
+    Run a function over many hosts in greenlets, results are returned as they complete.
+
+    Every task holds a slot of the process-wide concurrency limit and a slot of its target host
+    while it runs, so concurrent requests share the same limits. The slot of the target is acquired
+    first, so tasks waiting for a busy host never hold slots needed by tasks of other hosts.
+
+    Attributes:
+        func(Callable): function called as func(*task)
+        tasks(list): list of argument tuples, e.g [(host_info_1, task_info), (host_info_2, task_info)]
+        target(Callable): get the target host of a task, tasks of the same target are limited by
+            fan_out_per_host_limit. No per-target limit is applied when it's None.
+        concurrency(int): maximum number of running tasks of this fan-out, default is fan_out_concurrency
+        timeout(float): maximum seconds of one task, default is fan_out_timeout
+        deadline(float): maximum seconds of the whole fan-out, unfinished tasks are killed after it
+        fallback(Callable): called as fallback(*task, error) to generate the result of a task which
+            raised an error, timed out or was killed by the deadline. The task is left out of the
+            result when it's None.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        tasks: List[tuple],
+        target: Optional[Callable] = None,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        fallback: Optional[Callable] = None,
+    ):
+        self.func = func
+        self.tasks = list(tasks)
+        self.target = target
+        self.concurrency = concurrency or FAN_OUT_CONCURRENCY
+        self.timeout = timeout if timeout is not None else FAN_OUT_TIMEOUT
+        self.deadline = deadline
+        self.fallback = fallback
+        self._result = []
+
+    def _fail(self, task: tuple, error: BaseException):
+        if self.fallback is None:
+            return None
+        return self.fallback(*task, error)
+
+    def _run_task(self, index: int, task: tuple, results: Queue) -> None:
+        target_semaphore = _get_target_semaphore(self.target(*task)) if self.target else None
+        value = None
+        try:
+            if target_semaphore is not None:
+                target_semaphore.acquire()
+            try:
+                with _GLOBAL_SEMAPHORE:
+                    value = self._call(task)
+            finally:
+                if target_semaphore is not None:
+                    target_semaphore.release()
+        except Exception as error:  # pylint: disable=W0703
+            LOGGER.error(f"execute task {task[0]!r} failed: {error}")
+            value = self._fail(task, error)
+        results.put((index, value))
+
+    def _call(self, task: tuple) -> Any:
+        timer = gevent.Timeout(float(self.timeout) if self.timeout else None)
+        timer.start()
+        try:
+            return self.func(*task)
+        except gevent.Timeout as error:
+            if error is not timer:
+                raise
+            LOGGER.error(f"task {task[0]!r} timed out after {self.timeout} seconds")
+            return self._fail(task, error)
+        finally:
+            timer.close()
+
+    def as_completed(self) -> Iterator[Any]:
+        """
+        execute all tasks and yield their results in order of completion
+
+        Yields:
+            result of each task, tasks without result are skipped
+        """
+        if not self.tasks:
+            return
+        results = Queue()
+        pool = Pool(self.concurrency)
+        # spawning blocks when the pool is full, so it's done in its own greenlet
+        spawner = gevent.spawn(
+            lambda: [pool.spawn(self._run_task, index, task, results) for index, task in enumerate(self.tasks)]
+        )
+        end_time = time.monotonic() + self.deadline if self.deadline else None
+        unfinished = set(range(len(self.tasks)))
+        try:
+            while unfinished:
+                timeout = max(end_time - time.monotonic(), 0) if end_time else None
+                try:
+                    index, value = results.get(timeout=timeout)
+                except Empty:
+                    break
+                unfinished.discard(index)
+                if value is not None:
+                    yield value
+        finally:
+            spawner.kill()
+            pool.kill()
+
+        if unfinished:
+            LOGGER.error(f"{len(unfinished)} tasks are not finished in {self.deadline} seconds")
+            deadline_error = gevent.Timeout(self.deadline)
+            for index in sorted(unfinished):
+                value = self._fail(self.tasks[index], deadline_error)
+                if value is not None:
+                    yield value
+
+    def execute(self, callback: Optional[Callable] = None) -> None:
+        """
+        execute all tasks and collect their results
+
+        Args:
+            callback(Callable): called with the result of each task as soon as it completes
+        """
+        self._result = []
+        for value in self.as_completed():
+            if callback is not None:
+                callback(value)
+            self._result.append(value)
+
+    def get_result(self) -> List[Any]:
+        """
+        Returns:
+            list: results collected by execute, in order of completion
+        """
+        return self._result
@@ -10,27 +10,64 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import hashlib
 import socket
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
 from io import StringIO
-from typing import Tuple
+from typing import Dict, List, Tuple
 
+import gevent
 import paramiko
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from gevent.queue import Empty, Full, Queue
 
 from vulcanus.log.log import LOGGER
 from vulcanus.restful.resp import state
 
-__all__ = ["SSH", "generate_key", "execute_command_and_parse_its_result"]
+__all__ = [
+    "SSH",
+    "SSHConnectionPool",
+    "CONNECTION_POOL",
+    "PrivateKeyCache",
+    "PKEY_CACHE",
+    "forget_private_key",
+    "KeyPairFactory",
+    "KEY_PAIR_FACTORY",
+    "generate_key",
+    "execute_command_and_parse_its_result",
+]
 
+from zeus.conf import configuration
 from zeus.function.model import ClientConnectArgs
 
 
-def generate_key() -> Tuple[str, str]:
+SUPPORTED_KEY_TYPES = ("rsa", "ed25519")
+
+
+def generate_key_pair(key_type: str = "rsa") -> Tuple[str, str]:
     """
-    generate RSA key pair
+    generate a key pair synchronously
+
+    Args:
+        key_type(str): rsa or ed25519
 
     Returns:
         tuple:(private key, public key )
     """
+    if key_type == "ed25519":
+        key = ed25519.Ed25519PrivateKey.generate()
+        private_key = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.OpenSSH, serialization.NoEncryption()
+        ).decode()
+        public_key = (
+            key.public_key().public_bytes(serialization.Encoding.OpenSSH, serialization.PublicFormat.OpenSSH).decode()
+        )
+        return private_key, public_key
+
     output = StringIO()
     key = paramiko.RSAKey.generate(2048)
     key.write_private_key(output)
@@ -39,6 +76,83 @@ def generate_key() -> Tuple[str, str]:
     return private_key, public_key
 
 
+class KeyPairFactory:
+    """
+    Keep a bounded pool of ready key pairs which are generated in the threadpool of the gevent hub,
+    so onboarding a host only pops a key pair instead of generating it in a request
+
+    Attributes:
+        key_type(str): rsa or ed25519
+        pool_size(int): number of key pairs kept ready
+        wait_timeout(float): seconds to wait for the pool when it's empty, the key pair is generated
+            for the request after that
+    """
+
+    def __init__(self, key_type: str = "rsa", pool_size: int = 20, wait_timeout: float = 30):
+        if key_type not in SUPPORTED_KEY_TYPES:
+            LOGGER.warning(f"unsupported ssh key type {key_type}, rsa is used instead")
+            key_type = "rsa"
+        self.key_type = key_type
+        self.pool_size = pool_size
+        self.wait_timeout = wait_timeout
+        self._key_pairs = Queue(maxsize=max(pool_size, 1))
+        self._pending = 0
+
+    def _generate(self) -> Tuple[str, str]:
+        # generating a rsa key takes a while, it's done in a native thread so other greenlets keep running
+        return gevent.get_hub().threadpool.apply(generate_key_pair, (self.key_type,))
+
+    def _refill(self) -> None:
+        """
+        start generation greenlets until ready and pending key pairs reach the pool size
+        """
+        for _ in range(self.pool_size - self._key_pairs.qsize() - self._pending):
+            self._pending += 1
+            gevent.spawn(self._fill)
+
+    def _fill(self) -> None:
+        try:
+            self._key_pairs.put_nowait(self._generate())
+        except Full:
+            pass
+        except Exception as error:  # pylint: disable=W0703
+            LOGGER.error(f"generate ssh key pair in background failed: {error}")
+        finally:
+            self._pending -= 1
+
+    def get(self) -> Tuple[str, str]:
+        """
+        pop a ready key pair and trigger refilling of the pool
+
+        Returns:
+            tuple:(private key, public key )
+        """
+        self._refill()
+        try:
+            key_pair = self._key_pairs.get(timeout=self.wait_timeout)
+        except Empty:
+            LOGGER.warning("no ssh key pair is ready in time, generate it for the request")
+            return self._generate()
+        # replace the popped key pair, so the pool is ready for the next request
+        self._refill()
+        return key_pair
+
+
+KEY_PAIR_FACTORY = KeyPairFactory(
+    configuration.ssh.get("KEY_TYPE") or "rsa", int(configuration.ssh.get("KEY_PAIR_POOL_SIZE") or 20)
+)
+
+
+def generate_key() -> Tuple[str, str]:
+    """
+    get a key pair of the configured key type from the pre-generated pool
+
+    Returns:
+        tuple:(private key, public key )
+    """
+    return KEY_PAIR_FACTORY.get()
+
+
 class SSH:
     """
     A SSH client used to run command in remote node
@@ -81,14 +195,61 @@ class SSH:
             tuple:
                 status, result, error message
         """
-        open_channel = self._client.get_transport().open_session(timeout=timeout)
+        return self.run_command(self.open_session(timeout), command)
+
+    def open_session(self, timeout: float = None) -> paramiko.Channel:
+        """
+        open a new channel on the authenticated transport
+
+        Args:
+            timeout(float): the maximum time to wait for the channel to be opened
+
+        Returns:
+            paramiko.Channel
+        """
+        transport = self._client.get_transport()
+        if transport is None:
+            raise paramiko.ssh_exception.SSHException("ssh connection has been closed")
+        return transport.open_session(timeout=timeout)
+
+    @staticmethod
+    def run_command(open_channel: paramiko.Channel, command: str) -> tuple:
+        """
+        execute command on an opened channel and close the channel
+
+        Args:
+            open_channel(paramiko.Channel): channel returned by open_session
+            command(str): shell command
+
+        Returns:
+            tuple:
+                status, result, error message
+        """
         open_channel.set_combine_stderr(False)
         open_channel.exec_command(command)
         statue = open_channel.recv_exit_status()
         stdout = open_channel.makefile("rb", -1).read().decode()
         stderr = open_channel.makefile_stderr("rb", -1).read().decode()
+        open_channel.close()
         return statue, stdout, stderr
 
+    def is_active(self) -> bool:
+        """
+        check whether the transport is still usable, an ignore message is sent to find out
+        connections which have been closed by the remote node
+
+        Returns:
+            bool
+        """
+        transport = self._client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except (socket.error, EOFError, paramiko.ssh_exception.SSHException):
+            return False
+        return True
+
     def close(self):
         """
         close open_channel
@@ -96,9 +257,285 @@ class SSH:
         self._client.close()
 
 
+class _StaleConnectionError(Exception):
+    """
+    raised when a pooled connection can not open a new channel any more
+    """
+
+
+class SSHConnectionPool:
+    """
+    Process-wide pool of authenticated SSH connections
+
+    Connections are keyed by (host_ip, ssh_port, ssh_user, key fingerprint). A command checks out
+    an idle connection of its key and only opens a new channel on it, the connection is returned
+    to the pool once the command finished. Locks come from the threading module which is patched
+    by gevent, so the pool can be shared by threads and greenlets.
+
+    Attributes:
+        max_per_host(int): maximum number of connections of one key, further checkouts wait
+        idle_timeout(float): idle connections older than this (seconds) are closed
+    """
+
+    def __init__(self, max_per_host: int = 4, idle_timeout: float = 300):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle_connections: Dict[tuple, List[Tuple[SSH, float]]] = defaultdict(list)
+        self._host_semaphores: Dict[tuple, threading.BoundedSemaphore] = {}
+        self._last_sweep = time.monotonic()
+
+    @staticmethod
+    def make_key(connect_args: ClientConnectArgs, pkey: paramiko.PKey) -> tuple:
+        """
+        generate pool key of a connection
+
+        Args:
+            connect_args(ClientConnectArgs): client connect info
+            pkey(paramiko.PKey): private key used for authentication
+
+        Returns:
+            tuple: (host_ip, ssh_port, ssh_user, key fingerprint)
+        """
+        return connect_args.host_ip, int(connect_args.ssh_port), connect_args.ssh_user, pkey.get_fingerprint().hex()
+
+    def _get_semaphore(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            if key not in self._host_semaphores:
+                self._host_semaphores[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[key]
+
+    def _checkout(self, key: tuple):
+        """
+        pop a healthy idle connection of the key, closing expired or broken ones on the way
+
+        Returns:
+            SSH or None
+        """
+        while True:
+            with self._lock:
+                idle_connections = self._idle_connections.get(key)
+                if not idle_connections:
+                    return None
+                client, last_used = idle_connections.pop()
+            # the health check does network io, so it is done outside the lock
+            if time.monotonic() - last_used <= self.idle_timeout and client.is_active():
+                return client
+            client.close()
+
+    def _checkin(self, key: tuple, client: SSH) -> None:
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._idle_connections[key].append((client, now))
+            if now - self._last_sweep > self.idle_timeout:
+                self._last_sweep = now
+                for idle_key in list(self._idle_connections):
+                    alive = []
+                    for idle_client, last_used in self._idle_connections[idle_key]:
+                        if now - last_used > self.idle_timeout:
+                            expired.append(idle_client)
+                        else:
+                            alive.append((idle_client, last_used))
+                    if alive:
+                        self._idle_connections[idle_key] = alive
+                    else:
+                        del self._idle_connections[idle_key]
+        for idle_client in expired:
+            idle_client.close()
+
+    @contextmanager
+    def connection(self, key: tuple, **client_args):
+        """
+        check out a connection of the key, a new one is created when there is no idle connection
+
+        Args:
+            key(tuple): pool key generated by make_key
+            client_args: arguments used to create SSH when needed
+
+        Yields:
+            tuple: SSH client, whether the client is reused from the pool
+        """
+        with self._get_semaphore(key):
+            client = self._checkout(key)
+            reused = client is not None
+            if client is None:
+                client = SSH(**client_args)
+            try:
+                yield client, reused
+            except BaseException:
+                client.close()
+                raise
+            self._checkin(key, client)
+
+    def execute_command(self, connect_args: ClientConnectArgs, pkey: paramiko.PKey, command: str) -> tuple:
+        """
+        execute command on a pooled connection, a reused connection which fails to open a channel
+        is dropped and the command is sent over a new connection
+
+        Args:
+            connect_args(ClientConnectArgs): client connect info
+            pkey(paramiko.PKey): private key used for authentication
+            command(str): shell command
+
+        Returns:
+            tuple:
+                status, result, error message
+        """
+        key = self.make_key(connect_args, pkey)
+        client_args = {
+            "ip": connect_args.host_ip,
+            "username": connect_args.ssh_user,
+            "port": connect_args.ssh_port,
+            "pkey": pkey,
+        }
+        while True:
+            try:
+                with self.connection(key, **client_args) as (client, reused):
+                    try:
+                        open_channel = client.open_session(connect_args.timeout)
+                    except (socket.error, EOFError, paramiko.ssh_exception.SSHException) as error:
+                        if reused:
+                            raise _StaleConnectionError() from error
+                        raise
+                    return client.run_command(open_channel, command)
+            except _StaleConnectionError:
+                LOGGER.warning(f"pooled ssh connection of host {connect_args.host_ip} is broken, reconnect it")
+
+    def close_connections(self, fingerprint: str) -> None:
+        """
+        close idle connections authenticated by the key
+
+        Args:
+            fingerprint(str): hex fingerprint of the private key
+        """
+        closed = []
+        with self._lock:
+            for key in [key for key in self._idle_connections if key[3] == fingerprint]:
+                closed.extend(client for client, _ in self._idle_connections.pop(key))
+        for client in closed:
+            client.close()
+
+    def close_all(self) -> None:
+        """
+        close all idle connections
+        """
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = defaultdict(list)
+        for connections in idle_connections.values():
+            for client, _ in connections:
+                client.close()
+
+
+class PrivateKeyCache:
+    """
+    Bounded LRU cache of parsed private keys, keyed by the sha256 digest of the PEM string
+
+    Attributes:
+        max_size(int): maximum number of cached keys
+        hits(int): lookups served from the cache
+        misses(int): lookups which parsed the PEM string
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._keys: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def _digest(private_key: str) -> str:
+        return hashlib.sha256(private_key.encode()).hexdigest()
+
+    @staticmethod
+    def _parse(private_key: str) -> paramiko.PKey:
+        key_classes = (paramiko.Ed25519Key, paramiko.RSAKey) if "OPENSSH" in private_key else (paramiko.RSAKey,)
+        for key_class in key_classes[:-1]:
+            try:
+                return key_class.from_private_key(StringIO(private_key))
+            except paramiko.ssh_exception.SSHException:
+                continue
+        return key_classes[-1].from_private_key(StringIO(private_key))
+
+    def get(self, private_key: str) -> paramiko.PKey:
+        """
+        get parsed key of the PEM string, the string is parsed when it is not cached
+
+        Args:
+            private_key(str): PEM encoded private key
+
+        Returns:
+            paramiko.PKey
+
+        Raises:
+            paramiko.ssh_exception.SSHException: the string is not a valid private key
+        """
+        digest = self._digest(private_key)
+        with self._lock:
+            pkey = self._keys.get(digest)
+            if pkey is not None:
+                self._keys.move_to_end(digest)
+                self.hits += 1
+                return pkey
+
+        pkey = self._parse(private_key)
+        with self._lock:
+            self.misses += 1
+            self._keys[digest] = pkey
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return pkey
+
+    def invalidate(self, private_key: str):
+        """
+        remove the key from cache
+
+        Args:
+            private_key(str): PEM encoded private key
+
+        Returns:
+            paramiko.PKey or None: the removed key
+        """
+        with self._lock:
+            return self._keys.pop(self._digest(private_key), None)
+
+    def cache_info(self) -> dict:
+        """
+        statistics of the cache
+
+        Returns:
+            dict: e.g
+                {"hits": 10, "misses": 2, "size": 2, "max_size": 10000}
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._keys), "max_size": self.max_size}
+
+
+PKEY_CACHE = PrivateKeyCache(int(configuration.ssh.get("PKEY_CACHE_SIZE") or 10000))
+
+CONNECTION_POOL = SSHConnectionPool(
+    int(configuration.ssh.get("CONNECTION_POOL_MAX_PER_HOST") or 4),
+    float(configuration.ssh.get("CONNECTION_IDLE_TIMEOUT") or 300),
+)
+
+
+def forget_private_key(private_key: str) -> None:
+    """
+    drop the parsed key and the idle connections authenticated by it, used when a host's key is rotated
+
+    Args:
+        private_key(str): PEM encoded private key which is no longer used
+    """
+    pkey = PKEY_CACHE.invalidate(private_key)
+    if pkey is not None:
+        CONNECTION_POOL.close_connections(pkey.get_fingerprint().hex())
+
+
 def execute_command_and_parse_its_result(connect_args: ClientConnectArgs, command: str) -> tuple:
     """
-    create a ssh client, execute command and parse result
+    execute command on a pooled ssh connection and parse result
 
     Args:
         connect_args(ClientConnectArgs): e.g
@@ -112,13 +549,9 @@ def execute_command_and_parse_its_result(connect_args: ClientConnectArgs, comman
     if not connect_args.pkey:
         return state.SSH_AUTHENTICATION_ERROR, f"ssh authentication failed when connect host " f"{connect_args.host_ip}"
     try:
-        client = SSH(
-            ip=connect_args.host_ip,
-            username=connect_args.ssh_user,
-            port=connect_args.ssh_port,
-            pkey=paramiko.RSAKey.from_private_key(StringIO(connect_args.pkey)),
+        exit_status, stdout, stderr = CONNECTION_POOL.execute_command(
+            connect_args, PKEY_CACHE.get(connect_args.pkey), command
         )
-        exit_status, stdout, stderr = client.execute_command(command, connect_args.timeout)
     except socket.error as error:
         LOGGER.error(error)
         return state.SSH_CONNECTION_ERROR, "SSH.Connection.Error"
@@ -126,7 +559,6 @@ def execute_command_and_parse_its_result(connect_args: ClientConnectArgs, comman
         LOGGER.error(error)
         return state.SSH_AUTHENTICATION_ERROR, "SSH.Authentication.Error"
 
-    client.close()
     if exit_status == 0:
         return state.SUCCEED, stdout
     LOGGER.error(stderr)
@@ -15,21 +15,19 @@ Time:
 Author:
 Description: Restful APIs for host
 """
+import csv
 import json
 from io import BytesIO
-from typing import Iterable, List, Tuple, Union
+from typing import Iterable, Iterator, List, Tuple, Union
 import socket
 
-import gevent
 import paramiko
-from flask import request, send_file
+from flask import Response, request, send_file, stream_with_context
 from marshmallow import Schema
 from marshmallow.fields import Boolean
-from sqlalchemy.orm.collections import InstrumentedList
 
 from vulcanus.database.table import Host
 from vulcanus.log.log import LOGGER
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp import state
 from vulcanus.restful.response import BaseResponse
 from vulcanus.restful.serialize.validate import validate
@@ -48,6 +46,7 @@ from zeus.function.verify.host import (
     GetHostSchema,
     UpdateHostSchema,
 )
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.host_manager.ssh import SSH, execute_command_and_parse_its_result, generate_key
 
 
@@ -292,10 +291,8 @@ class GetHostInfo(BaseResponse):
         error_host_infos = self.generate_fail_data(params.get('host_list'))
 
         # query host info from database
-        status, host_list = callback.get_host_info(params)
+        status, host_list = callback.get_host_info(params, with_pkey=not params.get('basic'))
         if params.get('basic'):
-            for host in host_list:
-                host.pop("pkey", None)
             return self.response(status, None, {"host_infos": host_list})
 
         if status != state.SUCCEED:
@@ -303,10 +300,10 @@ class GetHostInfo(BaseResponse):
 
         # generate tasks
         tasks = [(host, []) for host in host_list]
-        # execute multi threading
-        multi_thread_handler = MultiThreadHandler(lambda p: self.get_host_info(*p), tasks, None)
-        multi_thread_handler.create_thread()
-        result_list = multi_thread_handler.get_result()
+        # execute on all hosts concurrently
+        fan_out_handler = FanOutHandler(self.get_host_info, tasks, target=lambda host, _: host["host_ip"])
+        fan_out_handler.execute()
+        result_list = fan_out_handler.get_result()
 
         # analyse execute result and generate target data format
         host_infos = self.analyse_query_result(params.get('host_list'), result_list)
@@ -341,15 +338,11 @@ class AddHost(BaseResponse):
             tuple:
                 status code, host object
         """
-        status, hosts, groups = self.proxy.get_hosts_and_groups(host_info.get('username'))
+        status, group_id_info = self.proxy.query_host_groups(host_info.get('username'))
         if status != state.SUCCEED:
             return status, Host()
 
-        group_id = None
-        for group in groups:
-            if group.host_group_name == host_info.get('host_group_name'):
-                group_id = group.host_group_id
-
+        group_id = group_id_info.get(host_info.get('host_group_name'))
         if group_id is None:
             LOGGER.warning(f"host group doesn't exist " f"which named {host_info.get('host_group_name')} !")
             return state.PARAM_ERROR, Host()
@@ -366,7 +359,10 @@ class AddHost(BaseResponse):
                 "management": host_info.get("management"),
             }
         )
-        if host in hosts:
+        status, conflict_hosts = self.proxy.query_conflict_hosts(host_info.get('username'), [host])
+        if status != state.SUCCEED:
+            return status, Host()
+        if conflict_hosts:
             return state.DATA_EXIST, Host()
         return state.SUCCEED, host
 
@@ -504,15 +500,21 @@ class AddHostBatch(BaseResponse):
             )
             return self.response(code=state.DATABASE_CONNECT_ERROR, data=self.add_result)
 
-        # Query hosts with groups, validate hostname or host address
-        status, hosts, groups = proxy.get_hosts_and_groups(args.get('username'))
+        # Query groups, validate host group name
+        status, group_id_info = proxy.query_host_groups(args.get('username'))
         if status != state.SUCCEED:
             self.update_add_result(
                 args["host_list"], {"result": self.add_failed, "reason": "query data from database fail"}
             )
             return self.response(code=status, data=self.add_result)
+        valid_hosts = self.validate_host_info(args, group_id_info)
 
-        valid_hosts = self.validate_host_info(args, hosts, groups)
+        # Validate hostname or host address with one query for the whole batch
+        status, conflict_hosts = proxy.query_conflict_hosts(args.get('username'), [host for host, _ in valid_hosts])
+        if status != state.SUCCEED:
+            self.update_add_result(valid_hosts, {"result": self.add_failed, "reason": "query data from database fail"})
+            return self.response(code=status, data=self.add_result)
+        valid_hosts = self.remove_conflict_hosts(valid_hosts, conflict_hosts)
         if len(valid_hosts) == 0:
             return self.response(
                 code=state.ADD_HOST_FAILED,
@@ -532,9 +534,9 @@ class AddHostBatch(BaseResponse):
             return self.response(code=state.PARTIAL_SUCCEED, data=self.add_result)
         return self.response(code=status, data=self.add_result)
 
-    def validate_host_info(self, data: dict, hosts: list, groups: list) -> list:
+    def validate_host_info(self, data: dict, group_id_info: dict) -> list:
         """
-        Check whether the data is repeated, and generate a list of valid data
+        Check whether the host group exists, and generate a list of host object
 
         Args:
             data(dict): e.g
@@ -550,25 +552,12 @@ class AddHostBatch(BaseResponse):
                     }],
                     "username": "admin"
                 }
-            hosts(list): list of host object
-            groups(list): list of host group object
+            group_id_info(dict): {group name : group id}
         Returns:
             list: e.g
-            [{
-                "host_ip": "127.0.0.1,
-                "ssh_port": 22,
-                "ssh_user": "root",
-                "password": "password",
-                "host_name": "test_host",
-                "host_group_name": "test_group",
-                "management": False,
-            }]
+            [(host object, "password")]
         """
         valid_host = []
-        group_id_info = {}
-        for group in groups:
-            group_id_info[group.host_group_name] = group.host_group_id
-
         for host_info in data["host_list"]:
             if host_info.get("host_group_name") not in group_id_info:
                 LOGGER.warning(f"invalid host group when add host {host_info['host_name']}")
@@ -579,14 +568,31 @@ class AddHostBatch(BaseResponse):
             host_info.update(
                 {"host_group_id": group_id_info.get(host_info['host_group_name']), "user": data["username"]}
             )
-            host = Host(**host_info)
-            if host in hosts:
-                LOGGER.warning(f"host name or host ip is existed when add host {host_info['host_name']}.")
+            valid_host.append((Host(**host_info), password))
+        return valid_host
+
+    def remove_conflict_hosts(self, host_connect_infos: List[tuple], conflict_hosts: List[Host]) -> list:
+        """
+        Remove hosts whose host name or host address is existed in database
+
+        Args:
+            host_connect_infos(list): list of (host object, password)
+            conflict_hosts(list): hosts in database which have the same host name or host address
+
+        Returns:
+            list: e.g
+            [(host object, "password")]
+        """
+        host_names = {host.host_name for host in conflict_hosts}
+        host_addresses = {f"{host.host_ip}:{host.ssh_port}" for host in conflict_hosts}
+        valid_host = []
+        for host, password in host_connect_infos:
+            if host.host_name in host_names or f"{host.host_ip}:{host.ssh_port}" in host_addresses:
+                LOGGER.warning(f"host name or host ip is existed when add host {host.host_name}.")
                 self.update_add_result(
-                    [host_info], {"result": self.add_failed, "reason": "host name or host ip is existed!"}
+                    [(host, password)], {"result": self.add_failed, "reason": "host name or host ip is existed!"}
                 )
                 continue
-
             valid_host.append((host, password))
         return valid_host
 
@@ -600,18 +606,26 @@ class AddHostBatch(BaseResponse):
         Returns:
             host object list
         """
-        # 30 connections are created at a time.
-        tasks = [host_connect_infos[index : index + 30] for index in range(0, len(host_connect_infos), 30)]
-        result = []
-
-        for task in tasks:
-            jobs = [gevent.spawn(self.update_rsa_key_to_host, *host_connect_info) for host_connect_info in task]
-
-            gevent.joinall(jobs)
-            for job in jobs:
-                result.append(job.value)
+        # a new host starts as soon as one finishes, the host keeps its offline status when saving failed.
+        finished_hosts = []
+
+        def log_progress(host: Host) -> None:
+            finished_hosts.append(host)
+            result = "succeed" if host.status == HostStatus.ONLINE else "failed"
+            LOGGER.info(
+                f"save ssh key to host {host.host_ip} {result}, "
+                f"{len(finished_hosts)}/{len(host_connect_infos)} hosts finished"
+            )
 
-        return result
+        fan_out_handler = FanOutHandler(
+            self.update_rsa_key_to_host,
+            host_connect_infos,
+            target=lambda host, _: host.host_ip,
+            concurrency=int(configuration.ssh.get("ADD_HOST_CONCURRENCY") or 30),
+            fallback=lambda host, _, error: host,
+        )
+        fan_out_handler.execute(callback=log_progress)
+        return fan_out_handler.get_result()
 
     @staticmethod
     def update_rsa_key_to_host(host: Host, password: str) -> Host:
@@ -773,6 +787,161 @@ class AddHostBatch(BaseResponse):
         return False
 
 
+class AddHostStream(AddHostBatch):
+    """
+    Interface for import hosts from a large csv or ndjson file.
+    Restful API: POST
+    """
+
+    ndjson_mimetype = "application/x-ndjson"
+
+    def post(self):
+        """
+        Import hosts in the format of host template file, rows are validated and saved in chunks as they
+        arrive. The file is uploaded as request body or as the "file" field of a multipart form.
+        Streaming keeps the client informed but the whole import is still one request, uwsgi harakiri
+        must be longer than the time of saving ssh keys to all hosts of the file.
+
+        Returns:
+            Response: ndjson stream of add result of every host, the last line is the summary, e.g
+                {"host_ip": "127.0.0.1", "ssh_port": 22, ..., "result": "succeed"}
+                {"label": "Succeed", "succeed": 1, "failed": 0}
+        """
+        args = {}
+        if self.verify_token(request.headers.get('access_token'), args) != state.SUCCEED:
+            return self.response(code=state.TOKEN_ERROR)
+
+        proxy = HostProxy(configuration)
+        if not proxy.connect():
+            LOGGER.error("connect to database error")
+            return self.response(code=state.DATABASE_CONNECT_ERROR)
+
+        status, group_id_info = proxy.query_host_groups(args['username'])
+        if status != state.SUCCEED:
+            return self.response(code=status)
+
+        return Response(
+            stream_with_context(self._import_hosts(self._read_rows(), proxy, group_id_info, args['username'])),
+            mimetype=self.ndjson_mimetype,
+        )
+
+    def _read_rows(self) -> Iterator[Union[dict, str]]:
+        """
+        read host info from the uploaded file line by line
+
+        Yields:
+            dict of host info, or error message of a line which can not be parsed
+        """
+        file = request.files.get("file")
+        stream, mimetype = (file.stream, file.mimetype) if file else (request.stream, request.mimetype)
+        lines = (line.decode("utf-8-sig") for line in iter(stream.readline, b""))
+
+        if mimetype != self.ndjson_mimetype:
+            yield from csv.DictReader(lines)
+            return
+
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield f"invalid json line: {line.strip()}"
+
+    def _import_hosts(self, rows: Iterable, proxy: HostProxy, group_id_info: dict, username: str):
+        """
+        validate rows and add valid hosts to database in chunks
+
+        Yields:
+            str: ndjson line of add result
+        """
+        host_names, host_addresses = set(), set()
+        chunk_size = int(configuration.ssh.get("ADD_HOST_CHUNK_SIZE") or 200)
+        succeed_count = failed_count = 0
+        valid_hosts = []
+
+        def flush():
+            self.add_result = []
+            status, conflict_hosts = proxy.query_conflict_hosts(username, [host for host, _ in valid_hosts])
+            if status != state.SUCCEED:
+                self.update_add_result(
+                    valid_hosts, {"result": self.add_failed, "reason": "query data from database fail"}
+                )
+                valid_hosts.clear()
+                return self.add_result
+
+            new_hosts = self.remove_conflict_hosts(valid_hosts, conflict_hosts)
+            valid_hosts.clear()
+            if proxy.add_host_batch(self.save_key_to_client(new_hosts)) == state.SUCCEED:
+                self.update_add_result(new_hosts, {"result": self.add_succeed})
+            else:
+                self.update_add_result(new_hosts, {"result": self.add_failed, "reason": "Insert Database error"})
+            return self.add_result
+
+        for row in rows:
+            self.add_result = []
+            host_info, reason = self._validate_row(row, group_id_info, host_names, host_addresses)
+            if reason:
+                self.update_add_result([host_info], {"result": self.add_failed, "reason": reason})
+                results = self.add_result
+            else:
+                host_info.update({"host_group_id": group_id_info[host_info["host_group_name"]], "user": username})
+                password = host_info.pop("password")
+                valid_hosts.append((Host(**host_info), password))
+                results = flush() if len(valid_hosts) >= chunk_size else []
+
+            for result in results:
+                succeed_count, failed_count = self._count(result, succeed_count, failed_count)
+                yield json.dumps(result) + "\n"
+
+        for result in flush() if valid_hosts else []:
+            succeed_count, failed_count = self._count(result, succeed_count, failed_count)
+            yield json.dumps(result) + "\n"
+
+        if not failed_count:
+            label = state.SUCCEED
+        else:
+            label = state.PARTIAL_SUCCEED if succeed_count else state.ADD_HOST_FAILED
+        yield json.dumps({"label": label, "succeed": succeed_count, "failed": failed_count}) + "\n"
+
+    def _count(self, result: dict, succeed_count: int, failed_count: int) -> Tuple[int, int]:
+        if result["result"] == self.add_succeed:
+            return succeed_count + 1, failed_count
+        return succeed_count, failed_count + 1
+
+    @staticmethod
+    def _validate_row(row, group_id_info: dict, host_names: set, host_addresses: set) -> Tuple[dict, str]:
+        """
+        validate one row of the file, names and addresses of valid rows are recorded to find duplicate rows,
+        rows which are existed in database are found when their chunk is saved
+
+        Returns:
+            tuple:
+                host info, error reason which is empty when the row is valid
+        """
+        if not isinstance(row, dict):
+            return {}, str(row)
+
+        row = {key: value for key, value in row.items() if key is not None}
+        args, errors = validate(AddHostSchema, row)
+        if errors:
+            return row, str(errors)
+
+        # only fields of the schema are kept, status and private key of the host are set when its key is saved
+        host_info = {field: args[field] for field in AddHostSchema().fields}
+        host_info["host_ip"] = str(host_info["host_ip"])
+        if host_info["host_group_name"] not in group_id_info:
+            return host_info, "invalid host group name"
+
+        host_address = f'{host_info["host_ip"]}:{host_info["ssh_port"]}'
+        if host_info["host_name"] in host_names or host_address in host_addresses:
+            return host_info, "there is a duplicate host name or host address!"
+
+        host_names.add(host_info["host_name"])
+        host_addresses.add(host_address)
+        return host_info, ""
+
+
 class UpdateHost(BaseResponse):
     """
     update host info
@@ -803,32 +972,36 @@ class UpdateHost(BaseResponse):
             }
         )
 
-    def _validate_host_exist(self, host_id: int, host_name: str, host_infos: InstrumentedList) -> tuple:
+    def _validate_host_exist(self, proxy: HostProxy, username: str, params: dict) -> tuple:
         """
-        generate ssh address list, determines whether the host exists and
-        determines whether the host name is repeated in database
+        determines whether the host exists, and query hosts which have the same host name or
+        ssh address with the updated host, determines whether the host name is repeated in database
 
         Args:
-            host_id(int): host_id
-            host_name(str): update host name
-            host_infos(InstrumentedList): all hosts
+            proxy(HostProxy): database proxy
+            username(str): admin
+            params(dict): update host info
 
         Returns:
             status, error message
 
         """
-        key = False
-        self.host_ssh_address = []
-        for host_info in host_infos:
-            self.host_ssh_address.append(f"{host_info.host_ip}:{host_info.ssh_port}")
-            if host_id == host_info.host_id:
-                self.host = host_info
-                key = True
-            if host_name == host_info.host_name:
-                return state.PARAM_ERROR, "there is a duplicate host name in database!"
+        status, self.host = proxy.query_host(username, params.get("host_id"))
+        if status == state.NO_DATA:
+            return state.NO_DATA, f"host id {params.get('host_id')} is not in database!"
+        if status != state.SUCCEED:
+            return status, ""
 
-        if not key:
-            return state.NO_DATA, f"host id {host_id} is not in database!"
+        updated_host = Host(
+            host_name=params.get("host_name"), host_ip=self.host.host_ip, ssh_port=params.get("ssh_port")
+        )
+        status, conflict_hosts = proxy.query_conflict_hosts(username, [updated_host])
+        if status != state.SUCCEED:
+            return status, ""
+
+        self.host_ssh_address = {f"{host.host_ip}:{host.ssh_port}" for host in conflict_hosts}
+        if params.get("host_name") in {host.host_name for host in conflict_hosts}:
+            return state.PARAM_ERROR, "there is a duplicate host name in database!"
 
         return state.SUCCEED, ""
 
@@ -854,18 +1027,17 @@ class UpdateHost(BaseResponse):
         Returns:
             Response
         """
-        status, host_infos, host_group_infos = callback.get_hosts_and_groups(params.pop("username"))
-        if status != state.SUCCEED:
-            return self.response(status)
-
-        status, message = self._validate_host_exist(params.get("host_id"), params.get("host_name"), host_infos)
+        username = params.pop("username")
+        status, message = self._validate_host_exist(callback, username, params)
         if status != state.SUCCEED:
             return self.response(code=status, message=message)
 
         if params.get("host_group_name"):
-            for group in host_group_infos:
-                if params.get("host_group_name") == group.host_group_name:
-                    params.update({"host_group_id": group.host_group_id})
+            status, group_id_info = callback.query_host_groups(username)
+            if status != state.SUCCEED:
+                return self.response(status)
+            if params.get("host_group_name") in group_id_info:
+                params.update({"host_group_id": group_id_info[params.get("host_group_name")]})
             if params.get("host_group_id") is None:
                 return self.response(
                     code=state.PARAM_ERROR,
@@ -21,6 +21,7 @@ try:
     monkey.patch_all(ssl=False)
 except:
     pass
+import gevent
 import redis
 import sqlalchemy
 from redis import RedisError
@@ -33,6 +34,8 @@ from vulcanus.restful.resp.state import SUCCEED
 from zeus.conf import configuration
 from zeus.database import ENGINE
 from zeus.database.proxy.account import UserProxy
+from zeus.database.table import create_indexes
+from zeus.vulnerability_manage.view import watch_interrupted_tasks
 
 
 def init_user():
@@ -43,6 +46,7 @@ def init_user():
         create_utils_tables(Base, ENGINE)
     except sqlalchemy.exc.SQLAlchemyError:
         raise sqlalchemy.exc.SQLAlchemyError("create tables fail")
+    create_indexes(ENGINE)
 
     proxy = UserProxy(configuration)
     if not proxy.connect():
@@ -79,10 +83,32 @@ def init_redis_connect():
         raise RedisError("redis connect error.")
 
 
+def init_task_resume():
+    """
+    Resume cve fix tasks interrupted by a restart or a kill of a process periodically. It must run in every
+    worker process instead of the uwsgi master, so it's started after uwsgi forks the worker.
+    """
+    try:
+        import uwsgi
+        from uwsgidecorators import postfork
+    except ImportError:
+        # not served by uwsgi, e.g by app.run
+        gevent.spawn(watch_interrupted_tasks)
+        return
+
+    if uwsgi.worker_id():
+        # the app is loaded in the worker when lazy-apps is set
+        gevent.spawn(watch_interrupted_tasks)
+    else:
+        postfork(lambda: gevent.spawn(watch_interrupted_tasks))
+
+
 def main():
     init_database()
     init_redis_connect()
-    return init_app('zeus')
+    app, config = init_app('zeus')
+    init_task_resume()
+    return app, config
 
 
 app, config = main()
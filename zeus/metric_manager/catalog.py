@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: cache of metric series of prometheus instances
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+import gevent
+
+from vulcanus.log.log import LOGGER
+from zeus.conf import configuration
+
+__all__ = ["SeriesCatalog", "SERIES_CATALOG"]
+
+
+class SeriesCatalog:
+    """
+    Series of every metric of an instance, e.g {"metric1": ['metric1{instance="127.0.0.1:9100",label1="value1"}']}
+
+    A catalog is loaded when it's read for the first time. After ttl seconds the cached catalog is still
+    returned, and it's reloaded in the background, so reading a catalog never waits for prometheus
+    except for the first time. At most max_instances catalogs are kept, the least recently read one is
+    dropped first, so catalogs of deleted hosts don't stay forever.
+    """
+
+    def __init__(self, ttl: float = 60, max_instances: int = 5000):
+        self.ttl = ttl
+        self.max_instances = max_instances
+        # instance: (load time, catalog), in order of last read
+        self._catalogs: "OrderedDict[str, tuple]" = OrderedDict()
+        self._refreshing: Dict[str, gevent.Greenlet] = {}
+
+    def get(self, instance: str, load: Callable[[], Dict[str, List[str]]]) -> Dict[str, List[str]]:
+        """
+        get catalog of an instance
+
+        Args:
+            instance(str): e.g 127.0.0.1:9100
+            load(Callable): load the catalog from prometheus, errors are raised to the caller when the
+                catalog isn't cached
+
+        Returns:
+            dict: series of every metric
+        """
+        cached = self._catalogs.get(instance)
+        if cached is None:
+            return self._load(instance, load)
+        self._catalogs.move_to_end(instance)
+        loaded_at, catalog = cached
+        if time.monotonic() - loaded_at > self.ttl and instance not in self._refreshing:
+            self._refreshing[instance] = gevent.spawn(self._refresh, instance, load)
+        return catalog
+
+    def invalidate(self, instance: str) -> None:
+        self._catalogs.pop(instance, None)
+
+    def _load(self, instance: str, load: Callable[[], Dict[str, List[str]]]) -> Dict[str, List[str]]:
+        catalog = load()
+        self._catalogs[instance] = (time.monotonic(), catalog)
+        self._catalogs.move_to_end(instance)
+        while len(self._catalogs) > self.max_instances:
+            self._catalogs.popitem(last=False)
+        return catalog
+
+    def _refresh(self, instance: str, load: Callable[[], Dict[str, List[str]]]) -> None:
+        try:
+            self._load(instance, load)
+        except Exception as error:  # pylint: disable=W0703
+            LOGGER.warning(f"refresh metric series of {instance} failed, cached series are used: {error}")
+        finally:
+            self._refreshing.pop(instance, None)
+
+
+SERIES_CATALOG = SeriesCatalog(
+    float(configuration.prometheus.get("SERIES_CATALOG_TTL") or 60),
+    int(configuration.prometheus.get("SERIES_CATALOG_MAX_INSTANCES") or 5000),
+)
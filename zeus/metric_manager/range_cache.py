@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: cache of prometheus range query results
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from zeus.conf import configuration
+
+__all__ = ["RangeQueryCache", "RANGE_QUERY_CACHE"]
+
+
+class RangeQueryCache:
+    """
+    LRU cache of range query results split into time buckets, bounded by the total number of cached points.
+
+    Start and end of a query are aligned to the step, so queries of overlapping windows are evaluated
+    at the same timestamps. The aligned range is split into buckets of bucket_points steps, buckets
+    which ended settle seconds ago won't change any more and are cached. Only buckets which are not
+    cached, including the newest partial bucket, are fetched from prometheus.
+    """
+
+    def __init__(self, max_points: int = 200000, bucket_points: int = 240, settle: int = 60):
+        self.max_points = max_points
+        self.bucket_points = bucket_points
+        self.settle = settle
+        # bucket and its number of points
+        self._buckets: "OrderedDict[tuple, Tuple[List[dict], int]]" = OrderedDict()
+        self._points = 0
+
+    def query(
+        self, query_str: str, start: int, end: int, step: int, fetch: Callable[[str, int, int, int], Optional[list]]
+    ) -> Optional[list]:
+        """
+        Run a range query with cached buckets
+
+        Args:
+            query_str(str): promql
+            start(int): start timestamp
+            end(int): end timestamp
+            step(int): query range step in seconds
+            fetch(Callable): run the range query as fetch(query_str, start, end, step), returns matrix of
+                the result or None when the query failed
+
+        Returns:
+            list: matrix of the result, e.g [{"metric": {"__name__": "metric1"}, "values": [[1658926440, "0"]]}],
+                None when any fetch failed
+        """
+        if not self.max_points or not isinstance(step, int) or step <= 0:
+            return fetch(query_str, start, end, step)
+        start, end = start // step * step, end // step * step
+        width = step * self.bucket_points
+        immutable_before = time.time() - self.settle
+
+        buckets = {}
+        missing = []
+        for index in range(start // width, end // width + 1):
+            key = (query_str, step, index)
+            if key in self._buckets:
+                self._buckets.move_to_end(key)
+                buckets[index] = self._buckets[key][0]
+            else:
+                missing.append(index)
+
+        for first, last in self._runs(missing):
+            # whole buckets are fetched, so they can be cached, except the newest one which isn't finished
+            run_end = min((last + 1) * width - step, end)
+            matrix = fetch(query_str, first * width, run_end, step)
+            if matrix is None:
+                return None
+            run_buckets = self._split(matrix, first, last, width)
+            for index, bucket in run_buckets.items():
+                buckets[index] = bucket
+                if (index + 1) * width - step <= min(run_end, immutable_before):
+                    self._save((query_str, step, index), bucket)
+
+        return self._merge([buckets[index] for index in sorted(buckets)], start, end)
+
+    @staticmethod
+    def _runs(indexes: List[int]) -> List[tuple]:
+        runs = []
+        for index in indexes:
+            if runs and runs[-1][1] == index - 1:
+                runs[-1] = (runs[-1][0], index)
+            else:
+                runs.append((index, index))
+        return runs
+
+    @staticmethod
+    def _split(matrix: list, first: int, last: int, width: int) -> Dict[int, List[dict]]:
+        buckets = {index: {} for index in range(first, last + 1)}
+        for series in matrix:
+            labels = tuple(sorted(series.get("metric", {}).items()))
+            for point in series.get("values", []):
+                bucket = buckets.get(int(point[0]) // width)
+                if bucket is None:
+                    continue
+                bucket.setdefault(labels, {"metric": series.get("metric", {}), "values": []})["values"].append(point)
+        return {index: list(bucket.values()) for index, bucket in buckets.items()}
+
+    @staticmethod
+    def _merge(buckets: List[List[dict]], start: int, end: int) -> list:
+        merged = {}
+        for bucket in buckets:
+            for series in bucket:
+                labels = tuple(sorted(series["metric"].items()))
+                values = [point for point in series["values"] if start <= point[0] <= end]
+                if values:
+                    merged.setdefault(labels, {"metric": series["metric"], "values": []})["values"].extend(values)
+        return list(merged.values())
+
+    def _save(self, key: tuple, bucket: List[dict]) -> None:
+        points = sum(len(series["values"]) for series in bucket)
+        # a bucket larger than the whole cache would evict everything and still not fit
+        if points > self.max_points:
+            return
+        if key in self._buckets:
+            self._points -= self._buckets.pop(key)[1]
+        self._buckets[key] = (bucket, points)
+        self._points += points
+        while self._points > self.max_points:
+            self._points -= self._buckets.popitem(last=False)[1][1]
+
+
+RANGE_QUERY_CACHE = RangeQueryCache(
+    int(configuration.prometheus.get("RANGE_CACHE_MAX_POINTS") or 0),
+    int(configuration.prometheus.get("RANGE_CACHE_BUCKET_POINTS") or 240),
+    int(configuration.prometheus.get("RANGE_CACHE_SETTLE") or 60),
+)
@@ -0,0 +1,219 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: downsample and encode metric time series
+"""
+import base64
+from typing import List, Tuple, Union
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__all__ = [
+    "LTTB",
+    "MIN_MAX",
+    "DOWNSAMPLE_METHODS",
+    "PAIRS",
+    "COLUMNAR",
+    "BASE64",
+    "MSGPACK",
+    "RESPONSE_FORMATS",
+    "downsample",
+    "lttb_indices",
+    "min_max_indices",
+    "encode_series",
+    "pack",
+]
+
+LTTB = "lttb"
+MIN_MAX = "minmax"
+DOWNSAMPLE_METHODS = (LTTB, MIN_MAX)
+
+PAIRS = "pairs"
+COLUMNAR = "columnar"
+BASE64 = "base64"
+MSGPACK = "msgpack"
+# msgpack is an optional dependency, the format is only offered when it's importable
+RESPONSE_FORMATS = (PAIRS, COLUMNAR, BASE64) + ((MSGPACK,) if msgpack is not None else ())
+
+
+def _to_arrays(points: List[list]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    convert prometheus points [[timestamp, 'value'], ...] to arrays of timestamps and values,
+    values which are not numbers (e.g 'NaN', '+Inf') are kept as nan or inf
+    """
+    timestamps = np.fromiter((point[0] for point in points), dtype=np.float64, count=len(points))
+    values = np.fromiter((point[1] for point in points), dtype=np.float64, count=len(points))
+    return timestamps, values
+
+
+def lttb_indices(timestamps: np.ndarray, values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets, which keeps the visual shape of a series
+
+    Args:
+        timestamps(np.ndarray): timestamps of the series in ascending order
+        values(np.ndarray): values of the series
+        threshold(int): number of points to keep, at least 3
+
+    Returns:
+        np.ndarray: indices of the selected points in ascending order
+    """
+    length = len(timestamps)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    # first and last points are always kept, the others are split into threshold - 2 buckets
+    values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    cumulative_x = np.concatenate(([0.0], np.cumsum(timestamps)))
+    cumulative_y = np.concatenate(([0.0], np.cumsum(values)))
+    counts = np.diff(edges)
+    # average point of every bucket, the next bucket of the last one is the last point
+    average_x = np.append((cumulative_x[edges[1:]] - cumulative_x[edges[:-1]]) / counts, timestamps[-1])
+    average_y = np.append((cumulative_y[edges[1:]] - cumulative_y[edges[:-1]]) / counts, values[-1])
+
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, length - 1
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bucket_x, bucket_y = timestamps[start:end], values[start:end]
+        # doubled area of triangles made of the selected point, every point of the bucket and the next average
+        areas = np.abs(
+            (timestamps[selected] - average_x[bucket + 1]) * (bucket_y - values[selected])
+            - (timestamps[selected] - bucket_x) * (average_y[bucket + 1] - values[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+    return indices
+
+
+def min_max_indices(values: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select the minimum and maximum point of every bucket, which keeps spikes of a series
+
+    Args:
+        values(np.ndarray): values of the series
+        threshold(int): maximum number of points to keep
+
+    Returns:
+        np.ndarray: indices of the selected points in ascending order
+    """
+    length = len(values)
+    bucket_count = threshold // 2
+    if threshold >= length or bucket_count < 1:
+        return np.arange(length)
+
+    buckets = np.arange(length) * bucket_count // length
+    # nan is sorted to the end of a bucket, so it's never selected as minimum
+    order = np.lexsort((values, buckets))
+    sorted_buckets = buckets[order]
+    first = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    last = np.r_[first[1:], length] - 1
+    last_values = values[order[last]]
+    # the maximum is the last number of a bucket, skip nan at the end of it
+    nan_counts = np.add.reduceat(np.isnan(values[order]).astype(np.int64), first)
+    last = np.where(np.isnan(last_values), np.maximum(last - nan_counts, first), last)
+    return np.unique(np.concatenate((order[first], order[last])))
+
+
+def downsample(points: List[list], max_points: int, method: str = LTTB) -> List[list]:
+    """
+    Downsample prometheus points of a series to at most max_points points
+
+    Args:
+        points(list): e.g [[1658926441, '0'], [1658926456, '1']]
+        max_points(int): maximum number of points to keep
+        method(str): lttb or minmax
+
+    Returns:
+        list: selected points in the same format
+    """
+    if not points or not max_points or len(points) <= max_points:
+        return points
+    timestamps, values = _to_arrays(points)
+    if method == MIN_MAX:
+        indices = min_max_indices(values, max_points)
+    else:
+        indices = lttb_indices(timestamps, values, max_points)
+    return [points[index] for index in indices]
+
+
+def _to_columns(points: List[list], step: int) -> Tuple[int, int, np.ndarray, np.ndarray]:
+    """
+    split points into start time, step, timestamp deltas counted in steps and values.
+    Timestamps which are not on the step grid are counted in seconds with step 1, and deltas are
+    empty when there is no gap in the series.
+    """
+    timestamps, values = _to_arrays(points)
+    start = int(timestamps[0])
+    step = int(step) if step else 1
+    deltas = np.rint(np.diff(timestamps) / step).astype(np.int32)
+    if not np.array_equal(start + step * np.concatenate(([0], np.cumsum(deltas, dtype=np.int64))), timestamps):
+        step = 1
+        deltas = np.rint(np.diff(timestamps)).astype(np.int32)
+    if step != 1 and np.all(deltas == 1):
+        deltas = deltas[:0]
+    return start, step, deltas, values
+
+
+def encode_series(points: List[list], step: int, response_format: str = PAIRS) -> Union[list, dict]:
+    """
+    Encode prometheus points of a series in columns, timestamps are restored by
+    start + step * cumsum([0] + deltas), or start + step * range(len(values)) when deltas are empty
+
+    Args:
+        points(list): e.g [[1658926441, '0'], [1658926456, '1'], [1658926486, 'NaN']]
+        step(int): query range step in seconds
+        response_format(str): pairs, columnar, base64 or msgpack
+
+    Returns:
+        list: points when format is pairs or there is no point
+        dict: e.g
+            columnar: {"start": 1658926441, "step": 15, "deltas": [1, 2], "values": [0.0, 1.0, None]}
+            base64: deltas are little-endian int32 and values are little-endian float32 encoded in base64
+            msgpack: same as base64 but in raw bytes
+    """
+    if response_format == PAIRS or not points:
+        return points
+    start, step, deltas, values = _to_columns(points, step)
+    if response_format == COLUMNAR:
+        # nan and inf are not valid json
+        json_values = values.astype(object)
+        json_values[~np.isfinite(values)] = None
+        return {"start": start, "step": step, "deltas": deltas.tolist(), "values": json_values.tolist()}
+
+    raw_deltas = deltas.astype("<i4").tobytes()
+    raw_values = values.astype("<f4").tobytes()
+    if response_format == MSGPACK:
+        return {"start": start, "step": step, "deltas": raw_deltas, "values": raw_values}
+    return {
+        "start": start,
+        "step": step,
+        "deltas": base64.b64encode(raw_deltas).decode("ascii"),
+        "values": base64.b64encode(raw_values).decode("ascii"),
+    }
+
+
+def pack(data: dict) -> bytes:
+    """
+    serialize response data with msgpack
+    """
+    return msgpack.packb(data, use_bin_type=True)
@@ -10,10 +10,26 @@
 # PURPOSE.
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
+import json
+from typing import Dict, List, Tuple
+
+import sqlalchemy
+from flask import Response, stream_with_context
+
+from vulcanus.log.log import LOGGER
+from vulcanus.restful.resp import state
 from vulcanus.restful.response import BaseResponse
+from zeus.database.proxy.host import HostProxy
 from zeus.database.proxy.metric import MetricProxy
-from zeus.function.verify.metric import QueryHostMetricDataSchema, QueryHostMetricListSchema, QueryHostMetricNamesSchema
+from zeus.function.verify.metric import (
+    QueryFleetMetricDataSchema,
+    QueryHostMetricDataSchema,
+    QueryHostMetricDataStreamSchema,
+    QueryHostMetricListSchema,
+    QueryHostMetricNamesSchema,
+)
 from zeus.conf import configuration
+from zeus.metric_manager.series import MSGPACK, pack
 
 
 class QueryHostMetricNames(BaseResponse):
@@ -34,11 +50,42 @@ class QueryHostMetricData(BaseResponse):
     Restful API: POST
     """
 
+    msgpack_mimetype = "application/x-msgpack"
+
     @BaseResponse.handle(schema=QueryHostMetricDataSchema, proxy=MetricProxy, config=configuration)
     def post(self, callback: MetricProxy, **params):
         status_code, result = callback.query_metric_data(params)
+        if params.get("format") == MSGPACK:
+            return self._msgpack_response(status_code, result)
         return self.response(code=status_code, data=result)
 
+    def _msgpack_response(self, status_code: str, data: dict) -> Response:
+        """
+        pack the same body as the json response, raw bytes in data can't be put in json so the envelope
+        is taken from the json response without data
+        """
+        envelope = self.response(code=status_code)
+        http_status = getattr(envelope, "status_code", 200)
+        if isinstance(envelope, Response):
+            envelope = envelope.get_json()
+        envelope["data"] = data
+        return Response(pack(envelope), status=http_status, mimetype=self.msgpack_mimetype)
+
+
+class QueryHostMetricDataStream(BaseResponse):
+    """
+    Interface for query host metric data from web, every series is sent as a line of ndjson as soon as
+    it's queried, and the last line is {"label": status code}.
+    Restful API: POST
+    """
+
+    ndjson_mimetype = "application/x-ndjson"
+
+    @BaseResponse.handle(schema=QueryHostMetricDataStreamSchema, proxy=MetricProxy, config=configuration)
+    def post(self, callback: MetricProxy, **params):
+        lines = (json.dumps(line) + "\n" for line in callback.query_metric_data_stream(params))
+        return Response(stream_with_context(lines), mimetype=self.ndjson_mimetype)
+
 
 class QueryHostMetricList(BaseResponse):
     """
@@ -50,3 +97,59 @@ class QueryHostMetricList(BaseResponse):
     def post(self, callback: MetricProxy, **params):
         status_code, result = callback.query_metric_list(params)
         return self.response(code=status_code, data=result)
+
+
+class QueryFleetMetricData(BaseResponse):
+    """
+    Interface for query metric data of many hosts from web.
+    Restful API: POST
+    """
+
+    @staticmethod
+    def _query_hosts(params: Dict) -> Tuple[str, List[dict]]:
+        """
+        query hosts in host_list and hosts in groups of host_group_list
+
+        Returns:
+            str: status code
+            list: e.g [{"host_id": 1, "host_ip": "127.0.0.1"}]
+        """
+        hosts = {}
+        try:
+            with HostProxy(configuration) as proxy:
+                if params.get("host_list"):
+                    status_code, host_infos = proxy.get_host_info(
+                        {"username": params["username"], "host_list": params["host_list"]}
+                    )
+                    if status_code != state.SUCCEED:
+                        return status_code, []
+                    hosts.update((host["host_id"], host) for host in host_infos)
+                if params.get("host_group_list"):
+                    status_code, result = proxy.get_host(
+                        {"username": params["username"], "host_group_list": params["host_group_list"]}
+                    )
+                    if status_code != state.SUCCEED:
+                        return status_code, []
+                    hosts.update((host["host_id"], host) for host in result.get("host_infos", []))
+        except sqlalchemy.exc.SQLAlchemyError:
+            LOGGER.error("connect to database error")
+            return state.DATABASE_CONNECT_ERROR, []
+        return state.SUCCEED, [{"host_id": host["host_id"], "host_ip": host["host_ip"]} for host in hosts.values()]
+
+    @BaseResponse.handle(schema=QueryFleetMetricDataSchema, proxy=MetricProxy, config=configuration)
+    def post(self, callback: MetricProxy, **params):
+        if not params.get("host_list") and not params.get("host_group_list"):
+            return self.response(code=state.PARAM_ERROR, message="host_list or host_group_list is required")
+        status_code, host_list = self._query_hosts(params)
+        if status_code != state.SUCCEED:
+            return self.response(code=status_code)
+        if not host_list:
+            return self.response(code=state.NO_DATA)
+        status_code, result = callback.query_fleet_data(
+            host_list,
+            params["metric_names"],
+            params["time_range"],
+            max_points=params.get("max_points"),
+            downsample=params.get("downsample"),
+        )
+        return self.response(code=status_code, data=result)
@@ -20,7 +20,6 @@ from unittest import mock
 
 from vulcanus.conf.constant import COLLECT_CONFIG
 from vulcanus.database.proxy import MysqlProxy
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp.state import (
     SUCCEED, PARAM_ERROR,
     DATABASE_CONNECT_ERROR,
@@ -29,6 +28,7 @@ from vulcanus.restful.resp.state import (
 )
 from zeus.config_manager.view import CollectConfig
 from zeus.database.proxy.host import HostProxy
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.tests import BaseTestCase
 
 header = {"Content-Type": "application/json; charset=UTF-8"}
@@ -60,13 +60,13 @@ class TestConfigManage(BaseTestCase):
         }
     ]
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, 'get_host_info')
     @mock.patch.object(MysqlProxy, 'connect')
     def test_collect_config_should_return_get_all_file_content_when_all_is_right(
-            self, mock_connect, mock_host_info, mock_create_thread, mock_get_result):
-        mock_create_thread.return_value = None
+            self, mock_connect, mock_host_info, mock_execute, mock_get_result):
+        mock_execute.return_value = None
         mock_connect.return_value = True
         mock_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
         mock_file_content = [{
@@ -102,13 +102,13 @@ class TestConfigManage(BaseTestCase):
         resp = self.client.post('/manage/config/collect', headers=header)
         self.assertEqual(400, resp.status_code, resp.json)
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, 'get_host_info')
     @mock.patch.object(MysqlProxy, 'connect')
     def test_collect_config_should_return_fail_list_when_input_host_id_not_in_database(
-            self, mock_connect, mock_host_info, mock_create_thread, mock_get_result):
-        mock_create_thread.return_value = None
+            self, mock_connect, mock_host_info, mock_execute, mock_get_result):
+        mock_execute.return_value = None
         mock_connect.return_value = True
         mock_host_info.return_value = SUCCEED, [self.MOCK_HOST_INFO[0]]
         mock_file_content = [{
@@ -134,13 +134,13 @@ class TestConfigManage(BaseTestCase):
         expecte_fail_file = ['mock_path3', 'mock_path4']
         self.assertEqual(set(expecte_fail_file), set(all_fail_file_list))
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, 'get_host_info')
     @mock.patch.object(MysqlProxy, 'connect')
     def test_collect_config_should_return_fail_list_when_get_file_failed_from_ceres(
-            self, mock_connect, mock_host_info, mock_create_thread, mock_get_result):
-        mock_create_thread.return_value = None
+            self, mock_connect, mock_host_info, mock_execute, mock_get_result):
+        mock_execute.return_value = None
         mock_connect.return_value = True
         mock_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
         mock_file_content = [{"message": "error"}, {"message": "error"}]
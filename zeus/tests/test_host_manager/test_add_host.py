@@ -22,7 +22,7 @@ from paramiko import AuthenticationException
 from sqlalchemy.orm.collections import InstrumentedList
 
 from vulcanus.conf.constant import ADD_HOST
-from vulcanus.database.table import Host, HostGroup
+from vulcanus.database.table import Host
 from vulcanus.restful.response import BaseResponse
 from vulcanus.restful.resp.state import (
     DATABASE_INSERT_ERROR,
@@ -486,8 +486,9 @@ class TestAddHost(unittest.TestCase):
             )[0],
         )
 
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
-    def test_validate_host_info_should_return_host_object_when_host_info_is_valid(self, mock_hosts_with_groups):
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    def test_validate_host_info_should_return_host_object_when_host_info_is_valid(self, mock_host_groups, mock_conflict_hosts):
         mock_host_info = {
             "ssh_user": "test_user",
             "host_name": "test_host_2",
@@ -497,14 +498,15 @@ class TestAddHost(unittest.TestCase):
             "management": False,
             "user": "admin",
         }
-        mock_group = HostGroup(host_group_id=1, host_group_name="test_host_group", description="test", username="admin")
-        mock_hosts_with_groups.return_value = SUCCEED, InstrumentedList(), InstrumentedList([mock_group])
+        mock_host_groups.return_value = SUCCEED, {"test_host_group": 1}
+        mock_conflict_hosts.return_value = SUCCEED, []
         target = AddHost()
         target.proxy = HostProxy(configuration)
         self.assertEqual(target.validate_host_info(mock_host_info)[0], SUCCEED)
 
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
-    def test_validate_host_info_should_return_param_error_when_host_group_not_in_database(self, mock_hosts_with_groups):
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    def test_validate_host_info_should_return_param_error_when_host_group_not_in_database(self, mock_host_groups, mock_conflict_hosts):
         mock_host_info = {
             "ssh_user": "test_user",
             "host_name": "test_host_2",
@@ -514,15 +516,15 @@ class TestAddHost(unittest.TestCase):
             "management": False,
             "user": "admin",
         }
-        mock_group = HostGroup(host_group_id=1, host_group_name="test_group", description="test", username="admin")
-        mock_hosts_with_groups.return_value = SUCCEED, InstrumentedList(), InstrumentedList([mock_group])
+        mock_host_groups.return_value = SUCCEED, {"test_group": 1}
         target = AddHost()
         target.proxy = HostProxy(configuration)
         self.assertEqual(target.validate_host_info(
             mock_host_info)[0], PARAM_ERROR)
 
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
-    def test_validate_host_info_should_return_data_exist_when_host_name_in_database(self, mock_hosts_with_groups):
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    def test_validate_host_info_should_return_data_exist_when_host_name_in_database(self, mock_host_groups, mock_conflict_hosts):
         mock_host_info = {
             "ssh_user": "test_user",
             "host_name": "test_host",
@@ -545,15 +547,16 @@ class TestAddHost(unittest.TestCase):
                 "user": "admin",
             }
         )
-        mock_group = HostGroup(host_group_id=1, host_group_name="test_host_group", description="test", username="admin")
-        mock_hosts_with_groups.return_value = SUCCEED, InstrumentedList([mock_host]), InstrumentedList([mock_group])
+        mock_host_groups.return_value = SUCCEED, {"test_host_group": 1}
+        mock_conflict_hosts.return_value = SUCCEED, [mock_host]
         target = AddHost()
         target.proxy = HostProxy(configuration)
         self.assertEqual(
             DATA_EXIST, target.validate_host_info(mock_host_info)[0])
 
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
-    def test_validate_host_info_should_return_data_exist_when_host_ip_in_database(self, mock_hosts_with_groups):
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    def test_validate_host_info_should_return_data_exist_when_host_ip_in_database(self, mock_host_groups, mock_conflict_hosts):
         mock_host_info = {
             "ssh_user": "test_user",
             "host_name": "test_host_1",
@@ -576,8 +579,8 @@ class TestAddHost(unittest.TestCase):
                 "user": "admin",
             }
         )
-        mock_group = HostGroup(host_group_id=1, host_group_name="test_host_group", description="test", username="admin")
-        mock_hosts_with_groups.return_value = SUCCEED, InstrumentedList([mock_host]), InstrumentedList([mock_group])
+        mock_host_groups.return_value = SUCCEED, {"test_host_group": 1}
+        mock_conflict_hosts.return_value = SUCCEED, [mock_host]
         target = AddHost()
         target.proxy = HostProxy(configuration)
         self.assertEqual(
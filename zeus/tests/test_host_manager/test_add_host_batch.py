@@ -13,14 +13,12 @@
 import json
 from unittest import mock
 
-from sqlalchemy.orm.collections import InstrumentedList
-
 from vulcanus.conf.constant import ADD_HOST_BATCH
 from vulcanus.database.proxy import MysqlProxy
-from vulcanus.database.table import Host, HostGroup
-from vulcanus.multi_thread_handler import MultiThreadHandler
+from vulcanus.database.table import Host
 from vulcanus.restful.resp import state
 from zeus.database.proxy.host import HostProxy
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.host_manager.view import AddHostBatch
 from zeus.tests import BaseTestCase
 
@@ -66,27 +64,29 @@ class TestAddHostBatch(BaseTestCase):
                 "management": True,
             },
         ]
-        self.mock_group = HostGroup(host_group_id=1, host_group_name="group1", description="test", username="admin")
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, "add_host_batch")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
     @mock.patch.object(HostProxy, "connect")
     @mock.patch.object(AddHostBatch, "verify_request")
     def test_add_host_batch_should_add_host_succeed_when_input_valid_data_with_token(
         self,
         mock_verify_request,
         mock_connect,
-        mock_hosts_with_groups,
+        mock_host_groups,
+        mock_conflict_hosts,
         mock_add_host_batch,
-        mock_create_thread,
+        mock_execute,
         mock_get_result,
     ):
         mock_verify_request.return_value = state.SUCCEED, {"host_list": self.mock_host_list, "username": "admin"}
         mock_connect.return_value = True
-        mock_hosts_with_groups.return_value = state.SUCCEED, InstrumentedList(), InstrumentedList([self.mock_group])
-        mock_create_thread.return_value = None
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, []
+        mock_execute.return_value = None
         mock_get_result.return_value = self.mock_host_list
         mock_add_host_batch.return_value = state.SUCCEED
         response = client.post(ADD_HOST_BATCH, data={"host_list": self.mock_host_list}, headers=header_with_token)
@@ -114,42 +114,71 @@ class TestAddHostBatch(BaseTestCase):
         response = client.post(ADD_HOST_BATCH, data={"host_list": self.mock_host_list}, headers=header_with_token)
         self.assertEqual(state.DATABASE_CONNECT_ERROR, response.json.get('label'))
 
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
+    @mock.patch.object(HostProxy, "query_host_groups")
     @mock.patch.object(HostProxy, "connect")
     @mock.patch.object(AddHostBatch, "verify_request")
-    def test_add_host_batch_should_database_query_error_when_query_hosts_with_groups_failed(
+    def test_add_host_batch_should_database_query_error_when_query_host_groups_failed(
         self, mock_verify_request, mock_connect_database, mock_query
     ):
         mock_verify_request.return_value = state.SUCCEED, {"host_list": self.mock_host_list}
         mock_connect_database.return_value = True
-        mock_query.return_value = state.DATABASE_QUERY_ERROR, InstrumentedList(), InstrumentedList()
+        mock_query.return_value = state.DATABASE_QUERY_ERROR, {}
         response = client.post(ADD_HOST_BATCH, data={"host_list": self.mock_host_list}, headers=header_with_token)
         self.assertEqual(state.DATABASE_QUERY_ERROR, response.json.get('label'))
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, "add_host_batch")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
     @mock.patch.object(HostProxy, "connect")
     @mock.patch.object(AddHostBatch, "verify_request")
     def test_add_host_batch_should_database_insert_error_when_insert_into_data_failed(
         self,
         mock_verify_request,
         mock_connect_database,
-        mock_query,
+        mock_host_groups,
+        mock_conflict_hosts,
         mock_add_host_batch,
-        mock_create_thread,
+        mock_execute,
         mock_get_result,
     ):
         mock_verify_request.return_value = state.SUCCEED, {"host_list": self.mock_host_list, "username": "admin"}
         mock_connect_database.return_value = True
-        mock_query.return_value = state.SUCCEED, InstrumentedList(), InstrumentedList([self.mock_group])
-        mock_create_thread.return_value = None
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, []
+        mock_execute.return_value = None
         mock_get_result.return_value = self.mock_host_list
         mock_add_host_batch.return_value = state.DATABASE_INSERT_ERROR
         response = client.post(ADD_HOST_BATCH, data={"host_list": self.mock_host_list}, headers=header_with_token)
         self.assertEqual(state.DATABASE_INSERT_ERROR, response.json.get('label'))
 
+    @mock.patch.object(AddHostBatch, "save_key_to_client")
+    @mock.patch.object(HostProxy, "add_host_batch")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    @mock.patch.object(HostProxy, "connect")
+    @mock.patch.object(AddHostBatch, "verify_request")
+    def test_add_host_batch_should_return_partial_succeed_when_some_hosts_are_existed_in_database(
+        self,
+        mock_verify_request,
+        mock_connect_database,
+        mock_host_groups,
+        mock_conflict_hosts,
+        mock_add_host_batch,
+        mock_save_key,
+    ):
+        mock_verify_request.return_value = state.SUCCEED, {"host_list": self.mock_host_list, "username": "admin"}
+        mock_connect_database.return_value = True
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, [Host(host_name="mock_host_2", host_ip="ip", ssh_port=22)]
+        mock_save_key.side_effect = lambda hosts: [host for host, _ in hosts]
+        mock_add_host_batch.return_value = state.SUCCEED
+        response = client.post(ADD_HOST_BATCH, data={"host_list": self.mock_host_list}, headers=header_with_token)
+        self.assertEqual(state.PARTIAL_SUCCEED, response.json.get('label'))
+        self.assertEqual(2, len(mock_add_host_batch.call_args[0][0]))
+        self.assertEqual(1, mock_conflict_hosts.call_count)
+
     def test_verify_request_should_return_param_error_when_request_args_is_incorrect(self):
         mock_incorrect_args_list = [
             [
@@ -303,3 +332,23 @@ class TestAddHostBatch(BaseTestCase):
         )
         mock_args = mock_host, "password"
         self.assertEqual(mock_host, AddHostBatch().update_rsa_key_to_host(*mock_args))
+
+    @mock.patch("zeus.host_manager.view.save_ssh_public_key_to_client")
+    def test_save_key_to_client_should_return_all_hosts_when_saving_key_to_some_hosts_raise_error(
+        self, mock_save_key
+    ):
+        def save_key(host_ip, *_):
+            if host_ip == "127.0.0.2":
+                raise OSError("mock error")
+            return state.SUCCEED, "pkey"
+
+        mock_save_key.side_effect = save_key
+        mock_hosts = [
+            Host(host_name=f"hostname{index}", ssh_user="user1", host_ip=f"127.0.0.{index}", ssh_port=22)
+            for index in range(1, 4)
+        ]
+
+        result = AddHostBatch().save_key_to_client([(host, "password") for host in mock_hosts])
+
+        self.assertEqual(3, len(result))
+        self.assertEqual(["pkey", None, "pkey"], [host.pkey for host in mock_hosts])
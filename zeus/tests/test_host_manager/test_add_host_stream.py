@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import json
+from unittest import mock
+
+from vulcanus.database.table import Host
+from vulcanus.restful.resp import state
+from vulcanus.restful.response import BaseResponse
+from zeus.conf.constant import ADD_HOST_STREAM
+from zeus.database.proxy.host import HostProxy
+from zeus.host_manager.view import AddHostStream
+from zeus.tests import BaseTestCase
+
+client = BaseTestCase.create_app()
+header_with_token = {"access_token": "123456"}
+
+MOCK_CSV_FILE = """host_ip,ssh_port,ssh_user,password,host_name,host_group_name,management
+127.0.0.1,22,root,password,host_1,group1,False
+127.0.0.2,22,root,password,host_2,group1,True
+127.0.0.3,22,root,password,host_3,group2,False
+127.0.0.1,22,root,password,host_4,group1,False
+127.0.0.5,22,root,password,host_5,group1,False
+"""
+
+
+def mock_verify_token(token, args):
+    args["username"] = "admin"
+    return state.SUCCEED
+
+
+class TestAddHostStream(BaseTestCase):
+    @mock.patch.object(AddHostStream, "save_key_to_client")
+    @mock.patch.object(HostProxy, "add_host_batch")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    @mock.patch.object(HostProxy, "connect")
+    @mock.patch.object(BaseResponse, "verify_token")
+    @mock.patch("zeus.host_manager.view.configuration")
+    def test_add_host_stream_should_save_hosts_in_chunks_and_return_result_of_every_row_when_upload_csv_file(
+        self,
+        mock_config,
+        mock_token,
+        mock_connect,
+        mock_host_groups,
+        mock_conflict_hosts,
+        mock_add_host_batch,
+        mock_save_key,
+    ):
+        mock_config.ssh = {"ADD_HOST_CHUNK_SIZE": 2}
+        mock_token.side_effect = mock_verify_token
+        mock_connect.return_value = True
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, []
+        mock_add_host_batch.return_value = state.SUCCEED
+        mock_save_key.side_effect = lambda hosts: [host for host, _ in hosts]
+
+        response = client.post(ADD_HOST_STREAM, data=MOCK_CSV_FILE, headers=header_with_token, content_type="text/csv")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(2, mock_add_host_batch.call_count)
+        self.assertEqual(
+            ["host_1", "host_2", "host_3", "host_4", "host_5"], [line.get("host_name") for line in lines[:-1]]
+        )
+        self.assertEqual(["succeed", "succeed", "failed", "failed", "succeed"], [line["result"] for line in lines[:-1]])
+        self.assertEqual({"label": state.PARTIAL_SUCCEED, "succeed": 3, "failed": 2}, lines[-1])
+        self.assertIsInstance(mock_add_host_batch.call_args_list[0][0][0][0], Host)
+
+    @mock.patch.object(AddHostStream, "save_key_to_client")
+    @mock.patch.object(HostProxy, "add_host_batch")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    @mock.patch.object(HostProxy, "connect")
+    @mock.patch.object(BaseResponse, "verify_token")
+    def test_add_host_stream_should_return_failed_result_of_invalid_line_when_upload_ndjson_file(
+        self, mock_token, mock_connect, mock_host_groups, mock_conflict_hosts, mock_add_host_batch, mock_save_key
+    ):
+        mock_token.side_effect = mock_verify_token
+        mock_connect.return_value = True
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, []
+        mock_add_host_batch.return_value = state.SUCCEED
+        mock_save_key.side_effect = lambda hosts: [host for host, _ in hosts]
+        host_info = {
+            "host_ip": "127.0.0.1",
+            "ssh_port": 22,
+            "ssh_user": "root",
+            "password": "password",
+            "host_name": "host_1",
+            "host_group_name": "group1",
+            "management": False,
+        }
+
+        response = client.post(
+            ADD_HOST_STREAM,
+            data=json.dumps(host_info) + "\n{invalid\n",
+            headers=header_with_token,
+            content_type="application/x-ndjson",
+        )
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(["failed", "succeed"], [line["result"] for line in lines[:-1]])
+        self.assertEqual({"label": state.PARTIAL_SUCCEED, "succeed": 1, "failed": 1}, lines[-1])
+
+    @mock.patch.object(AddHostStream, "save_key_to_client")
+    @mock.patch.object(HostProxy, "add_host_batch")
+    @mock.patch.object(HostProxy, "query_conflict_hosts")
+    @mock.patch.object(HostProxy, "query_host_groups")
+    @mock.patch.object(HostProxy, "connect")
+    @mock.patch.object(BaseResponse, "verify_token")
+    def test_add_host_stream_should_ignore_keys_out_of_schema_when_line_has_extra_keys(
+        self, mock_token, mock_connect, mock_host_groups, mock_conflict_hosts, mock_add_host_batch, mock_save_key
+    ):
+        mock_token.side_effect = mock_verify_token
+        mock_connect.return_value = True
+        mock_host_groups.return_value = state.SUCCEED, {"group1": 1}
+        mock_conflict_hosts.return_value = state.SUCCEED, []
+        mock_add_host_batch.return_value = state.SUCCEED
+        mock_save_key.side_effect = lambda hosts: [host for host, _ in hosts]
+        host_info = {
+            "host_ip": "127.0.0.1",
+            "ssh_port": 22,
+            "ssh_user": "root",
+            "password": "password",
+            "host_name": "host_1",
+            "host_group_name": "group1",
+            "management": False,
+            "comment": "extra key",
+            "host_id": 100,
+            "pkey": "private key",
+        }
+
+        response = client.post(
+            ADD_HOST_STREAM, data=json.dumps(host_info), headers=header_with_token, content_type="application/x-ndjson"
+        )
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        host = mock_add_host_batch.call_args[0][0][0]
+
+        self.assertEqual({"label": state.SUCCEED, "succeed": 1, "failed": 0}, lines[-1])
+        self.assertEqual(("127.0.0.1", 1, "admin"), (host.host_ip, host.host_group_id, host.user))
+        self.assertIsNone(host.host_id)
+        self.assertIsNone(host.pkey)
+
+    @mock.patch.object(BaseResponse, "verify_token")
+    def test_add_host_stream_should_return_token_error_when_request_with_incorrect_token(self, mock_token):
+        mock_token.return_value = state.TOKEN_ERROR
+
+        response = client.post(ADD_HOST_STREAM, data=MOCK_CSV_FILE, headers=header_with_token, content_type="text/csv")
+
+        self.assertEqual(state.TOKEN_ERROR, response.json.get("label"))
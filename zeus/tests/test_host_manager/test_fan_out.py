@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import gc
+import unittest
+from unittest import mock
+
+import gevent
+from gevent.lock import BoundedSemaphore
+
+from zeus.host_manager import fan_out
+from zeus.host_manager.fan_out import FanOutHandler
+
+
+class TestFanOutHandler(unittest.TestCase):
+    def test_execute_should_call_callback_in_order_of_completion_when_tasks_finish_at_different_time(self):
+        def sleep_and_return(host, seconds):
+            gevent.sleep(seconds)
+            return host
+
+        callback_result = []
+        handler = FanOutHandler(sleep_and_return, [("host_1", 0.05), ("host_2", 0), ("host_3", 0.02)])
+        handler.execute(callback=callback_result.append)
+
+        self.assertEqual(["host_2", "host_3", "host_1"], callback_result)
+        self.assertEqual(callback_result, handler.get_result())
+
+    def test_execute_should_use_fallback_result_when_task_raise_error_or_timeout(self):
+        def execute(host):
+            if host == "error_host":
+                raise ValueError("mock error")
+            gevent.sleep(1)
+
+        handler = FanOutHandler(
+            execute, [("error_host",), ("slow_host",)], timeout=0.01, fallback=lambda host, error: host
+        )
+        handler.execute()
+
+        self.assertEqual({"error_host", "slow_host"}, set(handler.get_result()))
+
+    def test_execute_should_skip_unfinished_tasks_when_deadline_is_reached_without_fallback(self):
+        handler = FanOutHandler(gevent.sleep, [(0,), (1,)], deadline=0.05)
+        handler.execute()
+
+        self.assertEqual([], handler.get_result())
+
+    def test_execute_should_run_tasks_of_same_target_one_by_one_when_per_host_limit_is_reached(self):
+        running = {"current": 0, "max": 0}
+
+        def execute(host):
+            running["current"] += 1
+            running["max"] = max(running["max"], running["current"])
+            gevent.sleep(0.01)
+            running["current"] -= 1
+            return host
+
+        handler = FanOutHandler(execute, [("host_1",)] * 10, target=lambda host: host)
+        handler.execute()
+
+        self.assertEqual(10, len(handler.get_result()))
+        self.assertLessEqual(running["max"], 4)
+
+    @mock.patch.object(fan_out, "FAN_OUT_PER_HOST_LIMIT", 1)
+    @mock.patch.object(fan_out, "_GLOBAL_SEMAPHORE", BoundedSemaphore(2))
+    def test_execute_should_not_block_other_targets_when_tasks_are_waiting_for_a_busy_target(self):
+        def execute(host):
+            gevent.sleep(0.02 if host == "busy_host" else 0)
+            return host
+
+        handler = FanOutHandler(execute, [("busy_host",)] * 5 + [("idle_host",)], target=lambda host: host)
+        handler.execute()
+
+        self.assertEqual("idle_host", handler.get_result()[0])
+
+    def test_execute_should_drop_semaphore_of_target_when_its_tasks_are_finished(self):
+        handler = FanOutHandler(lambda host: host, [("dropped_host",)] * 3, target=lambda host: host)
+        handler.execute()
+        gc.collect()
+
+        self.assertNotIn("dropped_host", fan_out._TARGET_SEMAPHORES)
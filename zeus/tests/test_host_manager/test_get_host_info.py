@@ -18,7 +18,6 @@ import sqlalchemy
 
 from vulcanus.conf.constant import QUERY_HOST_DETAIL
 from vulcanus.database.proxy import MysqlProxy
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp.state import (
     SUCCEED,
     TOKEN_ERROR,
@@ -27,6 +26,7 @@ from vulcanus.restful.resp.state import (
 )
 from vulcanus.restful.response import BaseResponse
 from zeus.database.proxy.host import HostProxy
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.host_manager.view import GetHostInfo
 from zeus.tests import BaseTestCase
 
@@ -64,15 +64,15 @@ class TestGetHostInfo(unittest.TestCase):
         ]
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch.object(HostProxy, 'get_host_info')
     @mock.patch.object(MysqlProxy, '_create_session')
     @mock.patch.object(BaseResponse, 'verify_request')
     def test_get_host_info_from_ceres_should_return_host_info_when_all_is_right(
-            self, mock_verify_request, mock_connect, mock_host_basic_info, mock_create_thread, mock_get_result, mock_close):
+            self, mock_verify_request, mock_connect, mock_host_basic_info, mock_execute, mock_get_result, mock_close):
         mock_verify_request.return_value = self.mock_args, SUCCEED
-        mock_create_thread.return_value = None
+        mock_execute.return_value = None
         mock_connect.return_value = None
         mock_host_basic_info.return_value = SUCCEED, self.mock_host_basic_info
         mock_get_result.return_value = [
@@ -15,14 +15,19 @@ Time:
 Author:
 Description:
 """
+import base64
+import json
 import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
 from werkzeug.security import generate_password_hash
 
-from vulcanus.database.table import Host, User, Base, create_utils_tables
+from vulcanus.database.table import Host, HostGroup, User, Base, create_utils_tables
 from vulcanus.database.helper import drop_tables, create_database_engine
-from vulcanus.restful.resp.state import DATA_EXIST, PARTIAL_SUCCEED, SUCCEED, DATA_DEPENDENCY_ERROR
+from vulcanus.restful.resp.state import DATA_EXIST, PARTIAL_SUCCEED, PARAM_ERROR, SUCCEED, DATA_DEPENDENCY_ERROR
 from vulcanus.compare import compare_two_object
-from zeus.database.proxy.host import HostProxy
+from zeus.database.proxy.host import HostProxy, decode_cursor, encode_cursor
 from zeus.conf import configuration
 
 
@@ -386,3 +391,95 @@ class TestHostDatabase(unittest.TestCase):
         args = {"host_group_list": ["group1"], "username": "admin"}
         res = self.proxy.get_host(args)
         self.assertEqual(res[1]['total_count'], 1)
+
+
+def raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("utf-8")
+
+
+class TestHostCursor(unittest.TestCase):
+    INVALID_CURSORS = [
+        "not base64 ~",
+        raw_cursor({"host_name": "host1"}),
+        raw_cursor([["host1"], 1]),
+        raw_cursor(["host1"]),
+        raw_cursor(["host1", 1, 2]),
+        123,
+    ]
+
+    def setUp(self) -> None:
+        engine = create_engine("sqlite://")
+        Host.__table__.create(engine)
+        HostGroup.__table__.create(engine)
+        self.proxy = HostProxy.__new__(HostProxy)
+        self.proxy.session = scoped_session(sessionmaker(bind=engine))
+
+    def _add_hosts(self):
+        for group_id in range(1, 4):
+            self.proxy.session.add(
+                HostGroup(host_group_id=group_id, host_group_name=f"group{group_id}", username="admin")
+            )
+        for host_id in range(1, 6):
+            self.proxy.session.add(
+                Host(
+                    user="admin",
+                    host_name=f"host{host_id}",
+                    host_group_name=f"group{host_id % 2 + 1}",
+                    host_id=host_id,
+                    host_ip=f"127.0.0.{host_id}",
+                    management=False,
+                    host_group_id=host_id % 2 + 1,
+                )
+            )
+        self.proxy.session.commit()
+
+    def test_decode_cursor_should_return_values_when_cursor_is_encoded_from_values_of_sort_columns(self):
+        self.assertEqual(["host1", 1], decode_cursor(encode_cursor(["host1", 1]), 2))
+
+    def test_decode_cursor_should_raise_value_error_when_cursor_has_wrong_shape(self):
+        for cursor in self.INVALID_CURSORS:
+            with self.assertRaises(ValueError, msg=cursor):
+                decode_cursor(cursor, 2)
+
+    def test_get_host_should_return_param_error_when_cursor_is_invalid(self):
+        for cursor in self.INVALID_CURSORS:
+            status, _ = self.proxy.get_host({"username": "admin", "sort": "host_name", "cursor": cursor})
+            self.assertEqual(PARAM_ERROR, status, cursor)
+
+    def test_get_host_group_should_return_param_error_when_cursor_is_invalid(self):
+        for cursor in self.INVALID_CURSORS:
+            status, _ = self.proxy.get_host_group({"username": "admin", "sort": "host_count", "cursor": cursor})
+            self.assertEqual(PARAM_ERROR, status, cursor)
+
+    def test_get_host_by_cursor_should_return_every_host_once_when_read_all_pages(self):
+        self._add_hosts()
+
+        host_ids, cursor = [], ""
+        while cursor is not None:
+            args = {
+                "username": "admin",
+                "sort": "host_group_name",
+                "direction": "desc",
+                "per_page": 2,
+                "cursor": cursor,
+            }
+            status, result = self.proxy.get_host(args)
+            self.assertEqual(SUCCEED, status)
+            host_ids.extend(host["host_id"] for host in result["host_infos"])
+            cursor = result["next_cursor"]
+
+        self.assertEqual([5, 3, 1, 4, 2], host_ids)
+        self.assertNotIn("total_count", result)
+
+    def test_get_host_group_by_cursor_should_return_every_group_once_when_sorted_by_host_count(self):
+        self._add_hosts()
+
+        group_names, cursor = [], ""
+        while cursor is not None:
+            args = {"username": "admin", "sort": "host_count", "direction": "desc", "per_page": 2, "cursor": cursor}
+            status, result = self.proxy.get_host_group(args)
+            self.assertEqual(SUCCEED, status)
+            group_names.extend(group["host_group_name"] for group in result["host_group_infos"])
+            cursor = result["next_cursor"]
+
+        self.assertEqual(["group2", "group1", "group3"], group_names)
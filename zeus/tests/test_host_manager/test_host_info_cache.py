@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import json
+import unittest
+from unittest import mock
+
+from redis import RedisError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from vulcanus.database.table import Host
+from vulcanus.restful.resp.state import SUCCEED
+from zeus.database.cache import HostInfoCache, HostPrivateKeyCache
+from zeus.database.proxy.host import HostProxy
+
+
+class TestHostInfoCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = HostInfoCache()
+        self.client = mock.MagicMock()
+        patcher = mock.patch.object(HostInfoCache, "_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_many_should_return_cached_hosts_and_missed_host_ids_when_part_of_hosts_are_cached(self):
+        host_info = {"host_id": 1, "user": "admin", "host_ip": "127.0.0.1"}
+        self.client.mget.return_value = [json.dumps(host_info).encode(), None]
+
+        cached, missed = self.cache.get_many([1, 2])
+
+        self.client.mget.assert_called_once_with(["host_info_1", "host_info_2"])
+        self.assertEqual({1: host_info}, cached)
+        self.assertEqual([2], missed)
+
+    def test_get_many_should_return_all_host_ids_as_missed_when_redis_raise_error(self):
+        self.client.mget.side_effect = RedisError
+
+        self.assertEqual(({}, [1, 2]), self.cache.get_many([1, 2]))
+
+    def test_set_many_should_save_every_host_with_expire_time_in_one_pipeline(self):
+        pipeline = self.client.pipeline.return_value
+
+        self.cache.set_many([{"host_id": 1}, {"host_id": 2}])
+
+        self.assertEqual(2, pipeline.set.call_count)
+        pipeline.set.assert_called_with("host_info_2", json.dumps({"host_id": 2}), ex=self.cache.expire)
+        pipeline.execute.assert_called_once()
+
+
+class TestGetHostInfo(unittest.TestCase):
+    def setUp(self) -> None:
+        engine = create_engine("sqlite://")
+        Host.__table__.create(engine)
+        self.proxy = HostProxy.__new__(HostProxy)
+        self.proxy.session = scoped_session(sessionmaker(bind=engine))
+        for host_id in (1, 2):
+            self.proxy.session.add(
+                Host(
+                    host_id=host_id,
+                    host_name=f"host{host_id}",
+                    host_ip="127.0.0.1",
+                    ssh_port=22 + host_id,
+                    ssh_user="root",
+                    pkey=f"rsa-key-{host_id}",
+                    user="admin",
+                    management=True,
+                    host_group_name="group1",
+                )
+            )
+        self.proxy.session.commit()
+        self.cached = {}
+        patcher = mock.patch("zeus.database.proxy.host.HOST_INFO")
+        host_info_cache = patcher.start()
+        self.addCleanup(patcher.stop)
+        host_info_cache.get_many.side_effect = lambda host_ids: (
+            {host_id: dict(self.cached[host_id]) for host_id in host_ids if host_id in self.cached},
+            [host_id for host_id in host_ids if host_id not in self.cached],
+        )
+        host_info_cache.set_many.side_effect = lambda host_infos: self.cached.update(
+            (host_info["host_id"], json.loads(json.dumps(host_info))) for host_info in host_infos
+        )
+        patcher = mock.patch("zeus.database.proxy.host.HOST_PKEY", HostPrivateKeyCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_host_info_should_never_cache_private_keys_of_hosts(self):
+        self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]}, with_pkey=True)
+
+        self.assertEqual([1, 2], sorted(self.cached))
+        self.assertTrue(all("pkey" not in host_info for host_info in self.cached.values()))
+
+    def test_get_host_info_should_read_private_keys_from_table_when_hosts_are_cached_and_keys_are_needed(self):
+        self.proxy.get_host_info({"username": "admin", "host_list": [1]})
+
+        status, host_infos = self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]}, with_pkey=True)
+
+        self.assertEqual(SUCCEED, status)
+        self.assertEqual({1: "rsa-key-1", 2: "rsa-key-2"}, {host["host_id"]: host["pkey"] for host in host_infos})
+
+    def test_get_host_info_should_use_private_keys_in_memory_until_digest_of_cached_host_is_changed(self):
+        self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]}, with_pkey=True)
+        self.proxy.session.query(Host).filter(Host.host_id == 1).update({Host.pkey: "rsa-key-new"})
+        self.proxy.session.commit()
+
+        with mock.patch.object(self.proxy.session, "query", side_effect=AssertionError("query table")):
+            _, host_infos = self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]}, with_pkey=True)
+        self.assertEqual({1: "rsa-key-1", 2: "rsa-key-2"}, {host["host_id"]: host["pkey"] for host in host_infos})
+
+        self.cached[1]["pkey_digest"] = HostPrivateKeyCache.digest("rsa-key-new")
+        _, host_infos = self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]}, with_pkey=True)
+        self.assertEqual({1: "rsa-key-new", 2: "rsa-key-2"}, {host["host_id"]: host["pkey"] for host in host_infos})
+        self.assertTrue(all("pkey_digest" not in host_info for host_info in host_infos))
+
+    def test_get_host_info_should_not_return_private_keys_when_they_are_not_needed(self):
+        _, host_infos = self.proxy.get_host_info({"username": "admin", "host_list": [1, 2]})
+
+        self.assertTrue(all("pkey" not in host_info for host_info in host_infos))
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from unittest import mock
+
+from redis import RedisError
+
+from vulcanus.database.table import Host
+from zeus.database.cache import HostSummaryCache
+
+
+class TestHostSummaryCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = HostSummaryCache(reconcile_interval=0)
+        self.client = mock.MagicMock()
+        patcher = mock.patch.object(HostSummaryCache, "_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_should_return_decoded_counters_when_summary_is_cached(self):
+        self.client.hgetall.return_value = {b"total": b"3", b"status:0": b"2", b"group:1": b"3"}
+
+        self.assertEqual({"total": 3, "status:0": 2, "group:1": 3}, self.cache.get(mock.Mock(), "admin"))
+
+    def test_get_should_rebuild_summary_from_database_when_summary_is_not_cached(self):
+        self.client.hgetall.return_value = {}
+        with mock.patch.object(HostSummaryCache, "rebuild", return_value={"total": 0}) as mock_rebuild:
+            session = mock.Mock()
+            self.assertEqual({"total": 0}, self.cache.get(session, "admin"))
+        mock_rebuild.assert_called_once_with(session, "admin")
+
+    def test_get_should_return_none_when_redis_raise_error(self):
+        self.client.hgetall.side_effect = RedisError
+
+        self.assertIsNone(self.cache.get(mock.Mock(), "admin"))
+
+    def test_apply_should_increase_counters_of_every_user_when_hosts_are_added_and_deleted(self):
+        added = [
+            Host(user="admin", status=0, host_group_id=1),
+            Host(user="admin", status=1, host_group_id=1),
+            Host(user="test", status=0, host_group_id=2),
+        ]
+        deleted = [Host(user="admin", status=0, host_group_id=1)]
+        changes = self.cache.host_changes(added)
+        for username, counter in self.cache.host_changes(deleted, sign=-1).items():
+            changes[username].update(counter)
+
+        self.cache.apply(changes)
+
+        self.assertEqual(2, self.client.eval.call_count)
+        admin_args = self.client.eval.call_args_list[0][0]
+        self.assertEqual("host_summary_admin", admin_args[2])
+        self.assertEqual({"total": 1, "status:1": 1, "group:1": 1}, dict(zip(admin_args[3::2], admin_args[4::2])))
+
+    def test_increase_should_delete_summary_when_redis_raise_error(self):
+        self.client.eval.side_effect = RedisError
+
+        self.cache.increase("admin", {"total": 1})
+
+        self.client.delete.assert_called_once_with("host_summary_admin")
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from io import StringIO
+from unittest import mock
+
+import gevent
+import paramiko
+
+from zeus.function.model import ClientConnectArgs
+from zeus.host_manager.ssh import KeyPairFactory, PrivateKeyCache, SSHConnectionPool
+
+
+class TestSSHConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.connect_args = ClientConnectArgs("127.0.0.1", 22, "root", "rsa-key")
+        self.pkey = mock.Mock()
+        self.pkey.get_fingerprint.return_value = b"fingerprint"
+
+    @mock.patch("zeus.host_manager.ssh.SSH")
+    def test_execute_command_should_reuse_connection_when_connection_is_active(self, mock_ssh):
+        client = mock_ssh.return_value
+        client.is_active.return_value = True
+        client.run_command.return_value = 0, "stdout", ""
+        pool = SSHConnectionPool()
+
+        pool.execute_command(self.connect_args, self.pkey, "ls")
+        result = pool.execute_command(self.connect_args, self.pkey, "ls")
+
+        self.assertEqual((0, "stdout", ""), result)
+        self.assertEqual(1, mock_ssh.call_count)
+        self.assertEqual(2, client.open_session.call_count)
+
+    @mock.patch("zeus.host_manager.ssh.SSH")
+    def test_execute_command_should_reconnect_when_pooled_connection_is_broken(self, mock_ssh):
+        broken_client, new_client = mock.Mock(), mock.Mock()
+        mock_ssh.side_effect = [broken_client, new_client]
+        broken_client.is_active.return_value = True
+        broken_client.run_command.return_value = 0, "", ""
+        new_client.run_command.return_value = 0, "stdout", ""
+        pool = SSHConnectionPool()
+
+        pool.execute_command(self.connect_args, self.pkey, "ls")
+        broken_client.open_session.side_effect = paramiko.ssh_exception.SSHException()
+        result = pool.execute_command(self.connect_args, self.pkey, "ls")
+
+        self.assertEqual((0, "stdout", ""), result)
+        broken_client.close.assert_called_once()
+
+    @mock.patch("zeus.host_manager.ssh.SSH")
+    def test_execute_command_should_raise_error_when_new_connection_can_not_open_channel(self, mock_ssh):
+        mock_ssh.return_value.open_session.side_effect = paramiko.ssh_exception.SSHException()
+        pool = SSHConnectionPool()
+
+        with self.assertRaises(paramiko.ssh_exception.SSHException):
+            pool.execute_command(self.connect_args, self.pkey, "ls")
+        mock_ssh.return_value.close.assert_called_once()
+
+    @mock.patch("zeus.host_manager.ssh.SSH")
+    def test_execute_command_should_create_new_connection_when_idle_connection_expired(self, mock_ssh):
+        mock_ssh.return_value.is_active.return_value = True
+        mock_ssh.return_value.run_command.return_value = 0, "", ""
+        pool = SSHConnectionPool(idle_timeout=-1)
+
+        pool.execute_command(self.connect_args, self.pkey, "ls")
+        pool.execute_command(self.connect_args, self.pkey, "ls")
+
+        self.assertEqual(2, mock_ssh.call_count)
+
+
+class TestPrivateKeyCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        output = StringIO()
+        paramiko.RSAKey.generate(1024).write_private_key(output)
+        cls.private_key = output.getvalue()
+
+    def test_get_should_parse_key_only_once_when_key_is_requested_repeatedly(self):
+        cache = PrivateKeyCache()
+
+        first = cache.get(self.private_key)
+        second = cache.get(self.private_key)
+
+        self.assertIs(first, second)
+        self.assertEqual({"hits": 1, "misses": 1, "size": 1, "max_size": 10000}, cache.cache_info())
+
+    def test_get_should_evict_least_recently_used_key_when_cache_is_full(self):
+        output = StringIO()
+        paramiko.RSAKey.generate(1024).write_private_key(output)
+        cache = PrivateKeyCache(max_size=1)
+
+        cache.get(self.private_key)
+        cache.get(output.getvalue())
+        cache.get(self.private_key)
+
+        self.assertEqual(3, cache.cache_info()["misses"])
+        self.assertEqual(1, cache.cache_info()["size"])
+
+    def test_invalidate_should_parse_key_again_when_key_has_been_invalidated(self):
+        cache = PrivateKeyCache()
+
+        cache.get(self.private_key)
+        self.assertIsNotNone(cache.invalidate(self.private_key))
+        cache.get(self.private_key)
+
+        self.assertEqual(2, cache.cache_info()["misses"])
+
+
+class TestKeyPairFactory(unittest.TestCase):
+    def test_get_should_return_usable_key_pair_when_key_type_is_ed25519(self):
+        factory = KeyPairFactory("ed25519", pool_size=1)
+
+        private_key, public_key = factory.get()
+
+        self.assertTrue(public_key.startswith("ssh-ed25519 "))
+        self.assertEqual("ssh-ed25519", PrivateKeyCache().get(private_key).get_name())
+
+    def test_get_should_return_rsa_key_pair_when_key_type_is_unsupported(self):
+        factory = KeyPairFactory("dsa", pool_size=1)
+
+        private_key, public_key = factory.get()
+
+        self.assertTrue(public_key.startswith("ssh-rsa "))
+        self.assertEqual("ssh-rsa", PrivateKeyCache().get(private_key).get_name())
+
+    @mock.patch("zeus.host_manager.ssh.generate_key_pair")
+    def test_get_should_generate_key_for_request_when_no_key_pair_is_ready(self, mock_generate_key_pair):
+        mock_generate_key_pair.return_value = "private_key", "public_key"
+        factory = KeyPairFactory(pool_size=0, wait_timeout=0)
+
+        self.assertEqual(("private_key", "public_key"), factory.get())
+
+    @mock.patch("zeus.host_manager.ssh.generate_key_pair")
+    def test_get_should_return_pre_generated_key_pair_and_refill_pool_when_pool_is_ready(self, mock_generate_key_pair):
+        mock_generate_key_pair.side_effect = [("private_key_1", "public_key_1"), ("private_key_2", "public_key_2")]
+        factory = KeyPairFactory(pool_size=1)
+
+        self.assertEqual(("private_key_1", "public_key_1"), factory.get())
+        gevent.sleep(0.1)
+
+        self.assertEqual(2, mock_generate_key_pair.call_count)
+        self.assertEqual(("private_key_2", "public_key_2"), factory.get())
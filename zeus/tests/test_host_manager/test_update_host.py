@@ -14,7 +14,6 @@ import json
 from unittest import mock
 
 import sqlalchemy
-from sqlalchemy.orm.collections import InstrumentedList
 
 from vulcanus.conf.constant import UPDATE_HOST
 from vulcanus.database.proxy import MysqlProxy
@@ -81,17 +80,44 @@ class TestConfigManage(BaseTestCase):
         }
         self.incorrect_host_id = 10
 
+    def mock_host_database(self, status=state.SUCCEED):
+        def query_host(username, host_id):
+            for host in self.mock_host_list:
+                if host.host_id == host_id:
+                    return status, host
+            return state.NO_DATA if status == state.SUCCEED else status, Host()
+
+        def query_conflict_hosts(username, hosts):
+            addresses = {f"{host.host_ip}:{host.ssh_port}" for host in hosts if host.ssh_port}
+            conflict_hosts = [
+                host
+                for host in self.mock_host_list
+                if host.host_name in {host.host_name for host in hosts}
+                or f"{host.host_ip}:{host.ssh_port}" in addresses
+            ]
+            return status, conflict_hosts
+
+        def query_host_groups(username):
+            return status, {group.host_group_name: group.host_group_id for group in self.group_list}
+
+        for name, func in (
+            ("query_host", query_host),
+            ("query_conflict_hosts", query_conflict_hosts),
+            ("query_host_groups", query_host_groups),
+        ):
+            patcher = mock.patch.object(HostProxy, name, side_effect=func)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @mock.patch.object(HostProxy, "__exit__")
     @mock.patch.object(HostProxy, "update_host_info")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch("zeus.host_manager.view.save_ssh_public_key_to_client")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_update_succeed_when_all_right(
-            self, mock_connect, mock_hosts_and_groups, mock_save_keys, mock_verify_request, mock_update, mock_close):
+            self, mock_connect, mock_save_keys, mock_verify_request, mock_update, mock_close):
         mock_connect.return_value = None
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_save_keys.return_value = state.SUCCEED, "pkey"
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
         mock_update.return_value = state.SUCCEED
@@ -111,13 +137,12 @@ class TestConfigManage(BaseTestCase):
         self.assertEqual(state.DATABASE_CONNECT_ERROR, response.json.get("label"), response.json)
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_database_query_error_when_query_host_infos_fail(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_close):
+            self, mock_connect, mock_verify_request, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.DATABASE_QUERY_ERROR, InstrumentedList(), InstrumentedList()
+        self.mock_host_database(state.DATABASE_QUERY_ERROR)
         mock_connect.return_value = None
         mock_close.return_value = None
         response = self.client.post(UPDATE_HOST, data=json.dumps(self.mock_args),
@@ -125,14 +150,12 @@ class TestConfigManage(BaseTestCase):
         self.assertEqual(state.DATABASE_QUERY_ERROR, response.json.get("label"), response.json)
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_no_data_in_database_when_input_host_id_not_in_database(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_close):
+            self, mock_connect, mock_verify_request, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_connect.return_value = None
         mock_close.return_value = None
         self.mock_args.update({"host_id": self.incorrect_host_id})
@@ -140,14 +163,12 @@ class TestConfigManage(BaseTestCase):
         self.assertEqual(state.NO_DATA, response.json.get("label"), response.json)
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_param_error_when_input_host_name_in_database(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_close):
+            self, mock_connect, mock_verify_request, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_connect.return_value = None
         mock_close.return_value = None
         self.mock_args.update({"host_name": "mock_host_1"})
@@ -155,14 +176,12 @@ class TestConfigManage(BaseTestCase):
         self.assertEqual(state.PARAM_ERROR, response.json.get("label"), response.json)
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_param_error_when_input_host_group_name_not_in_database(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_close):
+            self, mock_connect, mock_verify_request, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_connect.return_value = None
         mock_close.return_value = None
         self.mock_args.update({"host_group_name": "group3"})
@@ -170,14 +189,12 @@ class TestConfigManage(BaseTestCase):
         self.assertEqual(state.PARAM_ERROR, response.json.get("label"), response.json)
 
     @mock.patch.object(HostProxy, "__exit__")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_param_error_when_input_ssh_address_in_database(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_close):
+            self, mock_connect, mock_verify_request, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_connect.return_value = None
         mock_close.return_value = None
         self.mock_args.update({"ssh_port": "22"})
@@ -187,14 +204,12 @@ class TestConfigManage(BaseTestCase):
     @mock.patch.object(HostProxy, "__exit__")
     @mock.patch.object(HostProxy, "update_host_info")
     @mock.patch("zeus.host_manager.view.save_ssh_public_key_to_client")
-    @mock.patch.object(HostProxy, "get_hosts_and_groups")
     @mock.patch.object(BaseResponse, "verify_request")
     @mock.patch.object(MysqlProxy, "_create_session")
     def test_update_host_should_return_database_update_error_when_update_host_info_fail(
-            self, mock_connect, mock_verify_request, mock_hosts_and_groups, mock_ssh_key, mock_update_host, mock_close):
+            self, mock_connect, mock_verify_request, mock_ssh_key, mock_update_host, mock_close):
         mock_verify_request.return_value = self.mock_args, state.SUCCEED
-        mock_hosts_and_groups.return_value = state.SUCCEED, InstrumentedList(
-            self.mock_host_list), InstrumentedList(self.group_list)
+        self.mock_host_database()
         mock_connect.return_value = None
         mock_close.return_value = None
         mock_ssh_key.return_value = state.SUCCEED, "pkey"
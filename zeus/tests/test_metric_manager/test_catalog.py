@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from unittest import mock
+
+import gevent
+
+from zeus.metric_manager.catalog import SeriesCatalog
+
+INSTANCE = "127.0.0.1:9100"
+
+
+class TestSeriesCatalog(unittest.TestCase):
+    def test_get_should_load_catalog_once_when_catalog_is_not_expired(self):
+        catalog = SeriesCatalog(ttl=60)
+        load = mock.Mock(return_value={"metric1": ['metric1{instance="127.0.0.1:9100"}']})
+
+        catalog.get(INSTANCE, load)
+        result = catalog.get(INSTANCE, load)
+
+        load.assert_called_once()
+        self.assertEqual({"metric1": ['metric1{instance="127.0.0.1:9100"}']}, result)
+
+    def test_get_should_return_cached_catalog_and_reload_it_in_background_when_catalog_is_expired(self):
+        catalog = SeriesCatalog(ttl=0)
+        catalog.get(INSTANCE, lambda: {"metric1": []})
+
+        result = catalog.get(INSTANCE, lambda: {"metric2": []})
+        gevent.sleep(0)
+
+        self.assertEqual({"metric1": []}, result)
+        self.assertEqual({"metric2": []}, catalog.get(INSTANCE, mock.Mock(side_effect=ValueError)))
+
+    def test_get_should_keep_cached_catalog_when_reload_in_background_raise_error(self):
+        catalog = SeriesCatalog(ttl=0)
+        catalog.get(INSTANCE, lambda: {"metric1": []})
+
+        catalog.get(INSTANCE, mock.Mock(side_effect=ValueError))
+        gevent.sleep(0)
+
+        self.assertEqual({"metric1": []}, catalog.get(INSTANCE, lambda: {"metric1": []}))
+
+    def test_get_should_drop_least_recently_read_catalog_when_max_instances_is_reached(self):
+        catalog = SeriesCatalog(ttl=60, max_instances=2)
+        catalog.get("host1:9100", lambda: {"metric1": []})
+        catalog.get("host2:9100", lambda: {"metric1": []})
+        catalog.get("host1:9100", lambda: {"metric1": []})
+
+        catalog.get("host3:9100", lambda: {"metric1": []})
+
+        load = mock.Mock(return_value={"metric1": []})
+        catalog.get("host1:9100", load)
+        catalog.get("host2:9100", load)
+        self.assertEqual(1, load.call_count)
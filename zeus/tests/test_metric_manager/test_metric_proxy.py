@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import time
+import unittest
+from unittest import mock
+
+import gevent
+
+from vulcanus.restful.resp.state import PARTIAL_SUCCEED, SUCCEED
+from zeus.conf import configuration
+from zeus.database.proxy.metric import MetricProxy
+from zeus.metric_manager.catalog import SeriesCatalog
+from zeus.metric_manager.range_cache import RangeQueryCache
+
+INSTANCE = "127.0.0.1:9100"
+SERIES = {
+    f'node_cpu_seconds_total{{cpu="{cpu}",instance="{INSTANCE}",mode="idle"}}': {
+        "__name__": "node_cpu_seconds_total",
+        "cpu": str(cpu),
+        "instance": INSTANCE,
+        "job": "prometheus",
+        "mode": "idle",
+    }
+    for cpu in range(20)
+}
+VALUES = [[1658926441, "0"], [1658926456, "1"]]
+
+
+class TestQueryMetricData(unittest.TestCase):
+    def setUp(self) -> None:
+        for name, cache in (("SERIES_CATALOG", SeriesCatalog()), ("RANGE_QUERY_CACHE", RangeQueryCache())):
+            patcher = mock.patch(f"zeus.database.proxy.metric.{name}", cache)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.proxy = MetricProxy(configuration)
+        self.proxy._prom = mock.Mock()
+        self.proxy._prom.custom_query.side_effect = lambda query: [{"metric": SERIES[query], "value": VALUES[0]}]
+        self.slow_series = set()
+
+        def custom_query_range(query, **kwargs):
+            gevent.sleep(1 if query in self.slow_series else 0.05)
+            return [{"metric": SERIES[query], "values": VALUES}]
+
+        self.proxy._prom.custom_query_range.side_effect = custom_query_range
+        self.data = {
+            "time_range": [1658926441, 1658926741],
+            "query_ip": "127.0.0.1",
+            "query_info": {"node_cpu_seconds_total": list(SERIES)},
+        }
+
+    def test_query_metric_data_should_query_all_series_concurrently_when_query_many_series(self):
+        start = time.monotonic()
+        status, result = self.proxy.query_metric_data(self.data)
+
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(SUCCEED, status)
+        self.assertEqual({series: VALUES for series in SERIES}, result["results"]["node_cpu_seconds_total"])
+
+    def test_query_metric_data_should_return_partial_data_when_deadline_is_exceeded(self):
+        slow_series = list(SERIES)[0]
+        self.slow_series.add(slow_series)
+        self.proxy.query_deadline = 0.3
+
+        status, result = self.proxy.query_metric_data(self.data)
+
+        self.assertEqual(PARTIAL_SUCCEED, status)
+        self.assertEqual([], result["results"]["node_cpu_seconds_total"][slow_series])
+        self.assertEqual(VALUES, result["results"]["node_cpu_seconds_total"][list(SERIES)[1]])
+
+    def test_query_metric_data_should_not_query_series_list_when_series_are_resolved(self):
+        self.proxy.query_metric_data(self.data)
+
+        self.proxy._prom.custom_query.assert_not_called()
+        self.assertEqual(len(SERIES), self.proxy._prom.custom_query_range.call_count)
+
+    def test_query_metric_data_should_query_series_of_all_metrics_once_when_only_metric_names_are_given(self):
+        self.proxy._prom.get_series.return_value = list(SERIES.values())
+        self.data["query_info"] = {"node_cpu_seconds_total": [], "node_load1": []}
+
+        _, result = self.proxy.query_metric_data(self.data)
+
+        self.proxy._prom.get_series.assert_called_once()
+        self.assertEqual(
+            {"match[]": '{instance="127.0.0.1:%s"}' % self.proxy.default_instance_port},
+            self.proxy._prom.get_series.call_args[1]["params"],
+        )
+        self.proxy._prom.custom_query.assert_not_called()
+        self.assertEqual({series: VALUES for series in SERIES}, result["results"]["node_cpu_seconds_total"])
+        self.assertEqual([], result["results"]["node_load1"])
+
+    def test_query_metric_data_should_query_every_metric_once_when_merge_series(self):
+        self.proxy._prom.custom_query_range.side_effect = lambda query, **kwargs: [
+            {"metric": metric, "values": VALUES} for metric in SERIES.values()
+        ]
+        requested_series = list(SERIES)[:2]
+        self.data["query_info"] = {"node_cpu_seconds_total": requested_series, "node_load1": []}
+        self.data["merge_series"] = True
+
+        _, result = self.proxy.query_metric_data(self.data)
+
+        self.assertEqual(2, self.proxy._prom.custom_query_range.call_count)
+        self.proxy._prom.custom_query.assert_not_called()
+        self.assertEqual(
+            {series: VALUES for series in requested_series}, result["results"]["node_cpu_seconds_total"]
+        )
+        self.assertEqual(len(SERIES), len(result["results"]["node_load1"]))
+
+    def test_query_metric_data_should_return_partial_data_when_deadline_is_exceeded_and_merge_series(self):
+        def custom_query_range(query, **kwargs):
+            gevent.sleep(1 if query.startswith("node_load1") else 0.05)
+            return [{"metric": metric, "values": VALUES} for metric in SERIES.values()]
+
+        self.proxy._prom.custom_query_range.side_effect = custom_query_range
+        self.proxy.query_deadline = 0.3
+        self.data["query_info"] = {"node_cpu_seconds_total": list(SERIES)[:1], "node_load1": []}
+        self.data["merge_series"] = True
+
+        status, result = self.proxy.query_metric_data(self.data)
+
+        self.assertEqual(PARTIAL_SUCCEED, status)
+        self.assertEqual({list(SERIES)[0]: VALUES}, result["results"]["node_cpu_seconds_total"])
+        self.assertEqual([], result["results"]["node_load1"])
+
+    def test_query_metric_data_stream_should_yield_fast_series_first_when_some_series_are_slow(self):
+        slow_series = list(SERIES)[0]
+        self.slow_series.add(slow_series)
+        self.proxy.query_deadline = 0.3
+
+        lines = list(self.proxy.query_metric_data_stream(self.data))
+
+        self.assertEqual({"label": PARTIAL_SUCCEED}, lines[-1])
+        self.assertEqual(len(SERIES) - 1, len(lines[:-1]))
+        self.assertNotIn(slow_series, [line["series"] for line in lines[:-1]])
+        self.assertIn({"metric": "node_cpu_seconds_total", "series": list(SERIES)[1], "values": VALUES}, lines)
+
+    def test_query_metric_data_stream_should_yield_every_series_of_merged_query_when_merge_series(self):
+        self.proxy._prom.custom_query_range.side_effect = lambda query, **kwargs: [
+            {"metric": metric, "values": VALUES} for metric in SERIES.values()
+        ]
+        self.data["query_info"] = {"node_cpu_seconds_total": [], "node_load1": []}
+        self.data["merge_series"] = True
+        self.data["format"] = "columnar"
+
+        lines = list(self.proxy.query_metric_data_stream(self.data))
+
+        self.assertEqual({"label": SUCCEED}, lines[-1])
+        self.assertEqual(2 * len(SERIES), len(lines[:-1]))
+        self.assertEqual({"start": 1658926441, "step": 15, "deltas": [], "values": [0.0, 1.0]}, lines[0]["values"])
+
+
+class TestQueryFleetData(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch("zeus.database.proxy.metric.RANGE_QUERY_CACHE", RangeQueryCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.proxy = MetricProxy(configuration)
+        self.proxy._prom = mock.Mock()
+        self.proxy.fleet_chunk_size = 2
+        self.port = self.proxy.default_instance_port
+
+        def custom_query_range(query, **kwargs):
+            return [
+                {"metric": {"__name__": "node_load1", "instance": f"127.0.0.{index}:{self.port}"}, "values": VALUES}
+                for index in range(1, 4)
+                if f"127\\\\.0\\\\.0\\\\.{index}:{self.port}" in query
+            ]
+
+        self.proxy._prom.custom_query_range.side_effect = custom_query_range
+
+    def test_query_fleet_data_should_query_every_metric_once_for_every_chunk_of_hosts(self):
+        host_list = [{"host_id": index, "host_ip": f"127.0.0.{index}"} for index in range(1, 4)]
+
+        status, result = self.proxy.query_fleet_data(host_list, ["node_load1", "node_load5"], [1658926441, 1658926741])
+
+        self.assertEqual(SUCCEED, status)
+        self.assertEqual(4, self.proxy._prom.custom_query_range.call_count)
+        self.assertIn(
+            f'node_load1{{instance=~"127\\\\.0\\\\.0\\\\.1:{self.port}|127\\\\.0\\\\.0\\\\.2:{self.port}"}}',
+            [call[1]["query"] for call in self.proxy._prom.custom_query_range.call_args_list],
+        )
+        self.assertEqual(
+            {
+                "node_load1": {f'node_load1{{instance="127.0.0.3:{self.port}"}}': VALUES},
+                "node_load5": {},
+            },
+            result["results"][3],
+        )
+
+
+class TestConnect(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = mock.patch.dict("zeus.database.proxy.metric._PROMETHEUS_CLIENTS", clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connect_should_share_one_pooled_client_when_connect_many_proxies(self):
+        first, second = MetricProxy(configuration), MetricProxy(configuration)
+
+        self.assertTrue(first.connect())
+        self.assertTrue(second.connect())
+
+        self.assertIs(first._prom, second._prom)
+        adapter = first._prom._session.get_adapter(first._prom.url)
+        self.assertEqual(first.pool_size, adapter._pool_maxsize)
+        self.assertEqual(first.timeout, first._prom._timeout)
+        self.assertGreater(adapter.max_retries.total, 0)
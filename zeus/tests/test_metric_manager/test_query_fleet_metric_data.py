@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+from unittest import mock
+
+from vulcanus.restful.resp import state
+from vulcanus.restful.response import BaseResponse
+from zeus.conf.constant import QUERY_FLEET_METRIC_DATA
+from zeus.database.proxy.host import HostProxy
+from zeus.database.proxy.metric import MetricProxy
+from zeus.tests import BaseTestCase
+
+client = BaseTestCase.create_app()
+header_with_token = {"access_token": "123456"}
+
+
+def mock_verify_token(token, args):
+    args["username"] = "admin"
+    return state.SUCCEED
+
+
+class TestQueryFleetMetricData(BaseTestCase):
+    @mock.patch.object(MetricProxy, "query_fleet_data")
+    @mock.patch.object(HostProxy, "get_host")
+    @mock.patch.object(HostProxy, "get_host_info")
+    @mock.patch.object(HostProxy, "connect")
+    @mock.patch.object(MetricProxy, "connect")
+    @mock.patch.object(BaseResponse, "verify_token")
+    def test_query_fleet_metric_data_should_query_metrics_of_hosts_in_list_and_groups_when_request_is_correct(
+        self, mock_token, mock_metric_connect, mock_host_connect, mock_host_info, mock_get_host, mock_fleet_data
+    ):
+        mock_token.side_effect = mock_verify_token
+        mock_metric_connect.return_value = True
+        mock_host_connect.return_value = True
+        mock_host_info.return_value = state.SUCCEED, [{"host_id": 1, "host_ip": "127.0.0.1"}]
+        mock_get_host.return_value = state.SUCCEED, {
+            "host_infos": [{"host_id": 1, "host_ip": "127.0.0.1"}, {"host_id": 2, "host_ip": "127.0.0.2"}]
+        }
+        mock_fleet_data.return_value = state.SUCCEED, {"results": {}}
+        data = {
+            "time_range": [1658926441, 1658926741],
+            "host_list": [1],
+            "host_group_list": ["group1"],
+            "metric_names": ["node_load1"],
+        }
+
+        response = client.post(QUERY_FLEET_METRIC_DATA, json=data, headers=header_with_token)
+
+        self.assertEqual(state.SUCCEED, response.json.get("label"))
+        host_list = mock_fleet_data.call_args[0][0]
+        self.assertEqual([1, 2], sorted(host["host_id"] for host in host_list))
+
+    @mock.patch.object(MetricProxy, "connect")
+    @mock.patch.object(BaseResponse, "verify_token")
+    def test_query_fleet_metric_data_should_return_param_error_when_no_host_is_given(self, mock_token, mock_connect):
+        mock_token.side_effect = mock_verify_token
+        mock_connect.return_value = True
+        data = {"time_range": [1658926441, 1658926741], "metric_names": ["node_load1"]}
+
+        response = client.post(QUERY_FLEET_METRIC_DATA, json=data, headers=header_with_token)
+
+        self.assertEqual(state.PARAM_ERROR, response.json.get("label"))
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import json
+from unittest import mock
+
+from vulcanus.conf.constant import QUERY_METRIC_DATA
+from vulcanus.restful.resp import state
+from vulcanus.restful.response import BaseResponse
+from zeus.database.proxy.metric import MetricProxy
+from zeus.tests import BaseTestCase
+
+client = BaseTestCase.create_app()
+header_with_token = {"access_token": "123456"}
+PARAMS = {"host_id": 1, "time_range": [1658926441, 1658926741], "format": "msgpack", "username": "admin"}
+
+
+def mock_pack(data):
+    return json.dumps(data).encode()
+
+
+@mock.patch("zeus.metric_manager.view.pack", side_effect=mock_pack)
+@mock.patch.object(MetricProxy, "query_metric_data")
+@mock.patch.object(MetricProxy, "connect")
+@mock.patch.object(BaseResponse, "verify_request")
+class TestQueryHostMetricDataInMsgpack(BaseTestCase):
+    def test_query_host_metric_data_should_pack_standard_envelope_when_format_is_msgpack(
+        self, mock_verify_request, mock_connect, mock_query, mock_pack_data
+    ):
+        mock_verify_request.return_value = dict(PARAMS), state.SUCCEED
+        mock_connect.return_value = True
+        mock_query.return_value = state.SUCCEED, {"results": {}}
+
+        response = client.post(QUERY_METRIC_DATA, json=PARAMS, headers=header_with_token)
+
+        self.assertEqual("application/x-msgpack", response.mimetype)
+        body = json.loads(response.data)
+        self.assertEqual(state.SUCCEED, body["label"])
+        self.assertIn("message", body)
+        self.assertEqual({"results": {}}, body["data"])
+
+    def test_query_host_metric_data_should_pack_error_in_msgpack_when_query_failed(
+        self, mock_verify_request, mock_connect, mock_query, mock_pack_data
+    ):
+        mock_verify_request.return_value = dict(PARAMS), state.SUCCEED
+        mock_connect.return_value = True
+        mock_query.return_value = state.NO_DATA, {}
+
+        response = client.post(QUERY_METRIC_DATA, json=PARAMS, headers=header_with_token)
+
+        self.assertEqual("application/x-msgpack", response.mimetype)
+        self.assertEqual(state.NO_DATA, json.loads(response.data)["label"])
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from unittest import mock
+
+from zeus.metric_manager.range_cache import RangeQueryCache
+
+STEP = 15
+NOW = 1658926441
+
+
+def fetch(query_str, start, end, step):
+    return [
+        {
+            "metric": {"__name__": query_str, "cpu": str(cpu)},
+            "values": [[timestamp, str(timestamp % 7)] for timestamp in range(start, end + 1, step)],
+        }
+        for cpu in range(2)
+    ]
+
+
+class TestRangeQueryCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = RangeQueryCache(bucket_points=10, settle=60)
+        self.fetch = mock.Mock(side_effect=fetch)
+        patcher = mock.patch("zeus.metric_manager.range_cache.time.time", return_value=NOW)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_query_should_return_same_result_as_uncached_query_when_window_is_not_aligned(self):
+        start, end = NOW - 3600 + 7, NOW
+
+        result = self.cache.query("node_load1", start, end, STEP, self.fetch)
+        cached_result = self.cache.query("node_load1", start, end, STEP, self.fetch)
+
+        expected = fetch("node_load1", start // STEP * STEP, end // STEP * STEP, STEP)
+        self.assertEqual(expected, result)
+        self.assertEqual(expected, cached_result)
+
+    def test_query_should_only_fetch_unfinished_buckets_when_window_slides_forward(self):
+        self.cache.query("node_load1", NOW - 3600, NOW - 60, STEP, self.fetch)
+        self.fetch.reset_mock()
+
+        self.cache.query("node_load1", NOW - 3540, NOW, STEP, self.fetch)
+
+        width = STEP * 10
+        self.assertEqual(1, self.fetch.call_count)
+        _, start, end, _ = self.fetch.call_args[0]
+        self.assertGreaterEqual(start, (NOW - 60 - 2 * width) // width * width)
+        self.assertEqual(NOW // STEP * STEP, end)
+
+    def test_query_should_return_none_and_cache_nothing_when_fetch_failed(self):
+        self.assertIsNone(self.cache.query("node_load1", NOW - 3600, NOW, STEP, mock.Mock(return_value=None)))
+
+        self.cache.query("node_load1", NOW - 3600, NOW, STEP, self.fetch)
+        self.assertEqual(1, self.fetch.call_count)
+
+    def test_query_should_evict_least_recently_used_buckets_when_cached_points_exceed_limit(self):
+        width = STEP * 10
+        self.cache.max_points = 25
+        self.cache.query("node_load1", NOW - 10 * width, NOW, STEP, self.fetch)
+
+        self.assertLessEqual(self.cache._points, 25)
+        self.assertEqual(
+            sum(len(series["values"]) for bucket, _ in self.cache._buckets.values() for series in bucket),
+            self.cache._points,
+        )
+        self.fetch.reset_mock()
+        self.cache.query("node_load1", NOW - 10 * width, NOW, STEP, self.fetch)
+        self.assertGreaterEqual(self.fetch.call_count, 1)
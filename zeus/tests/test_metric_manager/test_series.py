@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import base64
+import unittest
+
+import numpy as np
+
+from zeus.metric_manager.series import BASE64, COLUMNAR, MIN_MAX, downsample, encode_series
+
+POINTS = [[1658926441 + 15 * index, str(index % 7)] for index in range(1000)]
+POINTS[500] = [POINTS[500][0], "100"]
+POINTS[600] = [POINTS[600][0], "-100"]
+
+
+class TestDownsample(unittest.TestCase):
+    def test_downsample_should_return_origin_points_when_points_are_less_than_max_points(self):
+        self.assertEqual(POINTS[:10], downsample(POINTS[:10], 20))
+
+    def test_downsample_should_keep_end_points_and_spikes_when_use_lttb(self):
+        result = downsample(POINTS, 50)
+
+        self.assertEqual(50, len(result))
+        self.assertEqual([POINTS[0], POINTS[-1]], [result[0], result[-1]])
+        self.assertIn(POINTS[500], result)
+        self.assertIn(POINTS[600], result)
+        self.assertEqual(sorted(result), result)
+
+    def test_downsample_should_keep_minimum_and_maximum_of_every_bucket_when_use_min_max(self):
+        points = POINTS[:]
+        points[10] = [points[10][0], "NaN"]
+
+        result = downsample(points, 50, MIN_MAX)
+
+        self.assertLessEqual(len(result), 50)
+        self.assertIn(POINTS[500], result)
+        self.assertIn(POINTS[600], result)
+        self.assertNotIn(points[10], result)
+
+
+class TestEncodeSeries(unittest.TestCase):
+    def test_encode_series_should_return_columns_with_step_deltas_when_format_is_columnar(self):
+        points = [[1658926441, "0"], [1658926456, "1.5"], [1658926486, "NaN"]]
+
+        result = encode_series(points, 15, COLUMNAR)
+
+        self.assertEqual({"start": 1658926441, "step": 15, "deltas": [1, 2], "values": [0.0, 1.5, None]}, result)
+
+    def test_encode_series_should_count_deltas_in_seconds_when_timestamps_are_not_on_step_grid(self):
+        points = [[1658926441, "0"], [1658926450, "1"]]
+
+        result = encode_series(points, 15, COLUMNAR)
+
+        self.assertEqual({"start": 1658926441, "step": 1, "deltas": [9], "values": [0.0, 1.0]}, result)
+
+    def test_encode_series_should_return_float32_values_in_base64_when_format_is_base64(self):
+        points = POINTS[:100] + POINTS[101:]
+
+        result = encode_series(points, 15, BASE64)
+
+        values = np.frombuffer(base64.b64decode(result["values"]), dtype="<f4")
+        deltas = np.frombuffer(base64.b64decode(result["deltas"]), dtype="<i4")
+        timestamps = result["start"] + result["step"] * np.concatenate(([0], np.cumsum(deltas)))
+        self.assertEqual([point[0] for point in points], timestamps.tolist())
+        self.assertEqual([float(point[1]) for point in points], values.tolist())
+
+    def test_encode_series_should_return_empty_deltas_when_there_is_no_gap_in_series(self):
+        result = encode_series(POINTS, 15, BASE64)
+
+        self.assertEqual("", result["deltas"])
+        self.assertEqual(len(POINTS), len(base64.b64decode(result["values"])) // 4)
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+from unittest import mock
+
+import gevent
+from redis import RedisError
+
+from vulcanus.restful.resp.state import NO_DATA, SUCCEED
+from zeus.vulnerability_manage.async_task import AsyncTaskRunner, AsyncTaskStatus
+
+
+class TestAsyncTaskRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.runner = AsyncTaskRunner(concurrency=1)
+        self.records = {}
+        self.client = mock.MagicMock()
+        self.client.set.side_effect = lambda key, value, ex: self.records.__setitem__(key, value)
+        self.client.get.side_effect = self.records.get
+        patcher = mock.patch.object(AsyncTaskRunner, "_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_submit_should_return_handle_at_once_and_keep_result_when_task_is_finished(self):
+        def run():
+            gevent.sleep(0.05)
+            return {"task_result": []}
+
+        handle = self.runner.submit("admin", "task_1", "cve scan", run)
+
+        self.assertEqual(AsyncTaskStatus.QUEUED, self.runner.get("admin", handle)[1]["status"])
+        gevent.sleep(0.1)
+        status_code, record = self.runner.get("admin", handle)
+        self.assertEqual(SUCCEED, status_code)
+        self.assertEqual(AsyncTaskStatus.FINISHED, record["status"])
+        self.assertEqual({"task_result": []}, record["result"])
+        self.assertNotIn("username", record)
+
+    def test_submit_should_keep_failed_status_when_task_raise_error(self):
+        handle = self.runner.submit("admin", "task_1", "cve fix", mock.Mock(side_effect=ValueError("bad result")))
+
+        gevent.sleep(0.01)
+        record = self.runner.get("admin", handle)[1]
+        self.assertEqual(AsyncTaskStatus.FAILED, record["status"])
+        self.assertEqual("bad result", record["message"])
+
+    def test_get_should_return_no_data_when_task_belongs_to_another_user(self):
+        handle = self.runner.submit("admin", "task_1", "cve scan", dict)
+
+        self.assertEqual((NO_DATA, {}), self.runner.get("guest", handle))
+
+    def test_submit_should_return_none_and_not_run_task_when_redis_raise_error(self):
+        self.client.set.side_effect = RedisError
+        run = mock.Mock()
+
+        self.assertIsNone(self.runner.submit("admin", "task_1", "cve scan", run))
+        gevent.sleep(0.01)
+        run.assert_not_called()
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import time
+import unittest
+from unittest import mock
+
+import gevent
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from zeus.vulnerability_manage.callback import CallbackDispatcher
+
+URL = "http://127.0.0.1:11116/vulnerability/task/callback/cve/scan"
+
+
+class TestCallbackDispatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatcher = CallbackDispatcher(concurrency=4, retries=2, backoff=0.01, timeout=1)
+        self.session = mock.Mock()
+        self.dispatcher._session = self.session
+
+    def test_post_should_return_at_once_and_callbacks_should_be_delivered_in_background(self):
+        def post(url, **kwargs):
+            gevent.sleep(0.1)
+            return mock.Mock(status_code=200)
+
+        self.session.post.side_effect = post
+
+        start = time.monotonic()
+        for host_id in range(8):
+            self.dispatcher.post(URL, {"host_id": host_id})
+        self.assertLess(time.monotonic() - start, 0.05)
+
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(8, self.session.post.call_count)
+        self.assertEqual(0, self.dispatcher.failed)
+
+    def test_callback_should_be_retried_when_apollo_is_unavailable(self):
+        self.session.post.side_effect = [
+            RequestsConnectionError(),
+            mock.Mock(status_code=503),
+            mock.Mock(status_code=200),
+        ]
+
+        self.dispatcher.post(URL, {"host_id": 1})
+
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(3, self.session.post.call_count)
+        self.assertEqual(0, self.dispatcher.failed)
+
+    def test_callback_should_not_be_retried_when_apollo_rejects_it(self):
+        self.session.post.return_value = mock.Mock(status_code=400)
+
+        self.dispatcher.post(URL, {"host_id": 1})
+
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(1, self.session.post.call_count)
+        self.assertEqual(1, self.dispatcher.failed)
+
+    def test_on_delivered_should_be_called_only_when_apollo_accepts_callback(self):
+        self.session.post.side_effect = [mock.Mock(status_code=200), mock.Mock(status_code=400)]
+        delivered = []
+
+        self.dispatcher.post(URL, {"host_id": 1}, on_delivered=lambda: delivered.append(1))
+        self.dispatcher.post(URL, {"host_id": 2}, on_delivered=lambda: delivered.append(2))
+
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual([1], delivered)
+
+    def test_post_should_drop_callback_when_queue_is_full(self):
+        dispatcher = CallbackDispatcher(concurrency=1, queue_size=2)
+        dispatcher._session = self.session
+        self.session.post.return_value = mock.Mock(status_code=200)
+
+        queued = [dispatcher.post(URL, {"host_id": host_id}) for host_id in range(3)]
+
+        self.assertEqual([True, True, False], queued)
+        self.assertTrue(dispatcher.join(1))
+        self.assertEqual(2, self.session.post.call_count)
+        self.assertEqual(1, dispatcher.failed)
+
+    def test_post_should_restart_worker_when_worker_died(self):
+        self.session.post.return_value = mock.Mock(status_code=200)
+        self.dispatcher.post(URL, {"host_id": 1})
+        self.assertTrue(self.dispatcher.join(1))
+        for worker in self.dispatcher._workers:
+            worker.kill()
+
+        self.dispatcher.post(URL, {"host_id": 2})
+
+        self.assertTrue(self.dispatcher.join(1))
+        self.assertEqual(2, self.session.post.call_count)
+        self.assertEqual(4, len(self.dispatcher._workers))
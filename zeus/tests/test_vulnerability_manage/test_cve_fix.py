@@ -14,7 +14,6 @@ import json
 from unittest import mock
 
 from vulcanus.conf.constant import EXECUTE_CVE_FIX
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp.state import (
     DATABASE_CONNECT_ERROR,
     DATABASE_QUERY_ERROR,
@@ -24,6 +23,7 @@ from vulcanus.restful.resp.state import (
     TOKEN_ERROR,
 )
 from vulcanus.restful.response import BaseResponse
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.tests import BaseTestCase
 from zeus.vulnerability_manage.view import ExecuteCveFixTask
 
@@ -102,19 +102,19 @@ class TestCveFix(BaseTestCase):
         }
 
     @mock.patch.object(ExecuteCveFixTask, '_callback')
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch('zeus.vulnerability_manage.view.query_host_basic_info')
     @mock.patch.object(BaseResponse, "verify_request")
     def test_cve_fix_should_return_execute_result_when_all_is_right(self,
                                                                     mock_verify_request,
                                                                     mock_query_host_info,
-                                                                    mock_create_thread,
+                                                                    mock_execute,
                                                                     mock_get_result,
                                                                     mock_callback):
         mock_verify_request.return_value = self.MOCK_ARGS, SUCCEED
         mock_query_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
-        mock_create_thread.return_value = None
+        mock_execute.return_value = None
         mock_callback.return_value = None
         mock_get_result.return_value = [
             {
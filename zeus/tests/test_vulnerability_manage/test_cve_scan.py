@@ -14,7 +14,6 @@ import json
 from unittest import mock
 
 from vulcanus.conf.constant import EXECUTE_CVE_SCAN
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp.state import (
     DATABASE_CONNECT_ERROR,
     DATABASE_QUERY_ERROR,
@@ -24,7 +23,9 @@ from vulcanus.restful.resp.state import (
     TOKEN_ERROR,
 )
 from vulcanus.restful.response import BaseResponse
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.tests import BaseTestCase
+from zeus.vulnerability_manage.async_task import AsyncTaskRunner
 from zeus.vulnerability_manage.view import ExecuteCveScanTask
 
 client = BaseTestCase.create_app()
@@ -75,15 +76,15 @@ class TestCveScan(BaseTestCase):
         }
 
     @mock.patch.object(ExecuteCveScanTask, '_callback')
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch('zeus.vulnerability_manage.view.query_host_basic_info')
     @mock.patch.object(BaseResponse, "verify_request")
     def test_cve_scan_should_return_execute_result_when_all_is_right(
-            self, verify_request, mock_host_info, mock_create_thread, mock_get_result, mock_callback):
+            self, verify_request, mock_host_info, mock_execute, mock_get_result, mock_callback):
         verify_request.return_value = self.MOCK_ARGS, SUCCEED
         mock_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
-        mock_create_thread.return_value = None
+        mock_execute.return_value = None
         mock_callback.return_value = None
         mock_get_result.return_value = [
             {
@@ -122,6 +123,25 @@ class TestCveScan(BaseTestCase):
         }
         self.assertEqual(expect_result, response.json)
 
+    @mock.patch.object(AsyncTaskRunner, "submit")
+    @mock.patch.object(ExecuteCveScanTask, "_execute_tasks")
+    @mock.patch('zeus.vulnerability_manage.view.query_host_basic_info')
+    @mock.patch.object(BaseResponse, "verify_request")
+    def test_cve_scan_should_return_202_with_task_handle_when_request_is_asynchronous(
+            self, verify_request, mock_host_info, mock_execute_tasks, mock_submit):
+        self.MOCK_ARGS["asynchronous"] = True
+        verify_request.return_value = self.MOCK_ARGS, SUCCEED
+        mock_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
+        mock_submit.return_value = "mock_handle"
+
+        response = client.post(EXECUTE_CVE_SCAN, data=json.dumps(self.MOCK_ARGS), headers=self.HEADERS_WITH_TOKEN)
+
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(
+            {"task_id": "mock_task", "handle": "mock_handle", "status": "queued"}, response.json.get("data")
+        )
+        mock_execute_tasks.assert_not_called()
+
     @mock.patch.object(BaseResponse, "verify_token")
     def test_cve_scan_should_return_token_error_when_request_without_token_or_request_with_invalid_token(self,
                                                                                                          mock_token):
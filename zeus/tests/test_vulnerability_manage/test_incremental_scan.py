@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import json
+import unittest
+from unittest import mock
+
+from vulcanus.restful.resp.state import EXECUTE_COMMAND_ERROR, SUCCEED
+from zeus.conf.constant import HOST_PACKAGE_FINGERPRINT
+from zeus.database.cache import ScanResultCache
+from zeus.vulnerability_manage.view import ExecuteCveScanTask
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class TestIncrementalScan(unittest.TestCase):
+    HOST_INFO = {"host_id": 1, "host_ip": "127.0.0.1", "ssh_port": 22, "ssh_user": "root", "pkey": "rsa-key"}
+    SCAN_RESULT = {"code": SUCCEED, "msg": "operate succeed", "result": {"unfixed_cves": [], "fixed_cves": []}}
+
+    def setUp(self) -> None:
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(ScanResultCache, "_client", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.view = ExecuteCveScanTask()
+        self.view._check_items = []
+        self.view._incremental = True
+        self.commands = []
+        self.fingerprint = "digest_1"
+
+    def _execute_command(self, connect_args, command):
+        self.commands.append(command)
+        if command == HOST_PACKAGE_FINGERPRINT:
+            return (SUCCEED, f"{self.fingerprint}  -\n") if self.fingerprint else (EXECUTE_COMMAND_ERROR, "error")
+        return SUCCEED, json.dumps(self.SCAN_RESULT)
+
+    def _scan(self, check=False):
+        with mock.patch(
+            "zeus.vulnerability_manage.view.execute_command_and_parse_its_result", side_effect=self._execute_command
+        ):
+            return self.view._execute_task(self.HOST_INFO, {"host_id": 1, "check": check})
+
+    def test_execute_task_should_reuse_last_result_without_scan_when_package_fingerprint_is_not_changed(self):
+        self._scan()
+        self.commands.clear()
+
+        result = self._scan()
+
+        self.assertEqual([HOST_PACKAGE_FINGERPRINT], self.commands)
+        self.assertEqual(dict(self.SCAN_RESULT, host_id=1), result)
+
+    def test_execute_task_should_scan_host_again_when_package_fingerprint_is_changed(self):
+        self._scan()
+        self.fingerprint = "digest_2"
+        self.commands.clear()
+
+        self._scan()
+
+        self.assertEqual(2, len(self.commands))
+
+    def test_execute_task_should_scan_host_again_when_check_items_are_changed(self):
+        self.view._check_items = ["check_item_1"]
+        self._scan()
+        self.view._check_items = ["check_item_2"]
+        self.commands.clear()
+
+        self._scan()
+
+        self.assertEqual(2, len(self.commands))
+        self.assertIn("check_item_2", self.commands[1])
+
+    def test_execute_task_should_reuse_last_result_when_check_items_are_same_in_other_order(self):
+        self.view._check_items = ["check_item_1", "check_item_2"]
+        self._scan()
+        self.view._check_items = ["check_item_2", "check_item_1"]
+        self.commands.clear()
+
+        self._scan()
+
+        self.assertEqual([HOST_PACKAGE_FINGERPRINT], self.commands)
+
+    def test_execute_task_should_scan_host_without_cache_when_fingerprint_can_not_be_got(self):
+        self.fingerprint = None
+
+        self._scan()
+        self._scan()
+
+        self.assertEqual(4, len(self.commands))
+        self.assertEqual({}, self.redis.values)
+
+    def test_execute_task_should_always_scan_host_when_check_is_required(self):
+        self._scan()
+        self.commands.clear()
+
+        self._scan(check=True)
+
+        self.assertEqual(1, len(self.commands))
+        self.assertNotEqual(HOST_PACKAGE_FINGERPRINT, self.commands[0])
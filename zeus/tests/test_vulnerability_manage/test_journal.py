@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import time
+import unittest
+from unittest import mock
+
+from redis import RedisError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from vulcanus.restful.resp.state import SUCCEED
+from zeus.conf import configuration
+from zeus.conf.constant import CveTaskStatus
+from zeus.database.table import CveTaskContext, CveTaskHost
+from zeus.vulnerability_manage.journal import CveTaskJournal
+from zeus.vulnerability_manage.view import ExecuteCveFixTask
+
+TASKS = [
+    ({"host_id": host_id}, {"host_id": host_id, "check": False, "cves": [], "accepted": False})
+    for host_id in range(1, 4)
+]
+CONTEXT = {"callback": "/vulnerability/task/callback/cve/fix", "check_items": []}
+
+
+class TestCveTaskJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        engine = create_engine("sqlite://")
+        CveTaskHost.__table__.create(engine)
+        CveTaskContext.__table__.create(engine)
+        self.session = scoped_session(sessionmaker(bind=engine))
+        self.journal = CveTaskJournal(resume_idle=0)
+        self.client = mock.MagicMock()
+        self.client.mget.side_effect = lambda keys: [None] * len(keys)
+        for name, value in (("_session", self.session), ("_client", self.client)):
+            patcher = mock.patch.object(CveTaskJournal, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _start_interrupted_task(self):
+        self.journal.start("task_1", "admin", TASKS, CONTEXT)
+        self.journal.mark_running("task_1", 1)
+        self.journal.mark_running("task_1", 2)
+        self.journal.finish("task_1", 1, True, {"host_id": 1, "code": SUCCEED}, delivered=True)
+        self.session.query(CveTaskHost).update({CveTaskHost.update_time: int(time.time()) - 10})
+        self.session.commit()
+
+    def test_get_interrupted_tasks_should_return_pending_and_running_hosts_when_their_owner_is_not_alive(self):
+        self._start_interrupted_task()
+        self.journal.resume_idle = 60
+
+        tasks = self.journal.get_interrupted_tasks()
+
+        self.client.mget.assert_called_once_with([CveTaskJournal.owner_key_prefix + self.journal.owner])
+        self.assertEqual(["task_1"], list(tasks))
+        self.assertEqual("admin", tasks["task_1"]["username"])
+        self.assertEqual(CONTEXT, tasks["task_1"]["context"])
+        self.assertEqual([3], list(tasks["task_1"][CveTaskStatus.PENDING]))
+        self.assertEqual([2], list(tasks["task_1"][CveTaskStatus.RUNNING]))
+        self.assertEqual(TASKS[2][1], tasks["task_1"][CveTaskStatus.PENDING][3])
+
+    def test_get_interrupted_tasks_should_skip_task_when_its_owner_is_alive(self):
+        self._start_interrupted_task()
+        self.client.mget.side_effect = lambda keys: [b"1"] * len(keys)
+
+        self.assertEqual({}, self.journal.get_interrupted_tasks())
+
+    def test_get_interrupted_tasks_should_skip_task_updated_recently_when_redis_is_unavailable(self):
+        self._start_interrupted_task()
+        self.client.mget.side_effect = RedisError
+
+        self.assertEqual(["task_1"], list(self.journal.get_interrupted_tasks()))
+        self.journal.resume_idle = 60
+        self.assertEqual({}, self.journal.get_interrupted_tasks())
+
+    def test_get_interrupted_tasks_should_return_undelivered_result_when_its_owner_is_not_alive(self):
+        self._start_interrupted_task()
+        self.journal.finish("task_1", 2, False, {"host_id": 2, "msg": "failed"})
+        self.journal.resume_idle = 60
+
+        tasks = self.journal.get_interrupted_tasks()
+
+        self.assertEqual({2: {"host_id": 2, "msg": "failed"}}, tasks["task_1"]["undelivered"])
+        self.assertEqual({}, tasks["task_1"][CveTaskStatus.RUNNING])
+
+    def test_get_interrupted_tasks_should_return_undelivered_result_when_it_is_idle_even_if_owner_is_alive(self):
+        self._start_interrupted_task()
+        self.client.mget.side_effect = lambda keys: [b"1"] * len(keys)
+        self.journal.finish("task_1", 2, False, {"host_id": 2})
+        self.session.query(CveTaskHost).update({CveTaskHost.update_time: int(time.time()) - 10})
+        self.session.commit()
+
+        self.assertEqual([2], list(self.journal.get_interrupted_tasks()["task_1"]["undelivered"]))
+        self.journal.mark_delivered("task_1", 2)
+        self.assertEqual({}, self.journal.get_interrupted_tasks())
+
+    def test_claim_should_take_over_hosts_so_they_are_not_interrupted_while_this_process_is_alive(self):
+        self._start_interrupted_task()
+        other = CveTaskJournal()
+        self.client.mget.side_effect = lambda keys: [
+            b"1" if key == CveTaskJournal.owner_key_prefix + other.owner else None for key in keys
+        ]
+
+        other.claim("task_1", [2, 3])
+
+        self.assertEqual({}, self.journal.get_interrupted_tasks())
+
+    def test_purge_should_delete_finished_hosts_and_context_of_task_without_hosts_when_they_are_expired(self):
+        self._start_interrupted_task()
+        self.journal.finish("task_1", 2, False, {})
+        self.journal.finish("task_1", 3, True, {})
+        self.session.query(CveTaskHost).update({CveTaskHost.update_time: 0})
+        self.session.query(CveTaskContext).update({CveTaskContext.update_time: 0})
+        self.session.commit()
+
+        self.journal.purge()
+
+        self.assertEqual(0, self.session.query(CveTaskHost).count())
+        self.assertEqual(0, self.session.query(CveTaskContext).count())
+
+    def test_start_should_replace_records_of_previous_execution_when_task_is_executed_again(self):
+        self._start_interrupted_task()
+
+        self.journal.start("task_1", "admin", TASKS[:1], CONTEXT)
+
+        statuses = self.session.query(CveTaskHost.host_id, CveTaskHost.status).all()
+        self.assertEqual([(1, CveTaskStatus.PENDING)], statuses)
+        self.assertEqual(1, self.session.query(CveTaskContext).count())
+
+    @mock.patch.object(ExecuteCveFixTask, "_fan_out")
+    @mock.patch.object(ExecuteCveFixTask, "_callback")
+    @mock.patch("zeus.vulnerability_manage.view.query_host_basic_info")
+    @mock.patch.object(configuration, "individuation", {"EXEMPT_AUTHENTICATION": "mock"}, create=True)
+    def test_resume_should_fail_running_hosts_and_fix_pending_hosts_when_task_is_interrupted(
+        self, mock_host_info, mock_callback, mock_fan_out
+    ):
+        mock_host_info.return_value = SUCCEED, {3: {"host_id": 3}}
+        self._start_interrupted_task()
+        task = self.journal.get_interrupted_tasks()["task_1"]
+        task["undelivered"] = {4: {"host_id": 4, "code": SUCCEED}}
+
+        with mock.patch("zeus.vulnerability_manage.view.CVE_TASK_JOURNAL", self.journal):
+            ExecuteCveFixTask.resume("task_1", task)
+
+        self.assertEqual([4, 2], [call[0][0]["host_id"] for call in mock_callback.call_args_list])
+        mock_fan_out.assert_called_once_with([({"host_id": 3}, TASKS[2][1])])
+        statuses = dict(self.session.query(CveTaskHost.host_id, CveTaskHost.status).all())
+        self.assertEqual({1: CveTaskStatus.SUCCEED, 2: CveTaskStatus.FAIL, 3: CveTaskStatus.PENDING}, statuses)
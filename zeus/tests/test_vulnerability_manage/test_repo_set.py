@@ -16,7 +16,6 @@ from unittest import mock
 import sqlalchemy
 
 from vulcanus.conf.constant import EXECUTE_REPO_SET
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp.state import (
     DATABASE_CONNECT_ERROR,
     DATABASE_QUERY_ERROR,
@@ -26,6 +25,7 @@ from vulcanus.restful.resp.state import (
 )
 from vulcanus.restful.response import BaseResponse
 from zeus.database.proxy.host import HostProxy
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.tests import BaseTestCase
 from zeus.vulnerability_manage.view import ExecuteRepoSetTask, query_host_basic_info
 
@@ -58,16 +58,16 @@ class TestRepoSet(BaseTestCase):
             "callback": "",
         }
 
-    @mock.patch.object(MultiThreadHandler, "get_result")
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "get_result")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch('zeus.vulnerability_manage.view.query_host_basic_info')
     @mock.patch.object(BaseResponse, 'verify_request')
     def test_repo_set_should_return_execute_result_when_all_is_right_without_callback(
-            self, mock_verify, mock_query_host_info, mock_create_thread, mock_get_result):
+            self, mock_verify, mock_query_host_info, mock_execute, mock_get_result):
         self.MOCK_ARGS["username"] = "mock_user"
         mock_verify.return_value = self.MOCK_ARGS, SUCCEED
         mock_query_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
-        mock_create_thread.return_value = None
+        mock_execute.return_value = None
         mock_get_result.return_value = [
             {
                 'code': SUCCEED,
@@ -128,14 +128,14 @@ class TestRepoSet(BaseTestCase):
         self.assertEqual(expect_result, response.json)
 
     @mock.patch.object(ExecuteRepoSetTask, '_callback')
-    @mock.patch.object(MultiThreadHandler, "create_thread")
+    @mock.patch.object(FanOutHandler, "execute")
     @mock.patch('zeus.vulnerability_manage.view.query_host_basic_info')
     @mock.patch.object(BaseResponse, 'verify_request')
     def test_repo_set_should_return_succeed_when_all_is_right_with_callback(
-            self, mock_verify, mock_query_host_info, mock_create_thread, mock_callback):
+            self, mock_verify, mock_query_host_info, mock_execute, mock_callback):
         mock_verify.return_value = self.MOCK_ARGS, SUCCEED
         mock_query_host_info.return_value = SUCCEED, self.MOCK_HOST_INFO
-        mock_create_thread.return_value = None
+        mock_execute.return_value = None
         mock_callback.return_value = None
         self.MOCK_ARGS['callback'] = 'mock_callback'
         response = client.post(EXECUTE_REPO_SET, data=json.dumps(self.MOCK_ARGS), headers=self.HEADERS_WITH_TOKEN)
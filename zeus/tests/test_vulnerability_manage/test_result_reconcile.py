@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+import unittest
+
+from vulcanus.restful.resp.state import SUCCEED
+from zeus.vulnerability_manage.view import (
+    ExecuteCveFixTask,
+    ExecuteCveScanTask,
+    ExecuteRepoSetTask,
+    get_unmatched_hosts,
+)
+
+CONVERTERS = [
+    ExecuteRepoSetTask._convert_result_to_target_data_format,
+    ExecuteCveScanTask._convert_execution_result_to_target_data_format,
+    ExecuteCveFixTask._convert_result_to_target_data_format,
+]
+
+
+
+class CountedHostId(int):
+    """
+    host id which counts how many times it's compared or hashed, the count grows with the work of
+    reconciliation regardless of the speed of the machine
+    """
+
+    operations = 0
+
+    def __eq__(self, other):
+        CountedHostId.operations += 1
+        return int(self) == other
+
+    def __hash__(self):
+        CountedHostId.operations += 1
+        return int.__hash__(self)
+
+
+def count_convert_operations(convert, host_count: int) -> int:
+    """
+    operations on host ids of converting results of host_count hosts, results are in reverse order of
+    hosts and one of every ten hosts has no result
+    """
+    host_ids = [CountedHostId(host_id) for host_id in range(1, host_count + 1)]
+    result_list = [{"host_id": host_id, "code": SUCCEED} for host_id in reversed(host_ids) if host_id % 10]
+    CountedHostId.operations = 0
+    convert(result_list, host_ids)
+    return CountedHostId.operations
+
+
+class TestGetUnmatchedHosts(unittest.TestCase):
+    def test_get_unmatched_hosts_should_return_hosts_without_result_in_order_of_task(self):
+        result_list = [{"host_id": 3}, {"host_id": 1}, {"host_id": 5}, {"msg": "no host id"}]
+
+        self.assertEqual([2, 4, 1], get_unmatched_hosts([1, 2, 3, 4, 5, 1], result_list))
+
+    def test_convert_should_report_every_host_once_when_results_are_not_in_order(self):
+        for convert in CONVERTERS:
+            result_list = [{"host_id": host_id, "code": SUCCEED} for host_id in (3, 1)]
+
+            task_result = convert(result_list, [1, 2, 3])
+
+            self.assertEqual([3, 1, 2], [result["host_id"] for result in task_result])
+
+    def test_convert_should_scale_linearly_when_hosts_increase_from_1k_to_50k(self):
+        for convert in CONVERTERS:
+            operations = {
+                host_count: count_convert_operations(convert, host_count) for host_count in (1000, 10000, 50000)
+            }
+
+            # removing hosts one by one compares 2500 times as often for 50 times hosts
+            self.assertLessEqual(operations[10000], 10 * 2 * operations[1000], operations)
+            self.assertLessEqual(operations[50000], 50 * 2 * operations[1000], operations)
@@ -48,6 +48,12 @@ from vulcanus.conf.constant import (
     LOGOUT,
     EXECUTE_CVE_ROLLBACK,
 )
+from zeus.conf.constant import (
+    ADD_HOST_STREAM,
+    QUERY_CVE_TASK_RESULT,
+    QUERY_FLEET_METRIC_DATA,
+    QUERY_METRIC_DATA_STREAM,
+)
 from zeus.account_manager import view as account_view
 from zeus.agent_manager import view as agent_view
 from zeus.config_manager import view as config_view
@@ -71,6 +77,7 @@ SPECIFIC_URLS = {
     "HOST_URLS": [
         (host_view.AddHost, ADD_HOST),
         (host_view.AddHostBatch, ADD_HOST_BATCH),
+        (host_view.AddHostStream, ADD_HOST_STREAM),
         (host_view.DeleteHost, DELETE_HOST),
         (host_view.UpdateHost, UPDATE_HOST),
         (host_view.GetHost, QUERY_HOST),
@@ -95,11 +102,14 @@ SPECIFIC_URLS = {
         (vulnerability_view.ExecuteCveScanTask, EXECUTE_CVE_SCAN),
         (vulnerability_view.ExecuteCveFixTask, EXECUTE_CVE_FIX),
         (vulnerability_view.ExecuteCveRollbackTask, EXECUTE_CVE_ROLLBACK),
+        (vulnerability_view.QueryCveTaskResult, QUERY_CVE_TASK_RESULT),
     ],
     'METRIC': [
         (metric_view.QueryHostMetricNames, QUERY_METRIC_NAMES),
         (metric_view.QueryHostMetricData, QUERY_METRIC_DATA),
         (metric_view.QueryHostMetricList, QUERY_METRIC_LIST),
+        (metric_view.QueryFleetMetricData, QUERY_FLEET_METRIC_DATA),
+        (metric_view.QueryHostMetricDataStream, QUERY_METRIC_DATA_STREAM),
     ],
 }
 
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: run cve tasks in background and keep their results in redis
+"""
+import json
+import time
+import uuid
+from typing import Callable, Optional, Tuple
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from redis import RedisError
+
+from vulcanus.database.proxy import RedisProxy
+from vulcanus.log.log import LOGGER
+from vulcanus.restful.resp import state
+from zeus.conf import configuration
+
+__all__ = ["AsyncTaskStatus", "AsyncTaskRunner", "CVE_TASK_RUNNER"]
+
+
+class AsyncTaskStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+
+class AsyncTaskRunner:
+    """
+    Run tasks in background greenlets of the process. Status and result of a task are kept in a redis
+    string of json for expire seconds, so they can be polled from any process by the task handle.
+    """
+
+    key_prefix = "cve_task_"
+
+    def __init__(self, concurrency: int = 4, expire: int = 86400):
+        self.expire = expire
+        self._semaphore = BoundedSemaphore(concurrency)
+
+    @staticmethod
+    def _client():
+        return RedisProxy.redis_connect
+
+    def _key(self, handle: str) -> str:
+        return self.key_prefix + handle
+
+    def submit(self, username: str, task_id: str, task_type: str, run: Callable[[], dict]) -> Optional[str]:
+        """
+        submit a task to run in background
+
+        Args:
+            username(str): owner of the task, only the owner can query it
+            task_id(str): id of the task given by the caller
+            task_type(str): e.g cve scan
+            run(Callable): execute the task and return its result
+
+        Returns:
+            str: handle of the task, None when the result can't be kept and the task isn't submitted
+        """
+        handle = uuid.uuid4().hex
+        record = {
+            "handle": handle,
+            "task_id": task_id,
+            "task_type": task_type,
+            "username": username,
+            "status": AsyncTaskStatus.QUEUED,
+            "create_time": int(time.time()),
+        }
+        if not self._save(record):
+            return None
+        gevent.spawn(self._run, record, run)
+        return handle
+
+    def get(self, username: str, handle: str) -> Tuple[str, dict]:
+        """
+        get status and result of a task
+
+        Returns:
+            str: status code
+            dict: e.g
+                {
+                    "handle": "d6b4e5f0a1c24b3e9f2a7c8d1e0f3a4b",
+                    "task_id": "task_id_1",
+                    "task_type": "cve scan",
+                    "status": "finished",
+                    "create_time": 1658926441,
+                    "start_time": 1658926441,
+                    "end_time": 1658926741,
+                    "result": {}  // same as data of the synchronous response
+                }
+        """
+        client = self._client()
+        if client is None:
+            return state.DATABASE_CONNECT_ERROR, {}
+        try:
+            value = client.get(self._key(handle))
+        except RedisError as error:
+            LOGGER.error(f"query result of task {handle} failed: {error}")
+            return state.DATABASE_QUERY_ERROR, {}
+        if value is None:
+            return state.NO_DATA, {}
+        record = json.loads(value)
+        if record.pop("username") != username:
+            return state.NO_DATA, {}
+        return state.SUCCEED, record
+
+    def _run(self, record: dict, run: Callable[[], dict]) -> None:
+        with self._semaphore:
+            record.update(status=AsyncTaskStatus.RUNNING, start_time=int(time.time()))
+            self._save(record)
+            try:
+                record["result"] = run()
+                record["status"] = AsyncTaskStatus.FINISHED
+            except Exception as error:  # pylint: disable=W0703
+                LOGGER.error(f"execute task {record['task_id']} failed: {error}")
+                record.update(status=AsyncTaskStatus.FAILED, message=str(error))
+            record["end_time"] = int(time.time())
+            self._save(record)
+
+    def _save(self, record: dict) -> bool:
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            client.set(self._key(record["handle"]), json.dumps(record), ex=self.expire)
+        except RedisError as error:
+            LOGGER.error(f"save status of task {record['task_id']} failed: {error}")
+            return False
+        return True
+
+
+CVE_TASK_RUNNER = AsyncTaskRunner(
+    int(configuration.cve_task.get("ASYNC_CONCURRENCY") or 4),
+    int(configuration.cve_task.get("RESULT_EXPIRE") or 86400),
+)
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: deliver task results of hosts to apollo in background
+"""
+from typing import Callable, List, Optional
+
+import gevent
+import requests
+from gevent.queue import Full, JoinableQueue
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from vulcanus.log.log import LOGGER
+from zeus.conf import configuration
+
+__all__ = ["CallbackDispatcher", "CALLBACK_DISPATCHER"]
+
+
+class CallbackDispatcher:
+    """
+    Post callbacks to apollo from a fixed number of worker greenlets over one keep-alive session, so
+    tasks respond without waiting for apollo. A callback is retried with exponential backoff when apollo
+    can't be connected or responds with a server error. At most queue_size callbacks wait for delivery,
+    newer ones are dropped when apollo can't keep up. A caller which must deliver every callback records
+    it in on_delivered, and posts the callbacks which are dropped or given up again later.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 20,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+        queue_size: int = 10000,
+    ):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._queue = JoinableQueue(maxsize=max(queue_size, 1))
+        self._workers: List[gevent.Greenlet] = []
+        self._session = None
+        # number of callbacks dropped or given up
+        self.failed = 0
+
+    def post(
+        self, url: str, body: dict, header: Optional[dict] = None, on_delivered: Optional[Callable[[], None]] = None
+    ) -> bool:
+        """
+        queue a callback without waiting, it's delivered by the workers
+
+        Args:
+            url(str): callback url
+            body(dict): json body of the callback
+            header(dict): request header
+            on_delivered(callable): called by the worker after apollo accepts the callback
+
+        Returns:
+            bool: False when the callback is dropped because the queue is full
+        """
+        self._supervise()
+        try:
+            self._queue.put_nowait((url, body, header, on_delivered))
+        except Full:
+            self.failed += 1
+            LOGGER.error(f"{self._queue.qsize()} callbacks are waiting for apollo, callback to {url} is dropped")
+            return False
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        wait until all queued callbacks are delivered or given up
+
+        Returns:
+            bool: False when some callbacks are still queued after timeout
+        """
+        return self._queue.join(timeout)
+
+    def _supervise(self) -> None:
+        # workers are started on first use, so they're running in the process which serves requests,
+        # and a worker which died is replaced
+        if len(self._workers) == self.concurrency and not any(worker.dead for worker in self._workers):
+            return
+        alive = [worker for worker in self._workers if not worker.dead]
+        if self._workers and len(alive) < len(self._workers):
+            LOGGER.warning(f"{len(self._workers) - len(alive)} callback workers died, restart them")
+        self._workers = alive + [gevent.spawn(self._work) for _ in range(self.concurrency - len(alive))]
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+
+    def _work(self) -> None:
+        while True:
+            url, body, header, on_delivered = self._queue.get()
+            try:
+                if not self._send(url, body, header):
+                    self.failed += 1
+                elif on_delivered:
+                    on_delivered()
+            except Exception as error:  # pylint: disable=W0703
+                self.failed += 1
+                LOGGER.error(f"callback to {url} failed: {error}")
+            finally:
+                self._queue.task_done()
+
+    def _send(self, url: str, body: dict, header: Optional[dict]) -> bool:
+        for attempt in range(self.retries + 1):
+            if attempt:
+                gevent.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self._get_session().post(url, json=body, headers=header, timeout=self.timeout)
+            except RequestException as error:
+                LOGGER.warning(f"callback to {url} failed, attempt {attempt + 1}: {error}")
+                continue
+            if response.status_code < 500:
+                if response.status_code >= 400:
+                    LOGGER.error(f"callback to {url} is rejected: {response.status_code} {response.text}")
+                    return False
+                return True
+            LOGGER.warning(f"callback to {url} failed, attempt {attempt + 1}: {response.status_code}")
+        LOGGER.error(f"callback to {url} is given up after {self.retries + 1} attempts")
+        return False
+
+
+CALLBACK_DISPATCHER = CallbackDispatcher(
+    int(configuration.apollo.get("CALLBACK_CONCURRENCY") or 20),
+    int(configuration.apollo.get("CALLBACK_RETRIES") or 3),
+    float(configuration.apollo.get("CALLBACK_BACKOFF") or 0.5),
+    float(configuration.apollo.get("CALLBACK_TIMEOUT") or 10),
+    int(configuration.apollo.get("CALLBACK_QUEUE_SIZE") or 10000),
+)
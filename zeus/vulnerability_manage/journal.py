@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+# ******************************************************************************
+# Copyright (c) Huawei Technologies Co., Ltd. 2022-2022. All rights reserved.
+# licensed under the Mulan PSL v2.
+# You can use this software according to the terms and conditions of the Mulan PSL v2.
+# You may obtain a copy of Mulan PSL v2 at:
+#     http://license.coscl.org.cn/MulanPSL2
+# THIS SOFTWARE IS PROVIDED ON AN 'AS IS' BASIS, WITHOUT WARRANTIES OF ANY KIND, EITHER EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO NON-INFRINGEMENT, MERCHANTABILITY OR FIT FOR A PARTICULAR
+# PURPOSE.
+# See the Mulan PSL v2 for more details.
+# ******************************************************************************/
+"""
+Time:
+Author:
+Description: journal of cve fix tasks kept in mysql, liveness of their owner processes kept in redis
+"""
+import json
+import os
+import socket
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Set
+
+import sqlalchemy
+from redis import RedisError
+
+from vulcanus.database.proxy import RedisProxy
+from vulcanus.log.log import LOGGER
+from zeus.conf import configuration
+from zeus.conf.constant import CveTaskStatus
+from zeus.database.table import CveTaskContext, CveTaskHost
+
+__all__ = ["CveTaskJournal", "CVE_TASK_JOURNAL"]
+
+
+class CveTaskJournal:
+    """
+    State of a cve fix task on every host, so a task interrupted by a restart of zeus can be finished.
+    A host is pending when the task is received, running when its command is started, and succeed or
+    fail when its result is received. Its result is marked delivered when apollo accepts the callback.
+    Writing the journal never fails the task, errors are only logged.
+
+    Hosts are owned by the process executing the task. Every process keeps a heartbeat in redis, hosts
+    which are not finished and whose owner has no heartbeat are interrupted. Results which are not
+    delivered are posted again when their owner is not alive, or when they're not updated in resume_idle
+    seconds because the callback was dropped or given up.
+    """
+
+    owner_key_prefix = "cve_task_owner_"
+    unfinished_status = (CveTaskStatus.PENDING, CveTaskStatus.RUNNING)
+
+    def __init__(self, expire: int = 7 * 86400, resume_idle: int = 900, heartbeat_expire: int = 180):
+        self.expire = expire
+        self.resume_idle = resume_idle
+        self.heartbeat_expire = heartbeat_expire
+        self._owner = None
+        self._owner_pid = None
+
+    @property
+    def owner(self) -> str:
+        """
+        id of this process, it's unique even if the pid is reused after a restart
+        """
+        # a forked worker gets its own id instead of the one of the master
+        if self._owner_pid != os.getpid():
+            self._owner_pid = os.getpid()
+            self._owner = f"{socket.gethostname()[:40]}-{self._owner_pid}-{uuid.uuid4().hex[:8]}"
+        return self._owner
+
+    @staticmethod
+    def _session():
+        from zeus.database import session_maker
+
+        return session_maker()
+
+    @staticmethod
+    def _client():
+        return RedisProxy.redis_connect
+
+    def _write(self, action: str, task_id: str, write) -> None:
+        session = self._session()
+        try:
+            write(session)
+            session.commit()
+        except sqlalchemy.exc.SQLAlchemyError as error:
+            LOGGER.error(f"{action} of task {task_id} in journal failed: {error}")
+            session.rollback()
+        finally:
+            session.remove()
+
+    def heartbeat(self) -> bool:
+        """
+        mark this process alive for heartbeat_expire seconds
+
+        Returns:
+            bool: False when the heartbeat can't be kept
+        """
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            client.set(self.owner_key_prefix + self.owner, int(time.time()), ex=self.heartbeat_expire)
+        except RedisError as error:
+            LOGGER.warning(f"heartbeat of cve task owner {self.owner} failed: {error}")
+            return False
+        return True
+
+    def _get_alive_owners(self, owners: Iterable[str]) -> Optional[Set[str]]:
+        """
+        Returns:
+            set: owners which have a heartbeat, None when it's unknown
+        """
+        client = self._client()
+        if client is None:
+            return None
+        owners = [owner for owner in owners if owner]
+        if not owners:
+            return set()
+        try:
+            values = client.mget([self.owner_key_prefix + owner for owner in owners])
+        except RedisError as error:
+            LOGGER.warning(f"query heartbeat of cve task owners failed: {error}")
+            return None
+        return {owner for owner, value in zip(owners, values) if value is not None}
+
+    def start(self, task_id: str, username: str, tasks: List[tuple], context: dict) -> None:
+        """
+        record all hosts of a task as pending and owned by this process, records of the previous execution
+        of the task are replaced
+
+        Args:
+            task_id(str): task id
+            username(str): owner of the task
+            tasks(list): (host info, task info) of every host
+            context(dict): info of the task needed to resume it, e.g {"callback": "/callback", "check_items": []}
+        """
+        now = int(time.time())
+        records = [
+            {
+                "task_id": task_id,
+                "host_id": host_info["host_id"],
+                "status": CveTaskStatus.PENDING,
+                "owner": self.owner,
+                "task_info": json.dumps(task_info),
+                "callback_delivered": False,
+                "update_time": now,
+            }
+            for host_info, task_info in tasks
+        ]
+
+        def write(session):
+            session.query(CveTaskHost).filter(CveTaskHost.task_id == task_id).delete(synchronize_session=False)
+            session.query(CveTaskContext).filter(CveTaskContext.task_id == task_id).delete(synchronize_session=False)
+            session.add(
+                CveTaskContext(task_id=task_id, username=username, context=json.dumps(context), update_time=now)
+            )
+            session.bulk_insert_mappings(CveTaskHost, records)
+
+        self._write("start", task_id, write)
+
+    def claim(self, task_id: str, host_ids: list) -> None:
+        """
+        take over hosts of an interrupted task, so they're not resumed by other processes
+        """
+        self._update(task_id, host_ids, {CveTaskHost.owner: self.owner})
+
+    def mark_running(self, task_id: str, host_id: int) -> None:
+        self._update(task_id, [host_id], {CveTaskHost.status: CveTaskStatus.RUNNING})
+
+    def finish(self, task_id: str, host_id: int, succeed: bool, result: dict, delivered: bool = False) -> None:
+        """
+        record the result of a host, delivered is True when the result needs no callback
+        """
+        self._update(
+            task_id,
+            [host_id],
+            {
+                CveTaskHost.status: CveTaskStatus.SUCCEED if succeed else CveTaskStatus.FAIL,
+                CveTaskHost.result: json.dumps(result),
+                CveTaskHost.callback_delivered: delivered,
+            },
+        )
+
+    def mark_delivered(self, task_id: str, host_id: int) -> None:
+        self._update(task_id, [host_id], {CveTaskHost.callback_delivered: True})
+
+    def _update(self, task_id: str, host_ids: list, values: dict) -> None:
+        values[CveTaskHost.update_time] = int(time.time())
+        self._write(
+            "update",
+            task_id,
+            lambda session: session.query(CveTaskHost)
+            .filter(CveTaskHost.task_id == task_id, CveTaskHost.host_id.in_(host_ids))
+            .update(values, synchronize_session=False),
+        )
+
+    def get_interrupted_tasks(self) -> Dict[str, dict]:
+        """
+        get tasks which have pending or running hosts owned by processes which are not alive. When liveness
+        of processes is unknown, tasks which have no host updated in resume_idle seconds are interrupted.
+        Finished hosts whose result is not delivered are returned when their owner is not alive or they're
+        not updated in resume_idle seconds.
+
+        Returns:
+            dict: e.g
+                {
+                    "task_id": {
+                        "username": "admin",
+                        "context": {"callback": "/callback", "check_items": []},
+                        "pending": {1: {"host_id": 1, "check": false, "cves": []}},
+                        "running": {2: {"host_id": 2, "check": false, "cves": []}},
+                        "undelivered": {3: {"host_id": 3, "status": "succeed", "result": []}}
+                    }
+                }
+        """
+        tasks = {}
+        session = self._session()
+        try:
+            records = (
+                session.query(
+                    CveTaskHost.task_id,
+                    CveTaskHost.host_id,
+                    CveTaskHost.status,
+                    CveTaskHost.owner,
+                    CveTaskHost.task_info,
+                    CveTaskHost.result,
+                    CveTaskHost.update_time,
+                )
+                .filter(
+                    sqlalchemy.or_(
+                        CveTaskHost.status.in_(self.unfinished_status),
+                        CveTaskHost.callback_delivered.is_(False),
+                    )
+                )
+                .all()
+            )
+            idle_before = int(time.time()) - self.resume_idle
+            alive_owners = self._get_alive_owners({record.owner for record in records})
+            if alive_owners is None:
+                last_update = {}
+                for record in records:
+                    last_update[record.task_id] = max(last_update.get(record.task_id, 0), record.update_time or 0)
+                records = [record for record in records if last_update[record.task_id] < idle_before]
+            else:
+                records = [
+                    record
+                    for record in records
+                    if record.owner not in alive_owners
+                    or (record.status not in self.unfinished_status and (record.update_time or 0) < idle_before)
+                ]
+            contexts = (
+                session.query(CveTaskContext.task_id, CveTaskContext.username, CveTaskContext.context)
+                .filter(CveTaskContext.task_id.in_({record.task_id for record in records}))
+                .all()
+                if records
+                else []
+            )
+        except sqlalchemy.exc.SQLAlchemyError as error:
+            LOGGER.error(f"query interrupted tasks in journal failed: {error}")
+            return tasks
+        finally:
+            session.remove()
+
+        for task_id, username, context in contexts:
+            tasks[task_id] = {
+                "username": username,
+                "context": json.loads(context),
+                CveTaskStatus.PENDING: {},
+                CveTaskStatus.RUNNING: {},
+                "undelivered": {},
+            }
+        for record in records:
+            if record.task_id not in tasks:
+                LOGGER.warning(f"context of interrupted task {record.task_id} is not found in journal")
+            elif record.status in self.unfinished_status:
+                tasks[record.task_id][record.status][record.host_id] = json.loads(record.task_info)
+            else:
+                tasks[record.task_id]["undelivered"][record.host_id] = json.loads(record.result)
+        return tasks
+
+    def purge(self) -> None:
+        """
+        delete records of hosts which are finished before expire seconds ago, and contexts of tasks which
+        have no host left
+        """
+
+        def write(session):
+            session.query(CveTaskHost).filter(
+                CveTaskHost.status.in_([CveTaskStatus.SUCCEED, CveTaskStatus.FAIL]),
+                CveTaskHost.update_time < int(time.time()) - self.expire,
+            ).delete(synchronize_session=False)
+            session.query(CveTaskContext).filter(
+                CveTaskContext.update_time < int(time.time()) - self.expire,
+                ~CveTaskContext.task_id.in_(session.query(CveTaskHost.task_id).distinct()),
+            ).delete(synchronize_session=False)
+
+        self._write("purge", "all", write)
+
+
+CVE_TASK_JOURNAL = CveTaskJournal(
+    int(configuration.cve_task.get("JOURNAL_EXPIRE") or 7 * 86400),
+    int(configuration.cve_task.get("RESUME_IDLE") or 900),
+    # a process misses two heartbeats before its tasks are resumed
+    3 * int(configuration.cve_task.get("RESUME_INTERVAL") or 60),
+)
@@ -11,23 +11,48 @@
 # See the Mulan PSL v2 for more details.
 # ******************************************************************************/
 import json
-from concurrent.futures import Future
-from typing import Dict, Tuple
+from collections import Counter
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
 
+import gevent
 from flask import Response, request
 import sqlalchemy
-import gevent
+from redis import RedisError
 
+from vulcanus.database.proxy import RedisProxy
 from vulcanus.log.log import LOGGER
-from vulcanus.multi_thread_handler import MultiThreadHandler
 from vulcanus.restful.resp import state
 from vulcanus.restful.response import BaseResponse
 from zeus.conf import configuration
-from zeus.conf.constant import CERES_CVE_FIX, CERES_CVE_REPO_SET, CERES_CVE_ROLLBACK, CERES_CVE_SCAN, CveTaskStatus
+from zeus.conf.constant import (
+    CERES_CVE_FIX,
+    CERES_CVE_REPO_SET,
+    CERES_CVE_ROLLBACK,
+    CERES_CVE_SCAN,
+    HOST_PACKAGE_FINGERPRINT,
+    CveTaskStatus,
+)
+from zeus.database.cache import SCAN_RESULT
 from zeus.database.proxy.host import HostProxy
 from zeus.function.model import ClientConnectArgs
-from zeus.function.verify.vulnerability import CveFixSchema, CveRollbackSchema, CveScanSchema, RepoSetSchema
+from zeus.function.verify.vulnerability import (
+    CveFixSchema,
+    CveRollbackSchema,
+    CveScanSchema,
+    CveTaskResultSchema,
+    RepoSetSchema,
+)
+from zeus.host_manager.fan_out import FanOutHandler
 from zeus.host_manager.ssh import execute_command_and_parse_its_result
+from zeus.vulnerability_manage.async_task import CVE_TASK_RUNNER, AsyncTaskStatus
+from zeus.vulnerability_manage.callback import CALLBACK_DISPATCHER
+from zeus.vulnerability_manage.journal import CVE_TASK_JOURNAL
+
+
+# interrupted tasks are looked for by one process of zeus every interval
+RESUME_LOCK_KEY = "cve_task_resume_lock"
+RESUME_INTERVAL = int(configuration.cve_task.get("RESUME_INTERVAL") or 60)
 
 
 def query_host_basic_info(host_list: list, username: str) -> Tuple[str, Dict]:
@@ -54,7 +79,9 @@ def query_host_basic_info(host_list: list, username: str) -> Tuple[str, Dict]:
     """
     try:
         with HostProxy(configuration) as proxy:
-            status_code, host_infos = proxy.get_host_info({"host_list": host_list, "username": username})
+            status_code, host_infos = proxy.get_host_info(
+                {"host_list": host_list, "username": username}, with_pkey=True
+            )
     except sqlalchemy.exc.SQLAlchemyError:
         LOGGER.error("connect to database error")
         return state.DATABASE_CONNECT_ERROR, dict()
@@ -109,6 +136,86 @@ def generate_tasks(tasks: list, host_infos: dict, **kwargs: dict) -> list:
     return new_tasks
 
 
+def generate_failed_result(host_info: dict, error: BaseException, msg_key: str = "msg") -> dict:
+    """
+    Generate the execute result of a task which is not finished on its host
+
+    Args:
+        host_info(dict): host basic info
+        error(BaseException): error which stopped the task, e.g timeout
+        msg_key(str): key of the error message in the result
+
+    Returns:
+        dict: e.g
+            {
+                "host_id": 1,
+                "host_ip": "127.0.0.1",
+                "host_name": "test_host",
+                "msg": "execute task failed: 600 seconds"
+            }
+    """
+    return {
+        "host_id": host_info.get("host_id"),
+        "host_ip": host_info.get("host_ip"),
+        "host_name": host_info.get("host_name"),
+        msg_key: f"execute task failed: {error}",
+    }
+
+
+def respond_task_result(view: BaseResponse, params: dict, execute: Callable[[], dict]) -> Response:
+    """
+    Execute a task and respond with its result, or run it in background and respond with its handle at once
+    when asynchronous is set in params. The task is executed in the request when its result can't be kept.
+
+    Args:
+        view(BaseResponse): view of the request
+        params(dict): request params, containing task_id, task_type and username
+        execute(Callable): execute the task and return the response data
+
+    Returns:
+        Response: data of the asynchronous response is e.g
+            {
+                "task_id": "task_id_1",
+                "handle": "d6b4e5f0a1c24b3e9f2a7c8d1e0f3a4b",
+                "status": "queued"
+            }
+    """
+    if params.get("asynchronous"):
+        handle = CVE_TASK_RUNNER.submit(params.get("username"), params.get("task_id"), params.get("task_type"), execute)
+        if handle is not None:
+            response = view.response(
+                code=state.SUCCEED,
+                data={"task_id": params.get("task_id"), "handle": handle, "status": AsyncTaskStatus.QUEUED},
+            )
+            response.status_code = HTTPStatus.ACCEPTED
+            return response
+        LOGGER.warning(f"result of task {params.get('task_id')} can't be kept, it's executed in the request")
+    return view.response(code=state.SUCCEED, data=execute())
+
+
+def get_unmatched_hosts(total_host_list: list, result_list: list) -> list:
+    """
+    Get hosts of a task which have no execute result, e.g hosts which are not found in the database.
+    Every result matches one occurrence of its host id, same as removing it from total_host_list,
+    but in linear time.
+
+    Args:
+        total_host_list(list): host id list of the task
+        result_list(list): execute results containing host_id
+
+    Returns:
+        list: host ids without result in order of total_host_list
+    """
+    result_counts = Counter(result.get("host_id") for result in result_list)
+    unmatched_hosts = []
+    for host_id in total_host_list:
+        if result_counts[host_id]:
+            result_counts[host_id] -= 1
+        else:
+            unmatched_hosts.append(host_id)
+    return unmatched_hosts
+
+
 class BaseExcuteTask:
     def __init__(self) -> None:
         self._header = {'content-type': 'application/json', 'access_token': request.headers.get('access_token')}
@@ -192,20 +299,17 @@ class ExecuteRepoSetTask(BaseResponse):
             return update_host_basic_info({"msg": repo_set_result})
         return update_host_basic_info(json.loads(repo_set_result))
 
-    def _callback(self, future: Future) -> None:
+    def _callback(self, result: dict) -> None:
         """
         Callback function for cve fix task
 
         Args:
-           future: A Future representing the given call.
-               we can get thread execute result by
-               future.result().
+           result(dict): execute result of the task on one host
 
         Returns:
             Noreturn
 
         """
-        result = future.result()
         request_args = {
             "host_id": result.get("host_id"),
             "task_id": self._task_id,
@@ -220,7 +324,7 @@ class ExecuteRepoSetTask(BaseResponse):
         apollo_ip = configuration.apollo.get("IP")
         apollo_port = configuration.apollo.get("PORT")
         url = f'http://{apollo_ip}:{apollo_port}{self._callback_url}'
-        self.get_response("post", url, request_args, self._header, timeout=10)
+        CALLBACK_DISPATCHER.post(url, request_args, self._header)
 
     @staticmethod
     def _convert_result_to_target_data_format(result_list: list, total_host_list: list) -> list:
@@ -258,10 +362,9 @@ class ExecuteRepoSetTask(BaseResponse):
                 res.update({"status": CveTaskStatus.FAIL})
 
             if result.get("host_id"):
-                total_host_list.remove(result.get("host_id"))
                 task_result.append(res)
 
-        for invalid_host_id in total_host_list:
+        for invalid_host_id in get_unmatched_hosts(total_host_list, result_list):
             task_result.append(
                 {
                     "host_id": invalid_host_id,
@@ -321,16 +424,25 @@ class ExecuteRepoSetTask(BaseResponse):
         self._task_type = params.get("task_type")
         self._check_items = params.get('check_items')
         tasks = generate_tasks(params.get('tasks'), host_infos, **{"repo_info": params.get("repo_info")})
+        return respond_task_result(self, params, lambda: self._execute_tasks(tasks, params))
 
-        # Execute task
-        task_handler = MultiThreadHandler(lambda p: self._execute_task(*p), tasks, None)
-        if params.get('callback'):
-            task_handler.create_thread(call_back=self._callback)
-        else:
-            task_handler.create_thread()
+    def _execute_tasks(self, tasks: list, params: dict) -> dict:
+        """
+        Execute repo set on every host and return the response data
+        """
+        task_handler = FanOutHandler(
+            self._execute_task,
+            tasks,
+            target=lambda host_info, _: host_info["host_ip"],
+            fallback=lambda host_info, task_info, error: dict(
+                generate_failed_result(host_info, error), repo=task_info["repo_info"]["name"]
+            ),
+        )
+        # results are sent to apollo in background, the response doesn't wait for them
+        task_handler.execute(callback=self._callback if params.get('callback') else None)
 
         # Generate target data
-        result = {
+        return {
             "result": {
                 "task_id": self._task_id,
                 "task_name": self._task_name,
@@ -340,7 +452,6 @@ class ExecuteRepoSetTask(BaseResponse):
                 ),
             }
         }
-        return self.response(code=state.SUCCEED, data=result)
 
 
 class ExecuteCveScanTask(BaseResponse):
@@ -392,39 +503,61 @@ class ExecuteCveScanTask(BaseResponse):
                   }
                 }
         """
+        connect_args = ClientConnectArgs(
+            host_info.get("host_ip"),
+            host_info.get("ssh_port"),
+            host_info.get("ssh_user"),
+            host_info.get("pkey"),
+            60 * 10,
+        )
+        fingerprint = None
+        # a check of the host is always executed, only the plain scan result is decided by installed packages
+        if self._incremental and not task_info.get("check"):
+            fingerprint = self._get_package_fingerprint(connect_args, host_info.get("host_id"))
+            cached_result = SCAN_RESULT.get(host_info.get("host_id"), fingerprint, self._check_items)
+            if cached_result is not None:
+                LOGGER.info(f"packages of host {host_info.get('host_id')} are not changed, reuse last scan result")
+                cached_result.update({"host_id": host_info.get("host_id")})
+                return cached_result
+
         command_args = {"check_items": self._check_items, "check": task_info.get("check"), "basic": True}
         command = CERES_CVE_SCAN % json.dumps(command_args)
 
-        status, cve_scan_result = execute_command_and_parse_its_result(
-            ClientConnectArgs(
-                host_info.get("host_ip"),
-                host_info.get("ssh_port"),
-                host_info.get("ssh_user"),
-                host_info.get("pkey"),
-                60 * 10,
-            ),
-            command,
-        )
+        status, cve_scan_result = execute_command_and_parse_its_result(connect_args, command)
         if status != state.SUCCEED:
             return {"host_id": host_info.get("host_id"), "msg": cve_scan_result}
         result = json.loads(cve_scan_result)
+        if result.get("code") == state.SUCCEED:
+            SCAN_RESULT.set(host_info.get("host_id"), fingerprint, self._check_items, result)
         result.update({"host_id": host_info.get("host_id")})
         return result
 
-    def _callback(self, future: Future) -> None:
+    @staticmethod
+    def _get_package_fingerprint(connect_args: ClientConnectArgs, host_id) -> Optional[str]:
+        """
+        get digest of installed packages and repos of the host
+
+        Returns:
+            str: sha256 digest, None when it can't be got and the host should be fully scanned
+        """
+        status, output = execute_command_and_parse_its_result(connect_args, HOST_PACKAGE_FINGERPRINT)
+        fields = output.split() if status == state.SUCCEED and isinstance(output, str) else []
+        if not fields:
+            LOGGER.warning(f"get package fingerprint of host {host_id} failed: {output}")
+            return None
+        return fields[0]
+
+    def _callback(self, result: dict) -> None:
         """
         Callback function for cve scan task
 
         Args:
-           future: A Future representing the given call.
-               we can get thread execute result by
-               future.result().
+           result(dict): execute result of the task on one host
 
         Returns:
             Noreturn
 
         """
-        result = future.result()
         request_args = {
             "task_id": self._task_id,
             "host_id": result.get("host_id"),
@@ -441,7 +574,7 @@ class ExecuteCveScanTask(BaseResponse):
         apollo_ip = configuration.apollo.get("IP")
         apollo_port = configuration.apollo.get("PORT")
         url = f'http://{apollo_ip}:{apollo_port}{self._callback_url}'
-        self.get_response("post", url, request_args, self._header, timeout=10)
+        CALLBACK_DISPATCHER.post(url, request_args, self._header)
 
     @staticmethod
     def _convert_execution_result_to_target_data_format(execute_result_list: list, total_host_list: list) -> list:
@@ -469,10 +602,9 @@ class ExecuteCveScanTask(BaseResponse):
                 "status": CveTaskStatus.SUCCEED if execute_result.get('code') == state.SUCCEED else CveTaskStatus.FAIL,
             }
             execute_result.pop("result", None)
-            total_host_list.remove(execute_result.get("host_id"))
             task_result.append(res)
 
-        for invalid_host_id in total_host_list:
+        for invalid_host_id in get_unmatched_hosts(total_host_list, execute_result_list):
             task_result.append(
                 {
                     "host_id": invalid_host_id,
@@ -506,7 +638,8 @@ class ExecuteCveScanTask(BaseResponse):
                     }
                 ],
                 "callback":"/vulnerability/task/callback/cve/scan",
-                "username": "admin"
+                "username": "admin",
+                "incremental": false
             }
 
         Returns:
@@ -528,19 +661,26 @@ class ExecuteCveScanTask(BaseResponse):
             )
         self._task_id = params.get("task_id")
         self._check_items = params.get('check_items')
+        self._incremental = params.get("incremental", False)
         tasks = generate_tasks(params.get('tasks'), host_infos)
+        return respond_task_result(self, params, lambda: self._execute_tasks(tasks, params))
 
-        # Execute task
-        task_handler = MultiThreadHandler(lambda p: self._execute_task(*p), tasks, None)
-        if params.get('callback'):
-            task_handler.create_thread(call_back=self._callback)
-        else:
-            task_handler.create_thread()
+    def _execute_tasks(self, tasks: list, params: dict) -> dict:
+        """
+        Execute cve scan on every host and return the response data
+        """
+        task_handler = FanOutHandler(
+            self._execute_task,
+            tasks,
+            target=lambda host_info, _: host_info["host_ip"],
+            fallback=lambda host_info, _, error: generate_failed_result(host_info, error),
+        )
+        # results are sent to apollo in background, the response doesn't wait for them
+        task_handler.execute(callback=self._callback if params.get('callback') else None)
 
         valid_result = task_handler.get_result()
         task_result = self._convert_execution_result_to_target_data_format(valid_result, params.get("total_hosts"))
-
-        return self.response(code=state.SUCCEED, data={"task_result": task_result})
+        return {"task_result": task_result}
 
 
 class ExecuteCveFixTask(BaseResponse):
@@ -606,6 +746,7 @@ class ExecuteCveFixTask(BaseResponse):
             )
             return data
 
+        CVE_TASK_JOURNAL.mark_running(self._task_id, host_info.get("host_id"))
         for cve in task_info.get("cves"):
             if cve.get("hotpatch"):
                 cve["accepted"] = task_info["accepted"]
@@ -631,20 +772,17 @@ class ExecuteCveFixTask(BaseResponse):
             return update_host_basic_info({"msg": cve_fix_result})
         return update_host_basic_info(json.loads(cve_fix_result))
 
-    def _callback(self, future: Future) -> None:
+    def _callback(self, result: dict) -> None:
         """
         Callback function for cve fix task
 
         Args:
-           future: A Future representing the given call.
-               we can get thread execute result by
-               future.result().
+           result(dict): execute result of the task on one host
 
         Returns:
             Noreturn
 
         """
-        result = future.result()
         request_args = {"task_id": self._task_id, "host_id": result.get("host_id"), "cves": {}}
         for cve in result.get('result', []):
             request_args['cves'][cve.get('cve_id')] = cve.get('result')
@@ -652,7 +790,13 @@ class ExecuteCveFixTask(BaseResponse):
         apollo_ip = configuration.apollo.get("IP")
         apollo_port = configuration.apollo.get("PORT")
         url = f'http://{apollo_ip}:{apollo_port}{self._callback_url}'
-        self.get_response("post", url, request_args, self._header, 10)
+        # a callback which is dropped or given up is posted again when interrupted tasks are resumed
+        CALLBACK_DISPATCHER.post(
+            url,
+            request_args,
+            self._header,
+            on_delivered=lambda: CVE_TASK_JOURNAL.mark_delivered(self._task_id, result.get("host_id")),
+        )
 
     @staticmethod
     def _convert_result_to_target_data_format(result_list: list, total_host_list: list) -> list:
@@ -690,10 +834,9 @@ class ExecuteCveFixTask(BaseResponse):
                 res.update({"status": CveTaskStatus.SUCCEED})
             else:
                 res.update({"status": CveTaskStatus.FAIL})
-            total_host_list.remove(result.get('host_id'))
             task_result.append(res)
 
-        for invalid_host_id in total_host_list:
+        for invalid_host_id in get_unmatched_hosts(total_host_list, result_list):
             task_result.append(
                 {
                     "host_id": invalid_host_id,
@@ -749,15 +892,22 @@ class ExecuteCveFixTask(BaseResponse):
                     "local_account": params.get("username"),
                 }
             )
-        # Execute task
-        task_handler = MultiThreadHandler(lambda p: self._execute_task(*p), tasks, None)
-        if self._callback_url:
-            task_handler.create_thread(call_back=self._callback)
-        else:
-            task_handler.create_thread()
+        return respond_task_result(self, params, lambda: self._execute_tasks(tasks, params))
+
+    def _execute_tasks(self, tasks: list, params: dict) -> dict:
+        """
+        Execute cve fix on every host and return the response data
+        """
+        CVE_TASK_JOURNAL.start(
+            self._task_id,
+            params.get("username"),
+            tasks,
+            {"callback": self._callback_url, "check_items": self._check_items},
+        )
+        task_handler = self._fan_out(tasks)
 
         # Generate target data
-        result = {
+        return {
             "result": {
                 "task_id": self._task_id,
                 "task_name": self._task_name,
@@ -766,7 +916,69 @@ class ExecuteCveFixTask(BaseResponse):
                 ),
             }
         }
-        return self.response(code=state.SUCCEED, data=result)
+
+    def _fan_out(self, tasks: list) -> FanOutHandler:
+        """
+        Execute cve fix on every host, result of every host is recorded in the journal and sent to apollo
+        """
+        task_handler = FanOutHandler(
+            self._execute_task,
+            tasks,
+            target=lambda host_info, _: host_info["host_ip"],
+            fallback=lambda host_info, _, error: generate_failed_result(host_info, error),
+        )
+        # results are sent to apollo in background, the response doesn't wait for them
+        task_handler.execute(callback=self._record_result)
+        return task_handler
+
+    def _record_result(self, result: dict) -> None:
+        CVE_TASK_JOURNAL.finish(
+            self._task_id,
+            result.get("host_id"),
+            result.get("code") == state.SUCCEED,
+            result,
+            delivered=not self._callback_url,
+        )
+        if self._callback_url:
+            self._callback(result)
+
+    @classmethod
+    def resume(cls, task_id: str, task: dict) -> None:
+        """
+        Finish a task interrupted by a restart of zeus. Hosts which were running are failed, because the fix
+        may be stopped half way and its result is unknown. Hosts which were not started are fixed now, and
+        results which were not delivered to apollo are posted again.
+
+        Args:
+            task_id(str): task id
+            task(dict): interrupted task in the journal, see CveTaskJournal.get_interrupted_tasks
+        """
+        view = cls()
+        view._task_id = task_id
+        # the token of the original request may be expired, callbacks are authenticated like timed tasks
+        view._header = {
+            'content-type': 'application/json',
+            "exempt_authentication": configuration.individuation.get("EXEMPT_AUTHENTICATION"),
+            "local_account": task["username"],
+        }
+        view._callback_url = task["context"].get("callback")
+        view._check_items = task["context"].get("check_items")
+
+        for result in task["undelivered"].values():
+            view._callback(result)
+        for host_id in task[CveTaskStatus.RUNNING]:
+            view._record_result({"host_id": host_id, "msg": "execute task failed: interrupted by restart of zeus"})
+
+        pending = task[CveTaskStatus.PENDING]
+        if not pending:
+            return
+        status_code, host_infos = query_host_basic_info(list(pending), task["username"])
+        if status_code != state.SUCCEED:
+            LOGGER.error(f"query hosts of interrupted task {task_id} failed: {status_code}")
+            return
+        for host_id in set(pending) - set(host_infos):
+            view._record_result({"host_id": host_id, "msg": "No matching data found in the database."})
+        view._fan_out([(host_infos[host_id], pending[host_id]) for host_id in host_infos])
 
 
 class ExecuteCveRollbackTask(BaseResponse, BaseExcuteTask):
@@ -862,7 +1074,7 @@ class ExecuteCveRollbackTask(BaseResponse, BaseExcuteTask):
         apollo_ip = configuration.apollo.get("IP")
         apollo_port = configuration.apollo.get("PORT")
         url = f'http://{apollo_ip}:{apollo_port}{self._callback_url}'
-        self.get_response("post", url, request_body, self._header, 10)
+        CALLBACK_DISPATCHER.post(url, request_body, self._header)
 
     @staticmethod
     def _convert_invalid_host_rollback_result(invalid_host_ids: list) -> list:
@@ -938,14 +1150,18 @@ class ExecuteCveRollbackTask(BaseResponse, BaseExcuteTask):
         self._task_type = params.get("task_type")
 
         # execute task
-        wait_execute_tasks = [
-            gevent.spawn(self._execute_task, *task) for task in generate_tasks(params.get('tasks'), host_infos)
-        ]
-        gevent.joinall(wait_execute_tasks)
+        task_handler = FanOutHandler(
+            self._execute_task,
+            generate_tasks(params.get('tasks'), host_infos),
+            target=lambda host_info, _: host_info["host_ip"],
+            fallback=lambda host_info, _, error: dict(
+                generate_failed_result(host_info, error, msg_key="log"), rollback_result=[]
+            ),
+        )
+        # results are sent to apollo in background, the response doesn't wait for them
+        task_handler.execute(callback=self._callback)
         task_execute_results = list()
-        for task in wait_execute_tasks:
-            rollback_result = task.value
-            self._callback(rollback_result)
+        for rollback_result in task_handler.get_result():
             status = CveTaskStatus.SUCCEED if "code" in rollback_result else CveTaskStatus.FAIL
             rollback_result.update(dict(status=status, cves=rollback_result.pop("rollback_result")))
             task_execute_results.append(rollback_result)
@@ -958,3 +1174,73 @@ class ExecuteCveRollbackTask(BaseResponse, BaseExcuteTask):
 
         response_data = dict(task_id=self._task_id, task_type="cve rollback", execute_result=task_execute_results)
         return self.response(code=state.SUCCEED, data=response_data)
+
+
+class QueryCveTaskResult(BaseResponse):
+    """
+    Interface for querying status and result of an asynchronous cve task.
+    Restful API: GET
+    """
+
+    @BaseResponse.handle(schema=CveTaskResultSchema)
+    def get(self, **params) -> Response:
+        """
+        query an asynchronous task by the handle returned when it's submitted
+
+        Args:
+            params (dict): e.g {"handle": "d6b4e5f0a1c24b3e9f2a7c8d1e0f3a4b", "username": "admin"}
+
+        Returns:
+            response body, data is the task record, see AsyncTaskRunner.get
+        """
+        status_code, record = CVE_TASK_RUNNER.get(params.get("username"), params.get("handle"))
+        if status_code != state.SUCCEED:
+            return self.response(code=status_code)
+        return self.response(code=state.SUCCEED, data=record)
+
+
+def resume_interrupted_tasks() -> None:
+    """
+    Finish cve fix tasks interrupted by a restart or a kill of a zeus process, and purge expired records of
+    the journal. Only one process of zeus looks for interrupted tasks in an interval, and it takes them over
+    before resuming them.
+    """
+    client = RedisProxy.redis_connect
+    if client is not None:
+        try:
+            if not client.set(RESUME_LOCK_KEY, CVE_TASK_JOURNAL.owner, nx=True, ex=RESUME_INTERVAL):
+                return
+        except RedisError as error:
+            LOGGER.warning(f"lock for resuming interrupted tasks failed, resume them in this process: {error}")
+
+    CVE_TASK_JOURNAL.purge()
+    for task_id, task in CVE_TASK_JOURNAL.get_interrupted_tasks().items():
+        LOGGER.info(
+            f"resume interrupted cve fix task {task_id}: {len(task[CveTaskStatus.PENDING])} pending hosts, "
+            f"{len(task[CveTaskStatus.RUNNING])} interrupted hosts, {len(task['undelivered'])} undelivered results"
+        )
+        CVE_TASK_JOURNAL.claim(
+            task_id, [*task[CveTaskStatus.PENDING], *task[CveTaskStatus.RUNNING], *task["undelivered"]]
+        )
+        gevent.spawn(_resume_task, task_id, task)
+
+
+def _resume_task(task_id: str, task: dict) -> None:
+    try:
+        ExecuteCveFixTask.resume(task_id, task)
+    except Exception as error:  # pylint: disable=W0703
+        LOGGER.error(f"resume interrupted cve fix task {task_id} failed: {error}")
+
+
+def watch_interrupted_tasks() -> None:
+    """
+    Keep the heartbeat of this process, so tasks executed by it are not resumed by others, and resume
+    interrupted tasks every interval
+    """
+    while True:
+        CVE_TASK_JOURNAL.heartbeat()
+        try:
+            resume_interrupted_tasks()
+        except Exception as error:  # pylint: disable=W0703
+            LOGGER.error(f"resume interrupted cve fix tasks failed: {error}")
+        gevent.sleep(RESUME_INTERVAL)